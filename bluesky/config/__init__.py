@@ -19,9 +19,63 @@ __all__ = [
     "DEFAULTS"
 ]
 
+class _ImmutableConfigDict(afconfig.ImmutableConfigDict):
+    """ImmutableConfigDict whose nested (already immutable) dicts are used
+    as is rather than converted, so that resolved sub-trees can be shared
+    between resolved trees.
+    """
+
+    def __init__(self, items):
+        dict.__init__(self, items)
+
+
+class _ConfigData(threading.local):
+    """Per-thread configuration state.
+
+    The raw configuration is a tree that shares every sub-tree it hasn't
+    modified with DEFAULTS (or with another thread's configuration, after
+    Config.restore); modified sub-trees are copied on write, and the copies
+    recorded in _OWNED. Wildcards are replaced lazily, when values are
+    looked up, and the results cached per sub-tree in _RESOLVED.
+    """
+
+    @property
+    def _CONFIG(self):
+        return Config().get()
+
+    @property
+    def _IM_CONFIG(self):
+        return Config().get()
+
+
+class _Resolved():
+    __slots__ = ('node', 'tree', 'items')
+
+    def __init__(self, node):
+        # The raw node is referenced so that its id isn't reused
+        self.node = node
+        self.tree = None
+        self.items = {}
+
+
+class _ConfigSnapshot():
+    """See Config.snapshot"""
+
+    def __init__(self, raw, today, run_id, resolved):
+        self.raw = raw
+        self.today = today
+        self.run_id = run_id
+        self.resolved = resolved
+
+    def __getstate__(self):
+        # Resolved values are keyed by the ids of raw sub-trees, and so
+        # are only valid in this process
+        return dict(self.__dict__, resolved={})
+
+
 # we'll make config data thread safe by storing in thread local,
 # which must be defined once, in main thread.
-thread_local_data = threading.local()
+thread_local_data = _ConfigData()
 
 class Config():
     """Class for managing bluesky configuration.
@@ -29,6 +83,11 @@ class Config():
     This is a Singleton, to facilitate making this module thread safe
     (e.g. when using threads to execute parallel runs with different
     configurations)
+
+    Configuration is layered: DEFAULTS, which is never copied or modified,
+    overlaid by merged config files and command line options, and then by
+    values set at runtime. Only the sub-trees touched by merge and set are
+    copied, and wildcards are replaced when values are looked up.
     """
 
     def __new__(cls):
@@ -51,20 +110,17 @@ class Config():
     def reset(self):
         self._data._RUN_ID = None
         self._data._TODAY = None
-        self._data._RAW_CONFIG = copy.deepcopy(DEFAULTS)
-        self._data._CONFIG = self.replace_config_wildcards(copy.deepcopy(self._data._RAW_CONFIG))
-        self._data._IM_CONFIG = afconfig.ImmutableConfigDict(self._data._CONFIG)
+        self._data._RAW_CONFIG = DEFAULTS
+        self._data._OWNED = {}
+        self._data._RESOLVED = {}
 
         return self
 
     def merge(self, config_dict):
         if config_dict:
             config_dict = to_lowercase_keys(config_dict)
-            self._data._RAW_CONFIG = afconfig.merge_configs(
+            self._data._RAW_CONFIG, changed = self._merged(
                 self._data._RAW_CONFIG, config_dict)
-            self._data._CONFIG = afconfig.merge_configs(self._data._CONFIG,
-                self.replace_config_wildcards(copy.deepcopy(config_dict)))
-            self._data._IM_CONFIG = afconfig.ImmutableConfigDict(self._data._CONFIG)
 
         return self
 
@@ -72,16 +128,15 @@ class Config():
         config_dict = to_lowercase_keys(config_dict)
         if keys:
             keys = [k.lower() for k in keys]
-            afconfig.set_config_value(self._data._RAW_CONFIG,
-                copy.deepcopy(config_dict), *keys)
-            afconfig.set_config_value(self._data._CONFIG,
-                self.replace_config_wildcards(copy.deepcopy(config_dict)),
-                *keys)
-            self._data._IM_CONFIG = afconfig.ImmutableConfigDict(self._data._CONFIG)
+            self._data._RAW_CONFIG = self._with_value(self._data._RAW_CONFIG,
+                keys, copy.deepcopy(config_dict))
 
         else:
-            self._data._RAW_CONFIG = copy.deepcopy(DEFAULTS)
-            self._data._CONFIG = self.replace_config_wildcards(copy.deepcopy(self._data._RAW_CONFIG))
+            self._data._RAW_CONFIG = DEFAULTS
+            # Drop resolved values for sub-trees that are no longer used
+            self._data._RESOLVED = {k: r for k, r in self._data._RESOLVED.items()
+                if k not in self._data._OWNED}
+            self._data._OWNED = {}
             self.merge(config_dict)
 
         return self
@@ -89,12 +144,12 @@ class Config():
     def set_today(self, today):
         if today and self._data._TODAY != today:
             self._data._TODAY = today
-            self.set(self._data._RAW_CONFIG)
+            self._data._RESOLVED = {}
 
     def set_run_id(self, run_id):
         if run_id and self._data._RUN_ID != run_id:
             self._data._RUN_ID = run_id
-            self.set(self._data._RAW_CONFIG)
+            self._data._RESOLVED = {}
 
     def get(self, *keys, **kwargs):
         if 'default' in kwargs:
@@ -103,13 +158,114 @@ class Config():
 
         if keys:
             keys = [k.lower() for k in keys]
-            # default behavior is to fail if key isn't in user's config
-            # or in default config
-            return afconfig.get_config_value(self._data._IM_CONFIG, *keys,
-                fail_on_missing_key=not kwargs.get('allow_missing'))
+            node = self._data._RAW_CONFIG
+            for i, k in enumerate(keys):
+                if not isinstance(node, dict) or k not in node:
+                    # default behavior is to fail if key isn't in user's
+                    # config or in default config
+                    return afconfig.get_config_value(
+                        self._resolve(node), *keys[i:],
+                        fail_on_missing_key=not kwargs.get('allow_missing'))
+                if i == len(keys) - 1:
+                    return self._resolve_item(node, k)
+                node = node[k]
 
         else:
-            return self._data._IM_CONFIG
+            return self._resolve(self._data._RAW_CONFIG)
+
+    def snapshot(self):
+        """Returns this thread's configuration, to be passed to restore in
+        another thread or process.
+
+        Sub-trees are shared with the snapshot rather than copied, and so
+        are subsequently copied on write in this thread as well.
+        """
+        self._data._OWNED = {}
+        return _ConfigSnapshot(self._data._RAW_CONFIG, self._data._TODAY,
+            self._data._RUN_ID, dict(self._data._RESOLVED))
+
+    def restore(self, snapshot):
+        """Sets this thread's configuration to a snapshot of another's."""
+        self._data._RAW_CONFIG = snapshot.raw
+        self._data._TODAY = snapshot.today
+        self._data._RUN_ID = snapshot.run_id
+        self._data._OWNED = {}
+        self._data._RESOLVED = dict(snapshot.resolved)
+        return self
+
+    ##
+    ## Copy on write
+    ##
+
+    def _writable(self, node):
+        """Returns node, if owned by this thread's config, or else a copy."""
+        if id(node) in self._data._OWNED:
+            # It will be modified in place
+            self._data._RESOLVED.pop(id(node), None)
+        else:
+            node = dict(node)
+            self._data._OWNED[id(node)] = node
+        return node
+
+    def _merged(self, node, other):
+        """Returns (node with other merged in, whether it was changed)
+
+        node is only copied, if need be, if there are changes.
+        """
+        changes = {}
+        for k, v in other.items():
+            cur = node.get(k)
+            if isinstance(v, dict) and isinstance(cur, dict):
+                new, changed = self._merged(cur, v)
+            else:
+                changed = k not in node or type(cur) is not type(v) or cur != v
+                new = copy.deepcopy(v) if changed else cur
+            if changed:
+                changes[k] = new
+
+        if not changes:
+            return node, False
+
+        node = self._writable(node)
+        node.update(changes)
+        return node, True
+
+    def _with_value(self, node, keys, value):
+        if len(keys) > 1:
+            child = node.get(keys[0])
+            value = self._with_value(child if isinstance(child, dict) else {},
+                keys[1:], value)
+        node = self._writable(node)
+        node[keys[0]] = value
+        return node
+
+    ##
+    ## Wildcard replacement
+    ##
+
+    def _resolved_entry(self, node):
+        entry = self._data._RESOLVED.get(id(node))
+        if entry is None:
+            entry = self._data._RESOLVED[id(node)] = _Resolved(node)
+        return entry
+
+    def _resolve(self, node):
+        if not isinstance(node, dict):
+            return self.replace_config_wildcards(copy.deepcopy(node))
+
+        entry = self._resolved_entry(node)
+        if entry.tree is None:
+            entry.tree = _ImmutableConfigDict(
+                {k: self._resolve_item(node, k, entry) for k in node})
+        return entry.tree
+
+    def _resolve_item(self, node, key, entry=None):
+        entry = entry or self._resolved_entry(node)
+        if key not in entry.items:
+            val = node[key]
+            entry.items[key] = (self._resolve(val) if isinstance(val, dict)
+                else self.replace_config_wildcards(copy.deepcopy(val)))
+        return entry.items[key]
 
     def replace_config_wildcards(self, val):
         if isinstance(val, dict):
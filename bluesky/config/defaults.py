@@ -35,6 +35,9 @@ _DEFAULTS = {
         "wait": {}, # {"strategy": None,"time": None,"max_attempts": None},
     },
     "load": {
+        # Max number of sources to load concurrently, in separate threads;
+        # 1 to load sequentially, 0 to load all at once
+        "max_concurrent_sources": 1,
         "sources": []
         # Each source has some subset of the following defined, but
         # there are no defaults to be defined here
@@ -92,7 +95,7 @@ _DEFAULTS = {
         #   },
     },
     "ecoregion": {
-        "lookup_implementation": "ogr",
+        "lookup_implementation": "strtree",
         "try_nearby_on_failure": False,
         "skip_failures": True,
         "default": None
@@ -117,7 +120,10 @@ _DEFAULTS = {
         "fccs_version": "2",
 
         # Allow summed fuel percentages to be between 99.5% and 100.5%
-        "total_pct_threshold": 0.5
+        "total_pct_threshold": 0.5,
+
+        # sqlite file for caching look-ups across runs; None to disable
+        "cache_file": None
     },
     "fuelmoisture":{
         # multiple models
@@ -136,6 +142,7 @@ _DEFAULTS = {
         "scale_with_estimated_fuelload": False,
         "scale_with_estimated_consumption": False,
         "summarize_fuel_loadings": False,
+        "batch_fuelbeds": False,
         "piles": {
             "use_default_loadings_on_failure": False,
         },
@@ -276,6 +283,8 @@ _DEFAULTS = {
         "include_emissions_factors": False,
         "species": [],
         "fuel_loadings": {},
+        "reuse_consumption": False,
+        "warm_cache_fccs_ids": [],
         "ubc-bsf-feps": {
             "working_dir": None,
             "delete_working_dir_if_no_error": True
@@ -344,6 +353,9 @@ _DEFAULTS = {
         "model": "feps",
         "working_dir": None,
         "delete_working_dir_if_no_error": True,
+        # Number of worker processes in which to compute plumerise for
+        # each location; 1 to compute serially, 0 to use all CPUs
+        "num_processes": 1,
         # Note: feps and sev specific configs are usd by 'sev-feps' model
         "feps": {
             "load_heat": False
@@ -391,7 +403,9 @@ _DEFAULTS = {
             "separate_smolder": True,
             "write_ptinv_totals": True,
             "write_ptday_file": True,
-            "use_fips": False
+            "use_fips": False,
+            "fips_offline": True,
+            "fips_cache_file": None
         },
     },
     "trajectories": {
@@ -405,6 +419,10 @@ _DEFAULTS = {
         "hysplit": {
             "binary": 'hyts_std-v5.2.3',
             "start_hours": [0],
+            # Max number of start hours to run concurrently; 0 to run
+            # up to one per available CPU; defaults to running them one
+            # at a time
+            "num_processes": 1,
             "heights": [10, 100, 1000],
             "vertical_motion": 0, # 0 = from met file
             "top_of_model_domain": 10000,  # trajectories end above this
@@ -629,6 +647,9 @@ _DEFAULTS = {
                 # removed at the thin_rate. Particles above the
                 # highest upper bound are always kept.
                 "thin_bins": None,
+                # Seed for thin_bins sampling; None seeds from system entropy,
+                # so thinning isn't reproducible between runs.
+                "seed": None,
                 # Archive the thinned PARINIT to the run output directory.
                 "keep_parinit": False,
             },
@@ -726,6 +747,26 @@ _DEFAULTS = {
             "NFIRES_PER_PROCESS": -1,
             "NPROCESSES_MAX": -1,
 
+            # How fires are allocated to tranches:
+            #  - 'fire_count' - same number of fires (+/- 1) in each process
+            #  - 'emissions' - balance processes by estimated cost, based on
+            #    PM2.5, number of emitting hours, and number of plume heights
+            "TRANCHING_STRATEGY": "fire_count",
+
+            # How tranches are run:
+            #  - 'threads' - one thread per tranche, all run at once
+            #  - 'processes' - pool of worker processes, bounded by
+            #    MAX_TRANCHE_PROCESSES
+            "TRANCHE_EXECUTION": "threads",
+            # Defaults to number of available cores (divided by NCPUS
+            # for MPI runs)
+            "MAX_TRANCHE_PROCESSES": None,
+
+            # How tranche output is summed into the final output file:
+            #  - 'nco' - using ncea and ncks
+            #  - 'native' - in process, using netCDF4
+            "TRANCHE_OUTPUT_MERGE": "nco",
+
             # Machines file (TODO: functionality for multiple nodes)
             #MACHINEFILE": machines,
 
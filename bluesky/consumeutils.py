@@ -9,7 +9,7 @@ import copy
 import tempfile
 
 from afdatetime.parsing import parse_datetime
-#import numpy
+import numpy
 import consume
 
 from bluesky.config import Config
@@ -17,6 +17,7 @@ from bluesky.exceptions import BlueSkyConfigurationError
 
 __all__ = [
     "_apply_settings",
+    "_get_settings",
     "FuelLoadingsManager",
     "FuelConsumptionForEmissions",
     "CONSUME_FIELDS",
@@ -32,6 +33,13 @@ CONSUME_VERSION_STR = '.'.join([
 ])
 
 def _apply_settings(fc, location, burn_type, fire_type):
+    for field, value in _get_settings(location, burn_type, fire_type).items():
+        setattr(fc, field, value)
+
+def _get_settings(location, burn_type, fire_type):
+    """Returns the consume settings, keyed by FuelConsumption attribute
+    name, that _apply_settings would apply for the given location
+    """
     # Read settings here instead of at module scope to support unit testing
 
 
@@ -56,6 +64,7 @@ def _apply_settings(fc, location, burn_type, fire_type):
     }
 
     valid_settings = dict(settings[burn_type], **settings['all'])
+    fc_settings = {}
     for field, d in valid_settings.items():
         value = None
         # If field == 'length_of_ignition', use location.ignition_start
@@ -91,18 +100,20 @@ def _apply_settings(fc, location, burn_type, fire_type):
                     pass
 
         if value is not None:
-            setattr(fc, field, value)
+            fc_settings[field] = value
         elif 'defaults' in d and fire_type and fire_type in d['defaults']:
-            setattr(fc, field, d['defaults'][fire_type])
+            fc_settings[field] = d['defaults'][fire_type]
         elif 'defaults' in d and 'other' in d['defaults']:
-            setattr(fc, field, d['defaults']['other'])
+            fc_settings[field] = d['defaults']['other']
         # support 'default' for backwards compatibility (old configs)
         elif 'default' in d:
-            setattr(fc, field, d['default'])
+            fc_settings[field] = d['default']
         else:
             raise BlueSkyConfigurationError("Specify {} for {} burns".format(
                 field, burn_type))
 
+    return fc_settings
+
 
 class ConsumeSettingFromOtherData():
 
@@ -372,19 +383,26 @@ CONSUME_FUEL_CATEGORIES = {
 CONSUME_FIELDS = ["flaming", "smoldering", "residual", "total"]
 
 class FuelConsumptionForEmissions(consume.FuelConsumption):
+    """FuelConsumption object to pass to consume.Emissions
+
+    If reuse_consumption is True, consumption_data and heat_data, which
+    are assumed to be totals (i.e. not per acre) as produced by the
+    consumption module, are fed straight into consume's emissions
+    calculations instead of consumption being recomputed.
+    """
+
     def __init__(self, consumption_data, heat_data, area, burn_type,
-            fire_type, fccs_id, season, location, fccs_file=None):
+            fire_type, fccs_id, season, location, fccs_file=None,
+            reuse_consumption=False):
+        # consume.FuelConsumption disallows setting new attributes once
+        # it's been initialized, so these need to be set beforehand
+        self._consumption_data = consumption_data if reuse_consumption else None
+        self._heat_data_in = heat_data if reuse_consumption else None
+        self._area = area
+
         fccs_file = fccs_file or ""
         super(FuelConsumptionForEmissions, self).__init__(fccs_file=fccs_file)
 
-        # TODO:  figure out how to avoid re-computing consumption and still
-        #  compute emissions correctly; for now, let it recompute, since
-        #  consumption was most likely produced with consume using the same
-        #  conifguration as this emissions run (which means this is wasted
-        #  computation, but shouldn't be changing the consumption values)
-
-        # self._set_consumption_data(consumption_data)
-        # self._set_heat_data(heat_data)
         self.burn_type = burn_type
         self.fuelbed_fccs_ids = [fccs_id]
         self.fuelbed_area_acres = [area]
@@ -393,34 +411,55 @@ class FuelConsumptionForEmissions(consume.FuelConsumption):
 
         _apply_settings(self, location, burn_type, fire_type)
 
-    # def _calculate(self):
-    #     """Overrides consume.FuelConsumption._calculate so that it doesn't
-    #     recalculate _cons_data and _heat_data when it's called by
-    #     consume.Emissions._calculate
-
-    #     Note:  We could have _calculate skipped altogether by setting
-    #         consume.Emissions._have_cons_data = len(
-    #             FuelConsumptionForEmissions._cons_data[0][0])
-    #     but we need calcualte to be called in order to set self._cons_data_piles
-    #     """
-    #     loadings = self._get_loadings_for_specified_files(
-    #         self._settings.get('fuelbeds'))
-
-    #     self._cons_data_piles = consume.con_calc_natural.ccon_piles(
-    #         self._settings.get('pile_black_pct'), loadings)
-
-    # def _set_consumption_data(self, consumption_data):
-    #     # This is a reverse of what's done in
-    #     #  consume.FuelConsumption.make_dictionary_of_lists
-    #     cons_data = []
-    #     for c, subc in CONSUME_FUEL_CATEGORIES.items():
-    #         for sc in subc:
-    #             cons_data.append([
-    #                 # TODO: use get's and default missing values to 0
-    #                 consumption_data[c][sc][f] for f in CONSUME_FIELDS
-    #             ])
-    #     self._cons_data = numpy.array(cons_data)
-
-    # def _set_heat_data(self, heat_data):
-    #     # _heat_data is indeed supposed to be an array with a single nested array
-    #     self._heat_data = numpy.array([[heat_data[f] for f in CONSUME_FIELDS]])
+    def _calculate(self):
+        """Overrides consume.FuelConsumption._calculate so that it doesn't
+        recalculate _cons_data and _heat_data when it's called by
+        consume.Emissions._calculate
+
+        Note:  We could have _calculate skipped altogether by setting
+            consume.Emissions._have_cons_data = len(
+                FuelConsumptionForEmissions._cons_data[0][0])
+        but we need calcualte to be called in order to set self._cons_data_piles
+        """
+        if self._consumption_data is None:
+            return super(FuelConsumptionForEmissions, self)._calculate()
+
+        loadings = self._get_loadings_for_specified_files(
+            self._settings.get('fuelbeds'))
+
+        self._cons_data_piles = consume.con_calc_natural.ccon_piles(
+            self._settings.get('pile_black_pct'), loadings)
+
+        self._set_consumption_data(self._consumption_data)
+        self._set_heat_data(self._heat_data_in)
+
+    # consume works internally in tons per acre (and BTU per acre), while
+    # the consumption module multiplies its output by area
+
+    def _set_consumption_data(self, consumption_data):
+        # This is a reverse of what's done in
+        #  consume.FuelConsumption.make_dictionary_of_lists
+        cons_data = []
+        for c, subc in CONSUME_FUEL_CATEGORIES.items():
+            for sc in subc:
+                cons_data.append([
+                    [self._get_per_acre(consumption_data.get(c, {}).get(sc, {}), f)]
+                        for f in CONSUME_FIELDS
+                ])
+        self._cons_data = numpy.array(cons_data)
+
+    def _set_heat_data(self, heat_data):
+        # _heat_data is indeed supposed to be an array with a single nested array
+        self._heat_data = numpy.array([[
+            [self._get_per_acre(heat_data, f)] for f in CONSUME_FIELDS
+        ]])
+
+    def _get_per_acre(self, data, field):
+        # values are single element arrays; missing values default to 0
+        val = data.get(field)
+        if val is None:
+            return 0.0
+        if hasattr(val, '__getitem__'):
+            val = val[0]
+        # A fuelbed with 'pct' 0 has no area, and so nothing is consumed
+        return val / self._area if self._area else 0.0
@@ -8,6 +8,7 @@ __author__ = "Joel Dubowy"
 
 import calendar
 import datetime
+import functools
 import re
 
 from afdatetime.parsing import (
@@ -143,3 +144,17 @@ def season_from_date(date_obj):
         l = int(calendar.isleap(date_obj.year))
         doy = int(date_obj.strftime('%j'))
         return next(season for season, e in SEASON_END_DATES if doy <= e + l)
+
+
+ONE_HOUR = datetime.timedelta(hours=1)
+HOUR_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+@functools.lru_cache(maxsize=256)
+def hour_keys(start, num_hours):
+    """Returns tuple of the keys of num_hours hours of hourly data (e.g.
+    timeprofile and plumerise data), starting at datetime start
+
+    Keys are cached, since the same hours recur across fires and locations.
+    """
+    return tuple((start + i * ONE_HOUR).strftime(HOUR_FORMAT)
+        for i in range(num_hours))
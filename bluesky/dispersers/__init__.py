@@ -14,6 +14,7 @@ import abc
 import itertools
 import logging
 import math
+import operator
 import os
 import shutil
 from datetime import timedelta
@@ -23,7 +24,7 @@ from afdatetime import parsing as datetime_parsing
 
 from bluesky import datautils, locationutils
 from bluesky.config import Config
-from bluesky.datetimeutils import parse_utc_offset
+from bluesky.datetimeutils import hour_keys, parse_utc_offset
 from bluesky.models.fires import Fire
 from . import firemerge
 
@@ -236,7 +237,7 @@ class DispersionBase(object, metaclass=abc.ABCMeta):
 
         f = Fire(
             id="{}-{}".format(fire.id, loc_num),
-            # See note above, in _merge_two_fires, about why
+            # See note in firemerge.FireMerger._merge_group about why
             # original_fire_ids is a set instead of scalar
             original_fire_ids=set([fire.id]),
             meta=fire.get('meta', {}),
@@ -262,11 +263,11 @@ class DispersionBase(object, metaclass=abc.ABCMeta):
         all_timeprofile = loc.get('timeprofile', {})
         plumerise = {}
         timeprofile = {}
-        for i in range(self._num_hours):
-            local_dt = self._model_start + timedelta(hours=(i + utc_offset))
-            # TODO: will all_plumerise and all_timeprofile always
-            #    have string value keys
-            local_dt = local_dt.strftime('%Y-%m-%dT%H:%M:%S')
+        # TODO: will all_plumerise and all_timeprofile always
+        #    have string value keys
+        for local_dt in hour_keys(
+                self._model_start + timedelta(hours=utc_offset),
+                self._num_hours):
             plumerise[local_dt] = all_plumerise.get(local_dt) or self.MISSING_PLUMERISE_HOUR
             timeprofile[local_dt] = all_timeprofile.get(local_dt) or self.MISSING_TIMEPROFILE_HOUR
 
@@ -283,15 +284,22 @@ class DispersionBase(object, metaclass=abc.ABCMeta):
         return emissions
 
     def _get_timeprofiled_emissions(self, timeprofile, emissions):
-        timeprofiled_emissions = {}
-        for dt in timeprofile:
-            timeprofiled_emissions[dt] = {}
-            for e in self.SPECIES:
-                timeprofiled_emissions[dt][e] = sum([
-                    timeprofile[dt][p] * emissions[p].get(e, 0.0)
-                        for p in PHASES
-                ])
-        return timeprofiled_emissions
+        # As when computing each hour's values separately, nothing is
+        # looked up if there are no hours or species
+        if not timeprofile or not self.SPECIES:
+            return {dt: {} for dt in timeprofile}
+
+        # Look up each species' emissions by phase once, rather than for
+        # every hour; each hour's value is then the sum, over phases, of
+        # the phase's timeprofile fraction times its emissions
+        species_emissions = [(e, [emissions[p].get(e, 0.0) for p in PHASES])
+            for e in self.SPECIES]
+        all_fractions = map(operator.itemgetter(*PHASES), timeprofile.values())
+        return {
+            dt: {e: sum(map(operator.mul, fractions, se))
+                for e, se in species_emissions}
+            for dt, fractions in zip(timeprofile, all_fractions)
+        }
 
 
     def _get_heat(self, fire, aa, loc):
@@ -1,6 +1,7 @@
 """bluesky.dispersers.firemerge"""
 
 import copy
+import functools
 import itertools
 import logging
 import uuid
@@ -13,6 +14,9 @@ from bluesky.exceptions import BlueSkyConfigurationError
 from bluesky.models.fires import Fire
 from bluesky import locationutils
 
+# Fires' hourly data are keyed by the same hours, so each is parsed once
+_parse_datetime = functools.lru_cache(maxsize=65536)(datetime_parsing.parse)
+
 class BaseFireMerger():
 
     def _sum_data(self, data1, data2):
@@ -43,99 +47,137 @@ class FireMerger(BaseFireMerger):
 
     def merge(self, fires):
         logging.debug("Merging fires with same lat,lng")
-        fires_by_lat_lng = defaultdict(lambda: [])
+        # Each group of fires to be merged is accumulated in a _MergeGroup,
+        # and the merged fire is created once all fires have been grouped
+        groups_by_lat_lng = defaultdict(lambda: [])
         for f in sorted(fires, key=lambda f: f['start']):
             key = (f.latitude, f.longitude)
             merged = False
 
-            # Sort fires_by_lat_lng[key] for unit testing purposes - for
-            # deterministic behavior (since f could potentially merge with
-            # possibly multiple fires in fires_by_lat_lng[key])
-            # TODO: this shouldn't be a significant performance hit, but
-            #   currently unit tests are structured so that the sorting
-            #   doesn't come into play, so we could remove it for now.
-            for i, f_merged in enumerate(sorted(fires_by_lat_lng[key], key=lambda f: f['start'])):
-                if (not self._do_fires_overlap(f, f_merged)
-                        and not self._do_fire_metas_conflict(f, f_merged)):
-                    # replace f_merged with f_merged merged with f
-                    fires_by_lat_lng[key][i] = self._merge_two_fires(f_merged, f)
+            # Since fires are processed in order of 'start', and since
+            # groups keep the 'start' of their first fire, each location's
+            # groups are always sorted by 'start' (for deterministic
+            # behavior, since f could potentially merge with multiple groups)
+            for group in groups_by_lat_lng[key]:
+                if (not self._do_fires_overlap(f, group)
+                        and not self._do_fire_metas_conflict(f, group)):
+                    group.add(f)
                     merged = True
 
             if not merged:
                 # just add it
-                fires_by_lat_lng[key].append(f)
+                groups_by_lat_lng[key].append(_MergeGroup(f))
 
         # return flattened list
-        return list(itertools.chain.from_iterable(fires_by_lat_lng.values()))
-
-    def _do_fires_overlap(self, f1, f2):
-        return (f1['start'] < f2['end']) and (f2['start'] < f1['end'])
-
-    def _do_fire_metas_conflict(self, f1, f2):
-        for k in set(f1['meta'].keys()).intersection(f2['meta'].keys()):
-            if f1['meta'][k] != f2['meta'][k]:
-                return True
+        return [self._merge_group(group) for group in
+            itertools.chain.from_iterable(groups_by_lat_lng.values())]
+
+    def _merge_group(self, group):
+        """Returns the fire resulting from merging, one after the other,
+        each of the group's fires into the first
+        """
+        fires = group.fires
+        if len(fires) == 1:
+            return fires[0]
 
-        return False
+        f_first = fires[0]
+        plumerise = dict(f_first.plumerise)
+        timeprofiled_area = dict(f_first.timeprofiled_area)
+        timeprofiled_emissions = dict(f_first.timeprofiled_emissions)
+        area = f_first.area
+        consumption = f_first.consumption
+        has_heat = 'heat' in f_first
+        heat = f_first.get('heat', 0.0)
+        for f in fires[1:]:
+            area = area + f.area
+            self._update_hourly_data(plumerise, f.plumerise, f['start'])
+            self._update_hourly_data(timeprofiled_area,
+                f.timeprofiled_area, f['start'])
+            self._update_hourly_data(timeprofiled_emissions,
+                f.timeprofiled_emissions, f['start'])
+            consumption = self._sum_data(consumption, f.consumption)
+            if has_heat or 'heat' in f:
+                heat = heat + f.get('heat', 0.0)
+                has_heat = True
 
-    def _merge_two_fires(self, f_merged, f):
         new_f_merged = Fire(
             # We'll let the new fire be assigned a new id
             # It's possible, but not likely, that locations from different
             # fires will get merged together.  This set of original fire
             # ids isn't currently used other than in log messages, but
             # could be used in tranching
-            original_fire_ids=f_merged.original_fire_ids.union(f.original_fire_ids),
+            original_fire_ids=f_first.original_fire_ids.union(
+                *[f.original_fire_ids for f in fires[1:]]),
             # we know at this point that their meta dicts don't conflict
-            meta=dict(f_merged.meta, **f.meta),
-            # there may be a gap between f_merged['end'] and f['start']
-            # but no subsequent fires will be in that gap, since
-            # fires were sorted by 'start'
-            # Note: we need to use f_merged['start'] instead of f_merged.start
+            meta=group['meta'],
+            # there may be gaps between fires' 'end' and 'start' times,
+            # but no other fires will be in those gaps, since fires were
+            # sorted by 'start'
+            # Note: we need to use f['start'] instead of f.start
             #   because the Fire model has special property 'start' that
             #   returns the first start time of all active_areas in the fire's
             #   activity, and since we're not using nested activity here,
-            #   f_merged.start returns 'None' rather than the actual value
+            #   f.start returns 'None' rather than the actual value
             #   set in _add_location
-            start=f_merged['start'],
+            start=group['start'],
             # end will only be used when merging fires
             # Note: see note about 'start', above
-            end=f['end'],
-            area=f_merged.area + f.area,
-            # f_merged and f have the same lat,lng (o.w. they wouldn't
+            end=group['end'],
+            area=area,
+            # The fires have the same lat,lng (o.w. they wouldn't
             # be merged)
-            latitude=f_merged.latitude,
-            longitude=f_merged.longitude,
+            latitude=f_first.latitude,
+            longitude=f_first.longitude,
             # the offsets could be different, but only if on DST transition
             # TODO: Should we worry about this?  If so, we should add same
             #   utc offset to criteria for deciding to merge or not
-            utc_offset=f_merged.utc_offset,
-            plumerise=self._merge_hourly_data(
-                f_merged.plumerise, f.plumerise, f['start']),
-            timeprofiled_area=self._merge_hourly_data(
-                f_merged.timeprofiled_area, f.timeprofiled_area, f['start']),
-            timeprofiled_emissions=self._merge_hourly_data(
-                f_merged.timeprofiled_emissions, f.timeprofiled_emissions,
-                f['start']),
-            consumption=self._sum_data(f_merged.consumption, f.consumption)
+            utc_offset=f_first.utc_offset,
+            plumerise=plumerise,
+            timeprofiled_area=timeprofiled_area,
+            timeprofiled_emissions=timeprofiled_emissions,
+            consumption=consumption
         )
-        if 'heat' in f_merged or 'heat' in f:
-            new_f_merged['heat'] = f_merged.get('heat', 0.0) + f.get('heat', 0.0)
+        if has_heat:
+            new_f_merged['heat'] = heat
         return new_f_merged
 
-    def _merge_hourly_data(self, data1, data2, start2):
-        pruned_data2 = {k: v for k, v in data2.items()
-            if self._on_or_after(k, start2)}
-        return dict(data1, **pruned_data2)
+    def _do_fires_overlap(self, f1, f2):
+        return (f1['start'] < f2['end']) and (f2['start'] < f1['end'])
+
+    def _do_fire_metas_conflict(self, f1, f2):
+        for k in set(f1['meta'].keys()).intersection(f2['meta'].keys()):
+            if f1['meta'][k] != f2['meta'][k]:
+                return True
+
+        return False
+
+    def _update_hourly_data(self, data1, data2, start2):
+        data1.update({k: v for k, v in data2.items()
+            if self._on_or_after(k, start2)})
 
     def _on_or_after(self, dt1, dt2):
         # make sure same type, and convert to datetimes if not
         if type(dt1) != type(dt2):
-            dt1 = datetime_parsing.parse(dt1)
-            dt2 = datetime_parsing.parse(dt2)
+            dt1 = _parse_datetime(dt1)
+            dt2 = _parse_datetime(dt2)
         return dt1 >= dt2
 
 
+class _MergeGroup(dict):
+    """Fires to be merged by FireMerger, along with the 'start', 'end',
+    and 'meta' that the merged fire will have, for comparison with
+    subsequent fires.
+    """
+
+    def __init__(self, f):
+        super().__init__(start=f['start'], end=f['end'], meta=dict(f['meta']))
+        self.fires = [f]
+
+    def add(self, f):
+        self.fires.append(f)
+        self['end'] = f['end']
+        self['meta'].update(f['meta'])
+
 
 class PlumeMerger(BaseFireMerger):
 
@@ -255,27 +297,54 @@ class PlumeMerger(BaseFireMerger):
         return meta
 
     def _sum_data(self, fires, field):
-        data = fires[0][field]
+        """Sums the fires' data, equivalently to folding them with
+        BaseFireMerger._sum_data, but in place, rather than copying
+        the accumulated data with each fire.
+        """
+        if len(fires) == 1:
+            return fires[0][field]
+
+        # ids of dicts created here, which can be modified in place;
+        # others are the fires' own, and are copied before modifying
+        owned = set()
+        data = dict(fires[0][field])
+        owned.add(id(data))
         for f in fires[1:]:
-            # TODO: make sure the recursive call in
-            #    BaseFireMerger._sum_data calls itself
-            #    and not PlumeMerger._sum_data
-            data = super()._sum_data(data, f[field])
+            self._add_data(data, f[field], owned)
         return data
 
+    def _add_data(self, summed_data, data, owned):
+        for k, v in data.items():
+            if k not in summed_data:
+                summed_data[k] = v
+            # as in BaseFireMerger._sum_data, we know that both values
+            # will be either numeric or dicts
+            elif isinstance(v, dict):
+                if id(summed_data[k]) not in owned:
+                    summed_data[k] = dict(summed_data[k])
+                    owned.add(id(summed_data[k]))
+                self._add_data(summed_data[k], v, owned)
+            else:
+                summed_data[k] = summed_data[k] + v
+
     def _merge_plumerise(self, fires):
+        # index fires by hour in one pass, rather than scanning
+        # all fires for each hour
+        fires_by_dt = defaultdict(lambda: [])
+        for f in fires:
+            for dt in f.plumerise:
+                if dt in f.timeprofiled_emissions:
+                    fires_by_dt[dt].append(f)
+            # else, f has no emissions for that hour
+
         plumerise = {}
-        for dt in set.union(*[set(f['plumerise'].keys()) for f in fires]):
-            fires_with_dt = [f for f in fires
-                if dt in f.plumerise and dt in f.timeprofiled_emissions]
-            if fires_with_dt:
-                if len(fires_with_dt) == 1:
-                    # Use the plumerise data from the one fire that has
-                    # data for this hour
-                    plumerise[dt] = fires_with_dt[0].plumerise[dt]
-                else:
-                    plumerise[dt] = self._merge_plumerise_hour(fires_with_dt, dt)
-            # else, no fires have plumerise for that hour
+        for dt, fires_with_dt in fires_by_dt.items():
+            if len(fires_with_dt) == 1:
+                # Use the plumerise data from the one fire that has
+                # data for this hour
+                plumerise[dt] = fires_with_dt[0].plumerise[dt]
+            else:
+                plumerise[dt] = self._merge_plumerise_hour(fires_with_dt, dt)
 
         return plumerise
 
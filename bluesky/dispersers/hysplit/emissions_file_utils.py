@@ -1,6 +1,8 @@
 import datetime
 import logging
 
+import numpy
+
 from .hysplit_utils import DUMMY_PLUMERISE_HOUR
 from .. import GRAMS_PER_TON, SQUARE_METERS_PER_ACRE
 
@@ -154,3 +156,174 @@ def _reduce_and_reallocate_vertical_levels(plumerise_hour, reduction_factor):
             fractions = [f * factor for f in fractions[:-1]] + [0]
 
     return heights, fractions
+
+
+##
+## Vectorized EMISS.CFG rows
+##
+
+def get_emissions_rows_arrays(fires, dts, config, reduction_factor,
+        num_quantiles):
+    """Computes the EMISS.CFG rows for all fires and hours at once.
+
+    Returns a tuple (rows, dummy), where rows is a numpy array of shape
+    (num_hours, num_fires, num_rows, 4) -- the last axis holding height,
+    pm25, area, and heat, in the order written to the emissions file --
+    and dummy is a boolean array of shape (num_hours, num_fires).
+
+    The values are identical to those produced by calling
+    get_emissions_rows_data for each fire and hour. Returns None if any
+    plumerise hour doesn't have exactly num_quantiles levels, in which
+    case the caller should fall back to get_emissions_rows_data.
+    """
+    num_hours = len(dts)
+    num_fires = len(fires)
+    num_levels = num_quantiles + 1
+
+    heights = numpy.empty((num_hours, num_fires, num_levels))
+    fractions = numpy.empty((num_hours, num_fires, num_quantiles))
+    smolder_fractions = numpy.empty((num_hours, num_fires))
+    pm25_emitted = numpy.zeros((num_hours, num_fires))
+    hourly_area = numpy.zeros((num_hours, num_fires))
+    dummy = numpy.zeros((num_hours, num_fires), dtype=bool)
+
+    # The local datetime keys only depend on the utc offset, which is
+    # shared by most fires
+    local_dt_keys = {}
+    for f_idx, fire in enumerate(fires):
+        if fire.utc_offset not in local_dt_keys:
+            local_dt_keys[fire.utc_offset] = [
+                (dt + datetime.timedelta(hours=fire.utc_offset)).strftime(
+                    '%Y-%m-%dT%H:%M:%S') for dt in dts
+            ]
+        keys = local_dt_keys[fire.utc_offset]
+        has_data = bool(fire.plumerise and fire.timeprofiled_emissions
+            and fire.timeprofiled_area)
+        for h_idx, local_dt in enumerate(keys):
+            plumerise_hour = has_data and fire.plumerise.get(local_dt)
+            timeprofiled_emissions_hour = (has_data
+                and fire.timeprofiled_emissions.get(local_dt))
+            area = has_data and fire.timeprofiled_area.get(local_dt)
+            if not (plumerise_hour and timeprofiled_emissions_hour and area):
+                plumerise_hour = DUMMY_PLUMERISE_HOUR
+                dummy[h_idx, f_idx] = True
+            else:
+                pm25_emitted[h_idx, f_idx] = timeprofiled_emissions_hour.get(
+                    'PM2.5', 0.0)
+                hourly_area[h_idx, f_idx] = area
+
+            if (len(plumerise_hour['heights']) != num_levels or
+                    len(plumerise_hour['emission_fractions']) != num_quantiles):
+                return None
+
+            heights[h_idx, f_idx] = plumerise_hour['heights']
+            fractions[h_idx, f_idx] = plumerise_hour['emission_fractions']
+            smolder_fractions[h_idx, f_idx] = plumerise_hour['smolder_fraction']
+
+    if dummy.any():
+        logging.debug("%d of %d fire hours have no emissions",
+            dummy.sum(), dummy.size)
+
+    area_meters, pm25_entrained, pm25_injected = _get_emissions_params_arrays(
+        pm25_emitted, smolder_fractions, hourly_area, dummy, config)
+    level_heights, level_fractions = _reduce_and_reallocate_vertical_levels_arrays(
+        heights, fractions, reduction_factor)
+
+    # See _compute_emissions_rows_data
+    if level_heights.shape[-1] == 1:
+        pm25_injected = pm25_injected + pm25_entrained
+        pm25_entrained = numpy.zeros_like(pm25_entrained)
+
+    num_rows = level_heights.shape[-1] + 1
+    rows = numpy.zeros((num_hours, num_fires, num_rows, 4))
+    rows[:, :, 0, 0] = config("SMOLDER_HEIGHT")
+    rows[:, :, 0, 1] = pm25_injected
+    rows[:, :, 1:, 0] = numpy.where(dummy[..., None], 0.0, level_heights)
+    rows[:, :, 1:, 1] = numpy.where(dummy[..., None], 0.0,
+        pm25_entrained[..., None] * level_fractions)
+    rows[:, :, :, 2] = area_meters[..., None]
+    # heat (last column) is always 0.0
+
+    return rows, dummy
+
+def _get_emissions_params_arrays(pm25_emitted, smolder_fractions,
+        hourly_area, dummy, config):
+    """Array version of _get_emissions_params, preserving the order of
+    floating point operations so that results are identical
+    """
+    area_meters = hourly_area * SQUARE_METERS_PER_ACRE
+    pm25_emitted = pm25_emitted * GRAMS_PER_TON
+    if config("USE_CONST_SMOLDERING_FRACTION"):
+        smolder_fractions = numpy.full_like(smolder_fractions,
+            config("SMOLDERING_FRACTION_CONST"))
+    pm25_injected = pm25_emitted * smolder_fractions
+    pm25_entrained = pm25_emitted * (1.0 - smolder_fractions)
+
+    area_meters[dummy] = 0.0
+    pm25_injected[dummy] = 0.0
+    pm25_entrained[dummy] = 0.0
+
+    return area_meters, pm25_entrained, pm25_injected
+
+def _reduce_and_reallocate_vertical_levels_arrays(heights, fractions,
+        reduction_factor):
+    """Array version of _reduce_and_reallocate_vertical_levels, operating
+    on the last axis of heights and fractions.
+
+    Fractions are summed sequentially, rather than with numpy.sum (which
+    uses pairwise summation), so that results are identical to python's sum
+    """
+    num_quantiles = fractions.shape[-1]
+    level_heights = []
+    level_fractions = []
+    for level in range(0, num_quantiles, reduction_factor):
+        upper_height = heights[..., min(level + reduction_factor, num_quantiles)]
+        if reduction_factor == 1:
+            level_heights.append((heights[..., level] + upper_height) / 2.0)
+        else:
+            level_heights.append(upper_height)
+
+        f = fractions[..., level]
+        for i in range(level + 1, min(level + reduction_factor, num_quantiles)):
+            f = f + fractions[..., i]
+        level_fractions.append(f)
+
+    level_heights = numpy.stack(level_heights, axis=-1)
+    level_fractions = numpy.stack(level_fractions, axis=-1)
+
+    num_levels = level_fractions.shape[-1]
+    if num_levels > 1:
+        top = level_fractions[..., -1:]
+        all_in_top = top == 1
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            factor = 1 / (1 - top)
+            level_fractions = numpy.where(all_in_top,
+                1 / (num_levels - 1), level_fractions * factor)
+        level_fractions[..., -1] = 0
+
+    return level_heights, level_fractions
+
+def format_emissions_hour(dt_str, min_dur_strs, num_sources, lats, lngs, rows):
+    """Formats one timestep of EMISS.CFG, including the header line, with a
+    single format operation.
+
+    args:
+     - dt_str -- 'YY MM DD HH' string for the hour
+     - min_dur_strs -- 'MM DUR_HHMM' strings, one per sub-hour interval
+     - num_sources -- number of sources listed in the header
+     - lats, lngs -- arrays of fire latitudes and longitudes
+     - rows -- array of shape (num_fires, num_rows, 4); see
+        get_emissions_rows_arrays
+    """
+    num_fires, num_rows, _ = rows.shape
+    fire_fmt = ''.join([
+        "{} {} %8.4f %9.4f %6.0f %7.2f %7.2f %15.2f\n".format(dt_str, m) * num_rows
+        for m in min_dur_strs
+    ])
+    hour_fmt = "{} {:02d} {:04d}\n".format(dt_str, 1, num_sources) + fire_fmt * num_fires
+
+    values = numpy.empty((num_fires, len(min_dur_strs), num_rows, 6))
+    values[..., 0] = lats[:, None, None]
+    values[..., 1] = lngs[:, None, None]
+    values[..., 2:] = rows[:, None, :, :]
+    return hour_fmt % tuple(values.ravel().tolist())
@@ -53,16 +53,23 @@ import shutil
 # import tarfile
 import threading
 import datetime
+import concurrent.futures
 
+import numpy
 from afdatetime.parsing import parse_datetime
 
 from bluesky import io
 from bluesky.config import Config
+from bluesky.exceptions import BlueSkyConfigurationError
 from bluesky.models.fires import Fire
 from .. import DispersionBase
 
-from . import hysplit_utils
-from .emissions_file_utils import get_emissions_rows_data
+from . import hysplit_utils, tranche_merge
+from .emissions_file_utils import (
+    format_emissions_hour,
+    get_emissions_rows_arrays,
+    get_emissions_rows_data
+)
 from .emissionssplit import EmissionsSplitter
 from .parthin import Parthinner
 
@@ -148,6 +155,15 @@ def _get_binaries(config_getter):
             or d['default'])
     return binaries
 
+def _run_tranche(runner, config_snapshot, fires, working_dir, tranche_num):
+    """Runs one HYSPLIT tranche in a worker process. Returns the
+    parinit flags recorded by the run, since changes to the runner
+    aren't seen by the parent process.
+    """
+    Config().restore(config_snapshot)
+    runner._run_process(fires, working_dir, tranche_num)
+    return runner._has_parinit
+
 class HYSPLITDispersion(DispersionBase):
     """ HYSPLIT Dispersion model
 
@@ -337,7 +353,30 @@ class HYSPLITDispersion(DispersionBase):
         self._num_processes = hysplit_utils.compute_num_processes(
             len(self._fire_sets), **tranching_config)
 
+    TRANCHE_EXECUTION_MODES = ('threads', 'processes')
+
     def _run_parallel(self, working_dir):
+        # Note: set TRANCHING_STRATEGY to 'emissions' to balance tranches
+        #  by estimated cost rather than by number of fires
+
+        fire_tranches = hysplit_utils.create_fire_tranches(self._fire_sets,
+            self._num_processes, self._model_start, self._num_hours,
+            self._grid_params)
+
+        tranche_execution = (self.config("TRANCHE_EXECUTION") or 'threads').lower()
+        if tranche_execution not in self.TRANCHE_EXECUTION_MODES:
+            raise BlueSkyConfigurationError(
+                "Invalid hysplit tranche execution mode: {}".format(
+                tranche_execution))
+
+        if tranche_execution == 'processes':
+            self._run_tranches_in_processes(fire_tranches, working_dir)
+        else:
+            self._run_tranches_in_threads(fire_tranches, working_dir)
+
+        self._merge_tranche_output(working_dir)
+
+    def _run_tranches_in_threads(self, fire_tranches, working_dir):
         runner = self
         class T(threading.Thread):
             def  __init__(self, fires, config, working_dir, tranche_num):
@@ -353,21 +392,15 @@ class HYSPLITDispersion(DispersionBase):
             def run(self):
                 # We need to set config to what was loaded in the main thread.
                 # Otherwise, we'll just be using defaults
-                Config().set(self.config)
+                Config().restore(self.config)
                 try:
                     runner._run_process(self.fires, self.working_dir,
                         self.tranche_num)
                 except Exception as e:
                     self.exc = e
 
-        # TODO: consider emissions when tranching in order to allocate
-        #  emissions equally (as much as possible)
-
-        fire_tranches = hysplit_utils.create_fire_tranches(self._fire_sets,
-            self._num_processes, self._model_start, self._num_hours,
-            self._grid_params)
         threads = []
-        main_thread_config = Config().get()
+        main_thread_config = Config().snapshot()
         for nproc in range(len(fire_tranches)):
             fires = fire_tranches[nproc]
             # Note: no need to set _context.basedir; it will be set to workdir
@@ -386,6 +419,78 @@ class HYSPLITDispersion(DispersionBase):
         if exc:
             raise exc
 
+    def _run_tranches_in_processes(self, fire_tranches, working_dir):
+        """Runs each tranche in its own worker process, so that writing the
+        CONTROL, SETUP.CFG, and EMISS.CFG files isn't serialized by the GIL.
+
+        Each worker is passed a copy of this object, stripped of the full
+        set of fires, along with the tranche's fires and a snapshot of the
+        main thread's config.
+        """
+        max_workers = self._get_max_tranche_processes(len(fire_tranches))
+        logging.info("Running %d HYSPLIT tranches in up to %d processes",
+            len(fire_tranches), max_workers)
+
+        config_snapshot = Config().snapshot()
+        tranche_runner = copy.copy(self)
+        tranche_runner._fires = None
+        tranche_runner._fire_sets = None
+        tranche_runner._has_parinit = []
+
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=max_workers) as executor:
+            futures = []
+            for nproc, fires in enumerate(fire_tranches):
+                tranche_working_dir = os.path.join(working_dir, str(nproc))
+                if not os.path.exists(tranche_working_dir):
+                    os.makedirs(tranche_working_dir)
+                logging.info("Submitting HYSPLIT process to run on %d "
+                    "fires." % (len(fires)))
+                futures.append(executor.submit(_run_tranche, tranche_runner,
+                    config_snapshot, fires, tranche_working_dir, nproc))
+
+            # As with threads, if there were any exceptions, raise one of
+            # them after all tranches have completed
+            exc = None
+            for f in futures:
+                try:
+                    self._has_parinit.extend(f.result())
+                except Exception as e:
+                    exc = e
+            if exc:
+                raise exc
+
+    def _get_max_tranche_processes(self, num_tranches):
+        max_processes = self.config("MAX_TRANCHE_PROCESSES")
+        if not max_processes or max_processes < 1:
+            num_cores = io.get_num_available_cpus()
+            # Each MPI run uses NCPUS cores
+            ncpus = self.config("NCPUS") if self.config("MPI") else 1
+            max_processes = max(1, num_cores // max(1, ncpus))
+        return min(num_tranches, max_processes)
+
+    TRANCHE_OUTPUT_MERGE_METHODS = ('nco', 'native')
+
+    def _merge_tranche_output(self, working_dir):
+        output_file = os.path.join(working_dir, self._output_file_name)
+
+        merge_method = (self.config("TRANCHE_OUTPUT_MERGE") or 'nco').lower()
+        if merge_method not in self.TRANCHE_OUTPUT_MERGE_METHODS:
+            raise BlueSkyConfigurationError(
+                "Invalid hysplit tranche output merge method: {}".format(
+                merge_method))
+
+        if merge_method == 'native':
+            tranche_merge.sum_tranche_output(
+                [os.path.join(working_dir, str(i), self._output_file_name)
+                    for i in range(self._num_processes)],
+                output_file)
+        else:
+            self._merge_tranche_output_with_nco(working_dir, output_file)
+
+        self._archive_file(output_file)
+
+    def _merge_tranche_output_with_nco(self, working_dir, output_file):
         #  'ttl' is sum of values; see http://nco.sourceforge.net/nco.html#Operation-Types
         # sum together all the PM2.5 fields then append the TFLAG field from
         # one of the individual runs (they're all the same)
@@ -394,8 +499,6 @@ class HYSPLITDispersion(DispersionBase):
         # prevents ncea from adding all the TFLAGs together and mucking up the
         # date
 
-        output_file = os.path.join(working_dir, self._output_file_name)
-
         #ncea_args = ["-y", "ttl", "-O"]
         ncea_args = ["-O","-v","PM25","-y","ttl"]
         ncea_args.extend(["%d/%s" % (i, self._output_file_name) for i in  range(self._num_processes)])
@@ -406,7 +509,6 @@ class HYSPLITDispersion(DispersionBase):
         ncks_args.append("0/%s" % (self._output_file_name))
         ncks_args.append(output_file)
         io.SubprocessExecutor().execute(self.BINARIES['NCKS'], *ncks_args, cwd=working_dir)
-        self._archive_file(output_file)
 
     def _run_process(self, fires, working_dir, tranche_num=None):
         hysplit_utils.ensure_tranch_has_dummy_fire(fires, self._model_start,
@@ -649,6 +751,53 @@ class HYSPLITDispersion(DispersionBase):
             os.path.join(working_dir, 'TERRAIN.ASC'))
 
     def _write_emissions(self, fires, emissions_file):
+        """Writes EMISS.CFG, computing the rows for all hours and fires
+        as arrays and formatting each hour's block at once.
+
+        Falls back to writing row by row if any fire's plumerise data
+        doesn't have the expected number of vertical levels. Both methods
+        produce identical files.
+        """
+        dts = [self._model_start + datetime.timedelta(hours=hour)
+            for hour in range(self._num_hours)]
+        r = get_emissions_rows_arrays(fires, dts, self.config,
+            self._reduction_factor, self.NQUANTILES)
+        if r is None:
+            logging.debug("Irregular plumerise data; writing emissions "
+                "file row by row")
+            return self._write_emissions_by_row(fires, emissions_file)
+
+        rows, dummy = r
+        min_dur_strs = self._get_min_dur_strs()
+        num_heights = self.num_output_quantiles + 1
+        num_sources = len(fires) * num_heights * self._SERI
+        lats = numpy.array([fire.latitude for fire in fires], dtype=float)
+        lngs = numpy.array([fire.longitude for fire in fires], dtype=float)
+
+        with open(emissions_file, "w") as emis:
+            # HYSPLIT skips past the first two records, so these are for comment purposes only
+            emis.write("emissions group header: YYYY MM DD HH QINC NUMBER\n")
+            emis.write("each emission's source: YYYY MM DD HH MM DUR_HHMM LAT LON HT RATE AREA HEAT\n")
+
+            for hour, dt in enumerate(dts):
+                emis.write(format_emissions_hour(dt.strftime("%y %m %d %H"),
+                    min_dur_strs, num_sources, lats, lngs, rows[hour]))
+
+                self._fires_wo_emissions = int(dummy[hour].sum())
+                if self._fires_wo_emissions > 0:
+                    logging.debug("%d of %d fires had no emissions for hour %d",
+                        self._fires_wo_emissions, len(fires), hour)
+
+    def _get_min_dur_strs(self):
+        """Returns the 'MM DUR_HHMM' strings for each sub-hour interval
+        """
+        if self._SERI == 1:
+            return ["00 0100"]
+        minutes_per_interval = int(60/self._SERI)
+        return ["{:0>2}".format(i*minutes_per_interval) + " 00"
+            + "{:0>2}".format(minutes_per_interval) for i in range(self._SERI)]
+
+    def _write_emissions_by_row(self, fires, emissions_file):
         # A value slightly above ground level at which to inject smoldering
         # emissions into the model.
 
@@ -8,6 +8,7 @@ TODO: refactor this as a class
 __author__ = "Joel Dubowy and Sonoma Technology, Inc."
 
 import datetime
+import heapq
 import logging
 import math
 from functools import reduce
@@ -20,6 +21,7 @@ from bluesky.config import Config
 __all__ = [
     'create_fire_sets',
     'create_fire_tranches',
+    'estimate_fire_set_costs',
     'compute_num_processes',
     'ensure_tranch_has_dummy_fire',
     'get_grid_params'
@@ -47,17 +49,45 @@ def create_fire_sets(fires):
     """
     return  [[f] for f in fires]
 
+TRANCHING_STRATEGIES = ('fire_count', 'emissions')
+
 def create_fire_tranches(fire_sets, num_processes, model_start, num_hours,
         grid_params):
     """Creates tranches of FireLocationData, each tranche to be processed by its
     own HYSPLIT process.
 
-    @todo: More sophisticated tranching (e.g. taking into account acreage,
-    location, etc.; to keep the number of fires in each tranche as close
-    as possible to to # fires / # tranches).
+    How fire sets are allocated to tranches depends on the
+    'TRANCHING_STRATEGY' config setting:
+
+     - 'fire_count' (default) -- keeps the number of fire sets in each
+       tranche as close as possible to # fire sets / # tranches
+     - 'emissions' -- balances tranches by estimated HYSPLIT cost; see
+       estimate_fire_set_costs and allocate_fire_sets_by_cost
     """
     fill_in_dummy_fires(fire_sets, num_processes, model_start, num_hours,
         grid_params)
+
+    strategy = (config('TRANCHING_STRATEGY') or 'fire_count').lower()
+    if strategy not in TRANCHING_STRATEGIES:
+        raise BlueSkyConfigurationError(
+            "Invalid hysplit tranching strategy: {}".format(strategy))
+
+    if strategy == 'emissions':
+        tranche_fire_sets = allocate_fire_sets_by_cost(fire_sets, num_processes)
+    else:
+        tranche_fire_sets = allocate_fire_sets_by_count(fire_sets, num_processes)
+
+    fire_tranches = []
+    for nproc, tranche in enumerate(tranche_fire_sets):
+        logging.debug("Process %d:  %d fire sets" % (nproc, len(tranche)))
+        fires = reduce(lambda x,y: x + y, tranche)
+        fire_tranches.append(fires)
+    return fire_tranches
+
+def allocate_fire_sets_by_count(fire_sets, num_processes):
+    """Splits fire sets, in order, into num_processes tranches of as
+    equal size as possible.
+    """
     n_sets = len(fire_sets)
     #num_processes = min(n_sets, num_processes)  # just to be sure
     min_n_fire_sets_per_process = n_sets // num_processes
@@ -72,17 +102,79 @@ def create_fire_tranches(fire_sets, num_processes, model_start, num_hours,
             extra_fire_cutoff, min_n_fire_sets_per_process+1))
 
     idx = 0
-    fire_tranches = []
+    tranches = []
     for nproc in range(num_processes):
         s = idx
         idx += min_n_fire_sets_per_process
         if nproc < extra_fire_cutoff:
             idx += 1
-        tranche_fire_sets = fire_sets[s:idx]
-        logging.debug("Process %d:  %d fire sets" % (nproc, len(tranche_fire_sets)))
-        fires = reduce(lambda x,y: x + y, tranche_fire_sets)
-        fire_tranches.append(fires)
-    return fire_tranches
+        tranches.append(fire_sets[s:idx])
+    return tranches
+
+def allocate_fire_sets_by_cost(fire_sets, num_processes):
+    """Allocates fire sets to num_processes tranches using greedy
+    longest-processing-time bin packing: fire sets are considered in
+    descending order of estimated cost, each one going to the tranche with
+    the lowest total cost so far. Ties are broken by number of fire sets, so
+    that every tranche gets at least one fire set if there are enough.
+
+    Within each tranche, fire sets keep their original relative order.
+    """
+    costs = estimate_fire_set_costs(fire_sets)
+    order = sorted(range(len(fire_sets)), key=lambda i: -costs[i])
+
+    # (total cost, num fire sets, tranche index)
+    heap = [(0.0, 0, nproc) for nproc in range(num_processes)]
+    assignments = [[] for nproc in range(num_processes)]
+    for i in order:
+        cost, n, nproc = heapq.heappop(heap)
+        assignments[nproc].append(i)
+        heapq.heappush(heap, (cost + costs[i], n + 1, nproc))
+
+    logging.info("Running %d HYSPLIT Dispersion model processes "
+        "on %d fires (i.e. events), balanced by estimated cost",
+        num_processes, len(fire_sets))
+    for cost, n, nproc in sorted(heap, key=lambda e: e[2]):
+        logging.info(" - process %d: %d fires, estimated cost %.2f",
+            nproc, n, cost)
+
+    return [[fire_sets[i] for i in sorted(a)] for a in assignments]
+
+def estimate_fire_set_costs(fire_sets):
+    """Returns the estimated HYSPLIT cost of each fire set.
+
+    The number of particle releases is roughly proportional to the number
+    of source-hours -- emitting hours x plume heights with emissions. With
+    adaptive NUMPAR, it also scales with mass. So, each fire set's
+    source-hours are weighted by its PM2.5 relative to the mean PM2.5
+    across all fire sets:
+
+        cost = source_hours * (1 + pm25 / mean_pm25)
+    """
+    stats = [_get_fire_set_stats(fire_set) for fire_set in fire_sets]
+    total_pm25 = sum(pm25 for source_hours, pm25 in stats)
+    mean_pm25 = total_pm25 / len(stats) if stats else 0.0
+    return [
+        source_hours * (1 + (pm25 / mean_pm25 if mean_pm25 > 0 else 0.0))
+        for source_hours, pm25 in stats
+    ]
+
+def _get_fire_set_stats(fire_set):
+    source_hours = 0
+    pm25 = 0.0
+    for fire in fire_set:
+        if fire.get('is_dummy'):
+            continue
+        plumerise = fire.get('plumerise') or {}
+        for dt, e in (fire.get('timeprofiled_emissions') or {}).items():
+            hour_pm25 = e.get('PM2.5') or 0.0
+            if hour_pm25 <= 0:
+                continue
+            pm25 += hour_pm25
+            fractions = (plumerise.get(dt) or {}).get('emission_fractions') or []
+            # plus one for the smoldering emissions
+            source_hours += 1 + len([f for f in fractions if f])
+    return source_hours, pm25
 
 def compute_num_processes(num_fire_sets, **tranching_config):
     """Determines number of HYSPLIT tranches given the number of fires sets
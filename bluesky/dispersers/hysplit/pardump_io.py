@@ -16,24 +16,45 @@ big-endian Fortran unformatted sequential binary:
 Each Fortran record is wrapped with 4-byte length markers at both ends.
 
 PARINIT files contain a single header + particle block. PARDUMP files
-concatenate one or more such blocks; this module only handles the
-single-block form used by PARINIT.
+concatenate one or more such blocks.
+
+Two interfaces are provided:
+
+  read_parinit / write_parinit -- the original single-block reader/writer,
+      returning particles as a list of (mass, pos, meta) byte tuples.
+  read_particle_blocks / write_particle_blocks -- multi-block reader/writer
+      built on numpy.memmap. Every time block is indexed, and its particles
+      are exposed as a numpy structured array (one element per particle,
+      length markers included) mapped directly onto the file, so that
+      files with tens of millions of particles can be processed without
+      reading them into memory.
 """
 
 __author__ = "Stuart Illson"
 
+import collections
+import os
 import struct
 
+import numpy
+
 __all__ = [
     'read_parinit',
     'write_parinit',
     'particle_total_mass',
+    'ParticleBlock',
+    'read_particle_blocks',
+    'write_particle_blocks',
+    'particle_masses',
 ]
 
 # Big-endian 7-int header: numpar, numpol, yr, mo, da, hr, mn
 HEADER_FMT = ">iiiiiii"
 HEADER_SIZE = struct.calcsize(HEADER_FMT)
 
+# Number of particles processed at a time when streaming a block
+CHUNK_SIZE = 1000000
+
 
 def read_parinit(path):
     """Read a PARINIT file.
@@ -84,6 +105,147 @@ def particle_total_mass(mass_bytes, numpol):
     return sum(struct.unpack(">%df" % numpol, mass_bytes))
 
 
+##
+## Multi-block, memory-mapped interface
+##
+
+ParticleBlock = collections.namedtuple('ParticleBlock', ['header', 'particles'])
+ParticleBlock.__doc__ = """One time block of a PARDUMP/PARINIT file.
+
+header is the 7-tuple (numpar, numpol, yr, mo, da, hr, mn), and particles is
+a numpy structured array with fields 'mass' (numpol float32), 'pos'
+(float32) and 'meta' (int32), plus the Fortran record length markers.
+"""
+
+
+def read_particle_blocks(path):
+    """Index every time block in a PARDUMP or PARINIT file.
+
+    Returns a list of ParticleBlock. Particle arrays are read-only views on
+    a numpy.memmap of the file, so nothing is read until accessed.
+
+    Raises ValueError on a truncated or malformed file.
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+
+    mm = numpy.memmap(path, dtype=numpy.uint8, mode='r')
+    blocks = []
+    offset = 0
+    while offset < size:
+        header_data = _record_at(mm, offset, size)
+        if header_data is None or len(header_data) != HEADER_SIZE:
+            raise ValueError("Invalid PARDUMP header at byte %d in %s"
+                % (offset, path))
+        header = struct.unpack(HEADER_FMT, header_data)
+        offset += HEADER_SIZE + 8
+        numpar, numpol = header[0], header[1]
+
+        if numpar > 0:
+            dtype = _particle_dtype(mm, offset, size, numpol, path)
+            if offset + numpar * dtype.itemsize > size:
+                raise ValueError("Truncated particle block at byte %d in %s"
+                    % (offset, path))
+            particles = numpy.ndarray((numpar,), dtype=dtype, buffer=mm,
+                offset=offset)
+            _check_markers(particles, dtype, path)
+            offset += numpar * dtype.itemsize
+        else:
+            particles = numpy.zeros((0,), dtype=_make_particle_dtype(
+                numpol, 0, 0))
+
+        blocks.append(ParticleBlock(header, particles))
+
+    return blocks
+
+
+def write_particle_blocks(path, blocks):
+    """Write a PARDUMP/PARINIT file from a list of (header, particles).
+
+    Each header's numpar is replaced with the number of particles written.
+    particles may be a structured array, as returned by
+    read_particle_blocks, or an iterable of such arrays (e.g. chunks of a
+    thinned block), which are written in turn without being collected in
+    memory.
+    """
+    with open(path, "wb") as f:
+        for header, particles in blocks:
+            chunks = ([particles] if isinstance(particles, numpy.ndarray)
+                else particles)
+            header_offset = f.tell()
+            _write_record(f, struct.pack(HEADER_FMT, *header))
+            numpar = 0
+            for chunk in chunks:
+                f.write(numpy.ascontiguousarray(chunk).tobytes())
+                numpar += len(chunk)
+
+            # Chunks may be generated lazily, so numpar is patched afterwards
+            if numpar != header[0]:
+                end = f.tell()
+                f.seek(header_offset + 4)
+                f.write(struct.pack(">i", numpar))
+                f.seek(end)
+
+
+def particle_masses(particles):
+    """Total pollutant mass (grams) of each particle, as float64."""
+    return particles['mass'].sum(axis=1, dtype=numpy.float64)
+
+
+def _make_particle_dtype(numpol, npos, nmeta):
+    return numpy.dtype([
+        ('mass_head', '>i4'), ('mass', '>f4', (numpol,)), ('mass_tail', '>i4'),
+        ('pos_head', '>i4'), ('pos', '>f4', (npos,)), ('pos_tail', '>i4'),
+        ('meta_head', '>i4'), ('meta', '>i4', (nmeta,)), ('meta_tail', '>i4'),
+    ])
+
+
+def _particle_dtype(mm, offset, size, numpol, path):
+    """Determine the particle record layout from the first particle."""
+    lengths = []
+    for i in range(3):
+        if offset + 4 > size:
+            raise ValueError("Truncated particle record at byte %d in %s"
+                % (offset, path))
+        n = _int_at(mm, offset)
+        if n < 0 or n % 4:
+            raise ValueError("Invalid particle record length %d at byte %d "
+                "in %s" % (n, offset, path))
+        lengths.append(n)
+        offset += n + 8
+
+    if lengths[0] != numpol * 4:
+        raise ValueError("Particle mass record length %d doesn't match "
+            "numpol %d in %s" % (lengths[0], numpol, path))
+
+    return _make_particle_dtype(numpol, lengths[1] // 4, lengths[2] // 4)
+
+
+def _check_markers(particles, dtype, path):
+    for name in ('mass', 'pos', 'meta'):
+        expected = dtype.fields[name][0].itemsize
+        for start in range(0, len(particles), CHUNK_SIZE):
+            chunk = particles[start:start + CHUNK_SIZE]
+            if ((chunk[name + '_head'] != expected).any()
+                    or (chunk[name + '_tail'] != expected).any()):
+                raise ValueError("Inconsistent %s record lengths in %s"
+                    % (name, path))
+
+
+def _int_at(mm, offset):
+    return struct.unpack(">i", mm[offset:offset + 4].tobytes())[0]
+
+
+def _record_at(mm, offset, size):
+    if offset + 4 > size:
+        return None
+    n = _int_at(mm, offset)
+    if n < 0 or offset + n + 8 > size:
+        return None
+    return mm[offset + 4:offset + 4 + n].tobytes()
+
+
 def _read_record(f):
     # Fortran unformatted sequential: [4-byte len][data][4-byte len]
     size_bytes = f.read(4)
@@ -22,12 +22,15 @@ Two modes, configured under 'dispersion.hysplit.parthin':
 
 The two modes are mutually exclusive. With neither set (or 'enabled' false),
 Parthinner.enabled is False and thin() should not be called.
+
+Files are read with pardump_io.read_particle_blocks, and every time block is
+thinned, a chunk of particles at a time, with numpy. Set 'seed' to make
+thin_bins sampling reproducible.
 """
 
 __author__ = "Stuart Illson"
 
-import os
-import random
+import numpy
 
 from bluesky.exceptions import BlueSkyConfigurationError
 
@@ -63,10 +66,10 @@ class Parthinner():
         self._thin_bins = config_getter('parthin', 'thin_bins')
         self._validate_config()
 
-        # A single RNG shared across all files in this run. Thinning is
-        # intentionally non-reproducible between runs; each bsp invocation
-        # seeds from system entropy.
-        self._rng = random.Random()
+        # A single RNG shared across all files in this run. Unless 'seed'
+        # is set, thinning is intentionally non-reproducible between runs;
+        # each bsp invocation seeds from system entropy.
+        self._rng = numpy.random.default_rng(config_getter('parthin', 'seed'))
 
     @property
     def enabled(self):
@@ -75,29 +78,45 @@ class Parthinner():
     def thin(self, src_path, dest_path):
         """Read src_path, drop particles per config, write to dest_path.
 
-        Returns (kept, total).
+        All time blocks in src_path are thinned. Returns (kept, total),
+        summed over blocks.
         """
-        header, particles = pardump_io.read_parinit(src_path)
-        numpol = header[1]
-
-        kept = [p for p in particles if self._keep(p, numpol)]
-        pardump_io.write_parinit(dest_path, header, kept)
-
-        return len(kept), len(particles)
-
-    def _keep(self, particle, numpol):
-        mass = pardump_io.particle_total_mass(particle[0], numpol)
-
+        blocks = pardump_io.read_particle_blocks(src_path)
+        if not blocks:
+            raise ValueError("Invalid PARINIT header in %s" % src_path)
+
+        # Masks are computed up front, at one byte per particle, so that
+        # kept particles can be streamed to dest_path chunk by chunk
+        masks = [self._keep_mask(b.particles) for b in blocks]
+        pardump_io.write_particle_blocks(dest_path, [
+            (b.header, _masked_chunks(b.particles, m))
+                for b, m in zip(blocks, masks)
+        ])
+
+        kept = sum(int(numpy.count_nonzero(m)) for m in masks)
+        total = sum(len(b.particles) for b in blocks)
+        return kept, total
+
+    def _keep_mask(self, particles):
+        mask = numpy.ones(len(particles), dtype=bool)
+        for start in range(0, len(particles), pardump_io.CHUNK_SIZE):
+            chunk = particles[start:start + pardump_io.CHUNK_SIZE]
+            mask[start:start + len(chunk)] = self._keep(
+                pardump_io.particle_masses(chunk))
+        return mask
+
+    def _keep(self, masses):
         if self._min_mass_grams is not None:
-            return mass >= self._min_mass_grams
+            return masses >= self._min_mass_grams
 
         if self._thin_bins is not None:
-            for upper, thin_rate in self._thin_bins:
-                if mass < upper:
-                    return self._rng.random() >= thin_rate
-            return True
+            uppers = numpy.array([b[0] for b in self._thin_bins], dtype=float)
+            # Append a rate of 0 for masses above the highest upper bound
+            thin_rates = numpy.array([b[1] for b in self._thin_bins] + [0.0])
+            bin_idx = numpy.searchsorted(uppers, masses, side='right')
+            return self._rng.random(len(masses)) >= thin_rates[bin_idx]
 
-        return True
+        return numpy.ones(len(masses), dtype=bool)
 
     def _validate_config(self):
         has_min = self._min_mass_grams is not None
@@ -140,9 +159,15 @@ class Parthinner():
             prev_upper = upper
 
 
+def _masked_chunks(particles, mask):
+    for start in range(0, len(particles), pardump_io.CHUNK_SIZE):
+        end = start + pardump_io.CHUNK_SIZE
+        yield particles[start:end][mask[start:end]]
+
+
 def summarize_parinit(path,
         mass_concentration_levels=(0.99, 0.95, 0.90, 0.80, 0.75),
-        mass_thresholds_grams=(0.1, 1.0, 10.0, 100.0)):
+        mass_thresholds_grams=(0.1, 1.0, 10.0, 100.0), block_index=0):
     """Inspect a PARINIT file and return per-particle mass distribution stats.
 
     Useful for debugging and configuring parthin settings.
@@ -157,6 +182,8 @@ def summarize_parinit(path,
      - mass_thresholds_grams -- absolute mass thresholds in grams. For each
         threshold, the result reports the count of particles below it and the
         fraction of total mass they carry.
+     - block_index -- index of the time block to summarize, for PARDUMP
+        files with more than one
 
     Returns a dict:
 
@@ -169,9 +196,10 @@ def summarize_parinit(path,
                                                'mass_fraction'}, ...},
         }
     """
-    header, particles = pardump_io.read_parinit(path)
-    numpol = header[1]
-    masses = [pardump_io.particle_total_mass(p[0], numpol) for p in particles]
+    blocks = pardump_io.read_particle_blocks(path)
+    if not blocks:
+        raise ValueError("Invalid PARINIT header in %s" % path)
+    masses = pardump_io.particle_masses(blocks[block_index].particles)
 
     n = len(masses)
     if n == 0:
@@ -185,55 +213,42 @@ def summarize_parinit(path,
                 "mass_fraction": 0.0} for threshold in mass_thresholds_grams},
         }
 
-    total_mass = sum(masses)
-    masses_asc = sorted(masses)
-    masses_desc = list(reversed(masses_asc))
+    masses_asc = numpy.sort(masses)
+    total_mass = float(masses_asc.sum())
 
-    # Mass concentration: walk heaviest-first, record the count that first
-    # pushes cumulative mass past each target. Levels visited in ascending
-    # order so a single pass suffices.
+    # Mass concentration: the smallest count of heaviest-first particles
+    # whose cumulative mass reaches each target, i.e. the first index into
+    # the (zero-prefixed) heaviest-first cumulative sum that's >= the goal.
+    cumulative_desc = numpy.concatenate(([0.0], numpy.cumsum(masses_asc[::-1])))
     mass_concentration = {}
-    cumulative = 0.0
-    i = 0
     for target in sorted(mass_concentration_levels):
-        goal = target * total_mass
-        while i < n and cumulative < goal:
-            cumulative += masses_desc[i]
-            i += 1
+        i = min(int(numpy.searchsorted(cumulative_desc, target * total_mass,
+            side='left')), n)
         mass_concentration[target] = {
             "particles": i,
             "fraction": i / n,
         }
 
-    # Particles below each absolute threshold. Same ascending pass for all
-    # thresholds, visited in ascending order.
+    # Particles below each absolute threshold
+    cumulative_asc = numpy.concatenate(([0.0], numpy.cumsum(masses_asc)))
     particles_below = {}
-    count = 0
-    mass_below = 0.0
-    j = 0
     for threshold in sorted(mass_thresholds_grams):
-        while j < n and masses_asc[j] < threshold:
-            mass_below += masses_asc[j]
-            count += 1
-            j += 1
+        count = int(numpy.searchsorted(masses_asc, threshold, side='left'))
+        mass_below = float(cumulative_asc[count])
         particles_below[threshold] = {
             "particles": count,
             "fraction": count / n,
             "mass_fraction": mass_below / total_mass if total_mass else 0.0,
         }
 
-    mid = n // 2
-    median = (masses_asc[mid] if n % 2
-        else (masses_asc[mid - 1] + masses_asc[mid]) / 2)
-
     return {
         "total_particles": n,
         "total_mass_grams": total_mass,
         "mass_stats": {
-            "min": masses_asc[0],
-            "max": masses_asc[-1],
+            "min": float(masses_asc[0]),
+            "max": float(masses_asc[-1]),
             "mean": total_mass / n,
-            "median": median,
+            "median": float(numpy.median(masses_asc)),
         },
         "mass_concentration": mass_concentration,
         "particles_below": particles_below,
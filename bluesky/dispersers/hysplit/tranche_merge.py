@@ -0,0 +1,140 @@
+"""bluesky.dispersers.hysplit.tranche_merge
+
+In-process alternative to merging tranched HYSPLIT NetCDF output with
+NCO's ncea and ncks, i.e.
+
+    ncea -O -v PM25 -y ttl 0/hysplit_conc.nc 1/hysplit_conc.nc ... hysplit_conc.nc
+    ncks -A -v TFLAG 0/hysplit_conc.nc hysplit_conc.nc
+
+The summed variable is read and written one time-slab (i.e. one index of
+its first dimension) at a time, so that peak memory is bounded by a single
+slab per tranche file rather than by the size of the files.
+
+As with NCO:
+ - the output has the dimensions, global attributes, and variable
+   attributes of the first input file
+ - values equal to a variable's _FillValue / missing_value are skipped
+   when summing, and the result is missing only where all inputs are
+ - float values are summed in double precision and then stored in the
+   variable's own type
+ - an entry is prepended to the 'history' global attribute
+"""
+
+__author__ = "Joel Dubowy"
+
+import datetime
+import logging
+
+from bluesky.exceptions import BlueSkyConfigurationError
+
+__all__ = [
+    'sum_tranche_output'
+]
+
+
+def sum_tranche_output(input_files, output_file, sum_variable='PM25',
+        copy_variables=('TFLAG',)):
+    """Sums sum_variable across input_files, and copies copy_variables from
+    the first input file, writing the results to output_file.
+    """
+    try:
+        import netCDF4
+        import numpy
+    except ImportError:
+        raise BlueSkyConfigurationError(
+            "Merging HYSPLIT tranche output natively requires netCDF4. "
+            "Install it with: pip install netCDF4")
+
+    if not input_files:
+        raise ValueError("No tranche output files to merge")
+
+    logging.info("Summing %s in %d tranche output files", sum_variable,
+        len(input_files))
+
+    srcs = [netCDF4.Dataset(f) for f in input_files]
+    try:
+        first = srcs[0]
+        for src, f in zip(srcs, input_files):
+            if sum_variable not in src.variables:
+                raise ValueError("{} not in {}".format(sum_variable, f))
+            if src.variables[sum_variable].shape != first.variables[sum_variable].shape:
+                raise ValueError("Shape of {} in {} doesn't match {}".format(
+                    sum_variable, f, input_files[0]))
+
+        with netCDF4.Dataset(output_file, 'w',
+                format=first.data_model) as dest:
+            _copy_global_attributes(first, dest, input_files)
+
+            var_names = [sum_variable] + [v for v in copy_variables
+                if v in first.variables]
+            for var_name in var_names:
+                _create_variable(first, dest, var_name)
+
+            _sum_variable(numpy, srcs, dest, sum_variable)
+
+            for var_name in var_names[1:]:
+                dest.variables[var_name][:] = first.variables[var_name][:]
+
+    finally:
+        for src in srcs:
+            src.close()
+
+
+def _copy_global_attributes(src, dest, input_files):
+    attrs = {a: src.getncattr(a) for a in src.ncattrs()}
+    history = "{}: bluesky tranche merge: sum of {} files".format(
+        datetime.datetime.now().strftime('%a %b %d %H:%M:%S %Y'),
+        len(input_files))
+    if attrs.get('history'):
+        history = history + '\n' + attrs['history']
+    attrs['history'] = history
+    dest.setncatts(attrs)
+
+
+def _create_variable(src, dest, var_name):
+    src_var = src.variables[var_name]
+    for dim_name in src_var.dimensions:
+        if dim_name not in dest.dimensions:
+            dim = src.dimensions[dim_name]
+            dest.createDimension(dim_name,
+                None if dim.isunlimited() else len(dim))
+
+    attrs = {a: src_var.getncattr(a) for a in src_var.ncattrs()}
+    fill_value = attrs.pop('_FillValue', None)
+    kwargs = {}
+    filters = src_var.filters() or {}
+    if filters.get('zlib'):
+        kwargs.update(zlib=True, complevel=filters.get('complevel', 4),
+            shuffle=filters.get('shuffle', False))
+    chunking = src_var.chunking()
+    if chunking and chunking != 'contiguous':
+        kwargs['chunksizes'] = chunking
+
+    dest_var = dest.createVariable(var_name, src_var.dtype,
+        src_var.dimensions, fill_value=fill_value, **kwargs)
+    dest_var.setncatts(attrs)
+
+
+def _sum_variable(numpy, srcs, dest, var_name):
+    dest_var = dest.variables[var_name]
+    src_vars = [src.variables[var_name] for src in srcs]
+    is_float = numpy.issubdtype(dest_var.dtype, numpy.floating)
+    acc_dtype = numpy.float64 if is_float else numpy.int64
+
+    num_slabs = src_vars[0].shape[0] if src_vars[0].ndim else 1
+    for i in range(num_slabs):
+        idx = i if src_vars[0].ndim else slice(None)
+        total = None
+        valid = None
+        for src_var in src_vars:
+            slab = numpy.ma.asarray(src_var[idx])
+            slab_valid = ~numpy.ma.getmaskarray(slab)
+            slab = slab.filled(0).astype(acc_dtype)
+            if total is None:
+                total, valid = slab, slab_valid
+            else:
+                numpy.add(total, slab, out=total)
+                numpy.logical_or(valid, slab_valid, out=valid)
+
+        dest_var[idx] = numpy.ma.masked_array(total.astype(dest_var.dtype),
+            mask=~valid)
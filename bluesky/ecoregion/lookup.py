@@ -4,11 +4,14 @@ Note: This code was originally copied from BlueSky Framework, but it has
 been modified significantly.
 """
 
+import functools
 import logging
 import os
 
 #import shapefile
 import fiona
+import numpy
+import shapely
 from osgeo import ogr
 from shapely import geometry
 
@@ -24,6 +27,18 @@ __all__ = ['lookup']
 ECOREGION_SHAPEFILE = os.path.join(os.path.dirname(__file__), 'data', '3ecoregions.shp')
 # ACCEPTED_VALUES = ["western","southern","boreal"]
 
+NEARBY_DELTA = 0.01
+NEARBY_OFFSETS = [
+    (NEARBY_DELTA, 0),              # N
+    (NEARBY_DELTA, NEARBY_DELTA),   # NE
+    (0, NEARBY_DELTA),              # E
+    (-NEARBY_DELTA, NEARBY_DELTA),  # SE
+    (-NEARBY_DELTA, 0),             # S
+    (-NEARBY_DELTA, -NEARBY_DELTA), # SW
+    (0, -NEARBY_DELTA),             # W
+    (NEARBY_DELTA, -NEARBY_DELTA),  # NW
+]
+
 
 class EcoregionLookup():
 
@@ -35,6 +50,7 @@ class EcoregionLookup():
         except AttributeError:
             raise BlueSkyConfigurationError(
                 "Invalid ecoregion lookup implementation: %s", implementation)
+        self._implementation = implementation
         self._try_nearby = try_nearby
         self._input = None # instantiate when necessary
 
@@ -64,18 +80,39 @@ class EcoregionLookup():
 
         return ecoregion
 
+    def lookup_many(self, points):
+        """Looks up ecoregions for a list of (lat, lng) tuples, returning
+        a list of ecoregions, with None for any point not in an ecoregion
+
+        With the 'strtree' implementation, all points (and, if configured,
+        the nearby locations of those not found) are looked up in a single
+        vectorized query. Otherwise, each point is looked up individually.
+        """
+        for lat, lng in points:
+            self._validate_lat_lng(lat, lng)
+
+        if self._implementation != 'strtree':
+            return [self.lookup(lat, lng) for lat, lng in points]
+
+        ecoregions = _query_strtree_index(points)
+        if self._try_nearby:
+            missing = [i for i, e in enumerate(ecoregions) if not e]
+            if missing:
+                logging.debug("Looking up ecoregion nearby %s locations",
+                    len(missing))
+                nearby = _query_strtree_index([
+                    (points[i][0] + dlat, points[i][1] + dlng)
+                        for i in missing for dlat, dlng in NEARBY_OFFSETS
+                ])
+                n = len(NEARBY_OFFSETS)
+                for j, i in enumerate(missing):
+                    ecoregions[i] = next((e for e in nearby[j*n:(j+1)*n] if e),
+                        None)
+
+        return ecoregions
+
     def _lookup_nearby(self, lat, lng):
-        delta = 0.01
-        locs = [
-            (lat + delta, lng),         # N
-            (lat + delta, lng + delta), # NE
-            (lat, lng + delta),         # E
-            (lat - delta, lng + delta), # SE
-            (lat - delta, lng),         # S
-            (lat - delta, lng - delta), # SW
-            (lat, lng - delta),         # W
-            (lat + delta, lng - delta), # NW
-        ]
+        locs = [(lat + dlat, lng + dlng) for dlat, dlng in NEARBY_OFFSETS]
         logging.debug("Looking up ecoregion nearby %s, %s - %s", lat, lng, locs)
         for _lat, _lng in locs:
             try:
@@ -136,3 +173,46 @@ class EcoregionLookup():
             polygon = shape.GetGeometryRef()
             if polygon.Contains(point):
                 return shape.GetFieldAsString(field_index)
+
+    ## STRtree
+
+    def _lookup_ecoregion_strtree(self, lat, lng):
+        """Looks up ecoregion from lat/lng using a shapely STRtree index of
+        the ecoregion polygons, which is built once per process
+
+        Note: If a fire's location is defined as a polygon, it's the calling
+          code's responsibility to pick a representative lat/lng.
+        """
+        self._validate_lat_lng(lat, lng)
+        return _query_strtree_index([(lat, lng)])[0]
+
+
+@functools.lru_cache(maxsize=None)
+def _load_strtree_index():
+    with fiona.open(ECOREGION_SHAPEFILE) as shapes:
+        records = [(geometry.shape(s['geometry']), s['properties']['DOMAIN'])
+            for s in shapes]
+    polygons = [r[0] for r in records]
+    domains = numpy.array([r[1] for r in records], dtype=object)
+    return shapely.STRtree(polygons), domains
+
+def _query_strtree_index(points):
+    """Returns the ecoregion of each (lat, lng) in points, or None.
+
+    As with the linear scan of the 'shapely' implementation, a point on
+    a polygon's boundary isn't considered to be in it, and a point in
+    more than one polygon is given the ecoregion of the first.
+    """
+    if not points:
+        return []
+    tree, domains = _load_strtree_index()
+    lats, lngs = numpy.array(points, dtype=float).T
+    points_idx, polygons_idx = tree.query(shapely.points(lngs, lats),
+        predicate='within')
+
+    ecoregions = numpy.full(len(points), None, dtype=object)
+    # The first match for each point, in shapefile order
+    order = numpy.lexsort((polygons_idx, points_idx))
+    points_idx, first = numpy.unique(points_idx[order], return_index=True)
+    ecoregions[points_idx] = domains[polygons_idx[order][first]]
+    return ecoregions.tolist()
@@ -224,6 +224,13 @@ class SmokeReadyWriter():
     except:
       self._use_fips = False
 
+    fips_offline = kwargs.get('fips_offline')
+    self._fips_offline = (fips_offline if fips_offline is not None
+      else Config().get('extrafiles', 'smokeready', 'fips_offline'))
+    self._fips_cache_file = (kwargs.get('fips_cache_file') or
+      Config().get('extrafiles', 'smokeready', 'fips_cache_file'))
+    self._fips = {}
+
     # Pull the file year out of the dynamically set timestamp
     try:
       self.file_year = int(pthour.split('-')[1][:4])
@@ -262,6 +269,9 @@ class SmokeReadyWriter():
     skip_bad_fips = 0
     total_skipped = 0
 
+    if self._use_fips:
+      self._lookup_all_fips(fires_info)
+
     for fire_info in fires_info:
       with fires_manager.fire_failure_handler(fire_info):
        for fire_loc in fire_info.locations:
@@ -561,11 +571,40 @@ class SmokeReadyWriter():
       stid = '13'
     else:
       logging.debug("Looking up FIPS code for each fire location")
-      fips = locationutils.Fips(lat, lng)
+      fips = self._fips.get((lat, lng))
+      if fips is None:
+        fips = locationutils.Fips(lat, lng, offline=self._fips_offline,
+          cache_file=self._fips_cache_file)
       cyid = fips.county_fips[2:].lstrip('0')
       stid = fips.state_fips.lstrip('0')
     return cyid, stid
 
+  def _lookup_all_fips(self, fires_info):
+    """Looks up FIPS for all fire locations at once.
+
+    Any location not resolved here, including ones with invalid lat/lng,
+    is looked up again individually, in _get_state_county_fips, so that
+    errors are handled per location.
+    """
+    latlngs = set()
+    for fire_info in fires_info:
+      try:
+        for fire_loc in fire_info.locations:
+          lat_lng = locationutils.LatLng(fire_loc)
+          latlngs.add((lat_lng.latitude, lat_lng.longitude))
+      except Exception:
+        continue
+
+    latlngs = list(latlngs)
+    try:
+      fips = locationutils.Fips.lookup_many(latlngs,
+        offline=self._fips_offline, cache_file=self._fips_cache_file)
+    except Exception as e:
+      logging.debug("Failed to look up FIPS for all locations: %s", e)
+      return
+
+    self._fips = {ll: f for ll, f in zip(latlngs, fips) if f is not None}
+
   def _map_scc(self, fire_type):
     # Mappings provided by BSF (fill_data.py)
     SCC_CODE_MAPPING = {
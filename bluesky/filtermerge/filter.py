@@ -5,12 +5,24 @@ __author__ = "Joel Dubowy"
 import datetime
 import logging
 
+import numpy
+
 from bluesky.config import Config
 from bluesky.datetimeutils import to_datetime, parse_utc_offset
 from bluesky.locationutils import LatLng
 
 from . import FiresActionBase
 
+_EPOCH = datetime.datetime(1970, 1, 1)
+_EPOCH_UTC = _EPOCH.replace(tzinfo=datetime.timezone.utc)
+_ONE_MICROSECOND = datetime.timedelta(microseconds=1)
+
+def _to_microseconds(dt):
+    """Returns datetime as integer microseconds since the epoch, which,
+    unlike numpy's datetime64 conversion, is fast and exact
+    """
+    return (dt - (_EPOCH_UTC if dt.tzinfo else _EPOCH)) // _ONE_MICROSECOND
+
 
 class FireActivityFilter(FiresActionBase):
     """Class for filtering fire activity windows by various criteria.
@@ -100,56 +112,102 @@ class FireActivityFilter(FiresActionBase):
         """Filter by given filter func
 
         args:
-         - filter_func -- function that takes fire and active area object
-            and returns boolean value indicating whether or not to remove
-            active area object.
+         - filter_func -- function that takes a list of (fire, active area)
+            tuples and returns a numpy boolean array indicating whether or
+            not to remove each active area, along with a dict of
+            FilterErrors, keyed by list index, for active areas that
+            couldn't be evaluated
+
+        Active areas are evaluated all at once, and then the fires are
+        rebuilt, in order, in a single pass.  As before, a failure aborts
+        filtering at the failed active area, unless skipping failures.
         """
-        for fire in self._fires_manager.fires:
-            i = 0
-            while i < len(fire.get('activity', [])):
-                j = 0
-                while j < len(fire['activity'][i].get('active_areas', [])):
-                    try:
-                        if filter_func(fire, fire['activity'][i]['active_areas'][j]):
-                            fire['activity'][i]['active_areas'].pop(j)
+        fires = self._fires_manager.fires
+        active_areas = [(fire, aa) for fire in fires
+            for a in fire.get('activity', [])
+            for aa in a.get('active_areas', [])]
+        to_remove, errors = filter_func(active_areas)
+        to_remove = to_remove.tolist()
+
+        removed_fires = []
+        try:
+            k = 0
+            for fire in fires:
+                activity = fire.get('activity', [])
+                kept_activity = []
+                for i, a in enumerate(activity):
+                    a_active_areas = a.get('active_areas', [])
+                    kept_active_areas = []
+                    for j, aa in enumerate(a_active_areas):
+                        e = errors.get(k)
+                        if e is not None:
+                            if not self._skip_failures:
+                                # leave the rest of the active areas and
+                                # activity objects as they are
+                                self._replace(a_active_areas,
+                                    kept_active_areas + a_active_areas[j:])
+                                self._replace(activity,
+                                    kept_activity + activity[i:])
+                                raise e
+                            kept_active_areas.append(aa)
+                            # str(e) is already detailed
+                            logging.warning(str(e))
+
+                        elif to_remove[k]:
                             logging.debug('Filtered fire %s (%s)', fire.id,
                                 fire._private_id)
-                            # Note: if that was the last active area, then
-                            #    `j` must equal zero, and while loop will
-                            #    terminate
-                        else:
-                            j += 1
 
-                    except self.FilterError as e:
-                        if self._skip_failures:
-                            j += 1
-                            # str(e) is already detailed
-                            logging.warning(str(e))
-                            continue
                         else:
-                            raise
+                            kept_active_areas.append(aa)
 
-                if len(fire['activity'][i].get('active_areas', [])) == 0:
-                    fire['activity'].pop(i)
+                        k += 1
 
-                else:
-                    i += 1
+                    self._replace(a_active_areas, kept_active_areas)
+                    if kept_active_areas:
+                        kept_activity.append(a)
+
+                self._replace(activity, kept_activity)
+                if not kept_activity:
+                    removed_fires.append(fire)
 
-            if len(fire.get('activity', [])) == 0:
-                self._remove_fire(fire)
+        finally:
+            self._remove_fires(removed_fires)
 
-    def _remove_fire(self, fire):
-        """Removes fire from fires manager's `fires` list, and adds it
+    @staticmethod
+    def _replace(l, items):
+        if len(items) != len(l):
+            l[:] = items
+
+    def _get_values(self, active_areas, get_value):
+        """Returns the value computed by get_value for each (fire, active
+        area) tuple, along with a dict of FilterErrors, keyed by list
+        index, for those whose values couldn't be computed.
+
+        Values are None where there are errors.
+        """
+        values = []
+        errors = {}
+        for k, (fire, active_area) in enumerate(active_areas):
+            try:
+                values.append(get_value(fire, active_area))
+            except self.FilterError as e:
+                values.append(None)
+                errors[k] = e
+        return values, errors
+
+    def _remove_fires(self, fires):
+        """Removes fires from fires manager's `fires` list, and adds them
         to `filtered_fires`
 
         args
-         - fire -- fire to remove from active set
+         - fires -- fires to remove from active set
         """
-        self._fires_manager.remove_fire(fire)
-        if self._fires_manager.filtered_fires is None:
-            self._fires_manager.filtered_fires  = []
-        # TDOO: add reason for filtering (specify at least filed)
-        self._fires_manager.filtered_fires.append(fire)
+        if fires:
+            self._fires_manager.remove_fires(fires)
+            if self._fires_manager.filtered_fires is None:
+                self._fires_manager.filtered_fires  = []
+            # TDOO: add reason for filtering (specify at least filed)
+            self._fires_manager.filtered_fires.extend(fires)
 
     ##
     ## Unterlying filter methods
@@ -183,7 +241,7 @@ class FireActivityFilter(FiresActionBase):
             # This will never happen if called internally
             raise self.FilterError(self.SPECIFY_FILTER_FIELD_MSG)
 
-        def _filter(fire, active_area):
+        def _get_value(fire, active_area):
             vals = set([active_area.get(filter_field)] if scope == 'active_area'
                 else [l.get(filter_field) for l in active_area.locations])
             if inclusion_list:
@@ -191,6 +249,12 @@ class FireActivityFilter(FiresActionBase):
             else:
                 return tolerance_func([v and v in exclusion_list for v in vals])
 
+        def _filter(active_areas):
+            # the inclusion / exclusion checks aren't numeric, so are done
+            # in _get_value
+            vals, errors = self._get_values(active_areas, _get_value)
+            return numpy.array([bool(v) for v in vals], dtype=bool), errors
+
         return _filter
 
 
@@ -230,20 +294,38 @@ class FireActivityFilter(FiresActionBase):
                 any([b['ne'][k] < b['sw'][k] for k in ['lat','lng']])):
             raise self.FilterError(self.INVALID_BOUNDARY_MSG)
 
-        def _filter(fire, active_area):
+        def _get_lat_lng(fire, active_area):
             if not isinstance(active_area, dict):
                 self._fail_fire(fire, self.MISSING_FIRE_LOCATION_INFO_MSG)
-            try:
-                latlng = LatLng(active_area)
-                lat = latlng.latitude
-                lng = latlng.longitude
-            except ValueError as e:
-                self._fail_fire(fire, self.MISSING_FIRE_LOCATION_INFO_MSG)
+            # Avoid LatLng's overhead in the common case of a single
+            # specified point, for which it uses the point's lat/lng
+            if ('specified_points' in active_area
+                    and not set(['lat', 'lng']).issubset(active_area)
+                    and len(active_area['specified_points']) == 1):
+                try:
+                    point = active_area['specified_points'][0]
+                    lat = float(point['lat'])
+                    lng = float(point['lng'])
+                except:
+                    self._fail_fire(fire, self.MISSING_FIRE_LOCATION_INFO_MSG)
+            else:
+                try:
+                    latlng = LatLng(active_area)
+                    lat = latlng.latitude
+                    lng = latlng.longitude
+                except ValueError as e:
+                    self._fail_fire(fire, self.MISSING_FIRE_LOCATION_INFO_MSG)
             if not lat or not lng:
                 self._fail_fire(fire, self.MISSING_FIRE_LOCATION_INFO_MSG)
+            return lat, lng
 
-            return (lat < b['sw']['lat'] or lat > b['ne']['lat'] or
-                lng < b['sw']['lng'] or lng > b['ne']['lng'])
+        def _filter(active_areas):
+            vals, errors = self._get_values(active_areas, _get_lat_lng)
+            lat_lngs = numpy.array([v or (numpy.nan, numpy.nan) for v in vals],
+                dtype=float).reshape(-1, 2)
+            lat, lng = lat_lngs[:, 0], lat_lngs[:, 1]
+            return ((lat < b['sw']['lat']) | (lat > b['ne']['lat']) |
+                (lng < b['sw']['lng']) | (lng > b['ne']['lng'])), errors
 
         return _filter
 
@@ -267,7 +349,7 @@ class FireActivityFilter(FiresActionBase):
                 min_area > max_area):
             raise self.FilterError(self.INVALID_MIN_MUST_BE_LTE_MAX_MSG)
 
-        def _filter(fire, active_area):
+        def _get_area(fire, active_area):
             try:
                 total_active_area = active_area.total_area
             except:
@@ -276,8 +358,18 @@ class FireActivityFilter(FiresActionBase):
             if total_active_area < 0.0:
                 self._fail_fire(fire, self.NEGATIVE_ACTIVITY_AREA_MSG)
 
-            return ((min_area is not None and total_active_area < min_area) or
-                (max_area is not None and total_active_area > max_area))
+            return total_active_area
+
+        def _filter(active_areas):
+            vals, errors = self._get_values(active_areas, _get_area)
+            areas = numpy.array([numpy.nan if v is None else v for v in vals],
+                dtype=float)
+            to_remove = numpy.zeros(len(areas), dtype=bool)
+            if min_area is not None:
+                to_remove |= areas < min_area
+            if max_area is not None:
+                to_remove |= areas > max_area
+            return to_remove, errors
 
         return _filter
 
@@ -314,7 +406,17 @@ class FireActivityFilter(FiresActionBase):
         if s and e and s > e:
             raise self.FilterError(self.INVALID_START_AFTER_END)
 
-        def _filter(fire, active_area):
+        # Active areas often share start and end times, so parsed values
+        # are memoized
+        parsed = {}
+        def _to_datetime(val):
+            if not hasattr(val, 'lower'):
+                return to_datetime(val)
+            if val not in parsed:
+                parsed[val] = to_datetime(val)
+            return parsed[val]
+
+        def _get_start_end(fire, active_area):
             if not isinstance(active_area, dict):
                 self._fail_fire(fire, self.MISSING_FIRE_LOCATION_INFO_MSG)
             elif not active_area.get('start') or not active_area.get('end'):
@@ -323,18 +425,30 @@ class FireActivityFilter(FiresActionBase):
             utc_offset = datetime.timedelta(hours=parse_utc_offset(
                 active_area.get('utc_offset') or 0))
 
-            aa_s = to_datetime(active_area['start'])
+            aa_s = _to_datetime(active_area['start'])
             # check if e_is_local, since we're comparing aa_s against e
             if not e_is_local:
                 aa_s = aa_s - utc_offset
 
-            aa_e = to_datetime(active_area['end'])
+            aa_e = _to_datetime(active_area['end'])
             # same thing, but s_is_local
             if not s_is_local:
                 aa_e = aa_e - utc_offset
 
+            return _to_microseconds(aa_s), _to_microseconds(aa_e)
+
+        def _filter(active_areas):
+            vals, errors = self._get_values(active_areas, _get_start_end)
+            starts_ends = numpy.array([v or (0, 0) for v in vals],
+                dtype=numpy.int64).reshape(-1, 2)
+            aa_s, aa_e = starts_ends[:, 0], starts_ends[:, 1]
             # note that this filters if aa's start/end matches cutoff
             # (e.g. if aa's start and filter's end are both 2019-01-01T00:00:00)
-            return (s and aa_e <= s) or (e and aa_s >= e)
+            to_remove = numpy.zeros(len(starts_ends), dtype=bool)
+            if s:
+                to_remove |= aa_e <= _to_microseconds(s)
+            if e:
+                to_remove |= aa_s >= _to_microseconds(e)
+            return to_remove, errors
 
         return _filter
@@ -58,9 +58,18 @@ class FiresMerger(FiresActionBase):
         worth the hit to performance to check every pair of fires for
         mergeability.
 
+        Each fire is deep copied once, when merged into the combined fire,
+        and the merged fires are removed from the fires manager in a
+        single pass at the end, so that merging k fires with the same
+        id is linear in k rather than quadratic.  Since merging only
+        extends the combined fire's activity list, the combined fire
+        is modified in place, and each fire's compatibility is checked
+        against it as it's built up.
+
         TODO: refactor inner loop logic into submethods
         """
         combined_fire = None
+        merged_fires = []
         for fire in self._fires_manager._fires[fire_id]:
             try:
                 # TODO: iterate through and call all methods starting
@@ -73,22 +82,19 @@ class FiresMerger(FiresActionBase):
 
                 combined_fire = self._merge_into_combined_fire(fire,
                     combined_fire)
+                merged_fires.append(fire)
 
             except FiresMerger.MergeError as e:
                 if not self._skip_failures:
-                    if combined_fire:
-                        # add back what was merge in progress
-                        self._fires_manager.add_fire(combined_fire)
+                    # replace what was merged with what was merge in progress
+                    self._replace_with_combined_fire(merged_fires,
+                        combined_fire)
                     logging.debug(traceback.format_exc())
                     raise ValueError(str(e))
                 # else, just log str(e) (which is detailed enough)
                 logging.warning(str(e))
 
-        if combined_fire:
-            # add_fire will take care of creating new list
-            # and adding fire id in the case where all fires
-            # were combined and thus all removed
-            self._fires_manager.add_fire(combined_fire)
+        self._replace_with_combined_fire(merged_fires, combined_fire)
 
     def _merge_into_combined_fire(self, fire, combined_fire):
         """Merges fires into in-progress combined fire
@@ -96,39 +102,49 @@ class FiresMerger(FiresActionBase):
         args:
          - fire -- fire to merge
          - combined_fire -- in-progress combined fire (which could be None)
+
+        Returns the combined fire, which, if already defined, is updated
+        in place.  If merging fails, combined_fire is left unmodified.
         """
         if not combined_fire:
             # We need to instantiate a dict from fire in order to deepcopy it.
             # We need to deepcopy so that that modifications to
-            # new_combined_fire don't modify fire
-            new_combined_fire = self._fire_class(copy.deepcopy(dict(fire)))
-            self._fires_manager.remove_fire(fire)
-
-        else:
-            # See note, above, regarding instantiating dict and then deep copying
-            new_combined_fire = self._fire_class(copy.deepcopy(dict(combined_fire)))
-            try:
-                # merge activity; remember, at this point, activity will be
-                # defined for none or all of the fires to be merged
-                if new_combined_fire.get('activity'):
-                    new_combined_fire.activity.extend(copy.deepcopy(fire.activity))
-                    # TOOD: should we sort each activity object's active
-                    #   areas list by start timess, and then sort the activity
-                    #   list by the first (and earliest) start time of each
-                    #   activity object's active areas?  The complication is
-                    #   that there could be undefined 'start' values that we'd
-                    #   need to handle
-                    #new_combined_fire.activity.sort(key=lambda a: __min_start__(a))
-
-                # TODO: merge anything else?
-
-                # if remove_fire fails, combined_fire won't be updated
-                self._fires_manager.remove_fire(fire)
-
-            except Exception as e:
-                self._fail_fire(fire, e)
-
-        return new_combined_fire
+            # combined_fire don't modify fire
+            return self._fire_class(copy.deepcopy(dict(fire)))
+
+        try:
+            # merge activity; remember, at this point, activity will be
+            # defined for none or all of the fires to be merged
+            if combined_fire.get('activity'):
+                # copy before extending, so that combined_fire isn't
+                # modified if copying fails
+                activity = copy.deepcopy(fire.activity)
+                combined_fire.activity.extend(activity)
+                # TOOD: should we sort each activity object's active
+                #   areas list by start timess, and then sort the activity
+                #   list by the first (and earliest) start time of each
+                #   activity object's active areas?  The complication is
+                #   that there could be undefined 'start' values that we'd
+                #   need to handle
+                #combined_fire.activity.sort(key=lambda a: __min_start__(a))
+
+            # TODO: merge anything else?
+
+        except Exception as e:
+            self._fail_fire(fire, e)
+
+        return combined_fire
+
+    def _replace_with_combined_fire(self, merged_fires, combined_fire):
+        """Removes merged fires from the fires manager and adds the
+        combined fire in their place
+        """
+        if combined_fire:
+            self._fires_manager.remove_fires(merged_fires)
+            # add_fire will take care of creating new list
+            # and adding fire id in the case where all fires
+            # were combined and thus all removed
+            self._fires_manager.add_fire(combined_fire)
 
     ##
     ## Validation / Check Methods
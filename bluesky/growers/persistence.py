@@ -30,6 +30,8 @@ class Grower(GrowerBase):
         super().__init__(fires_manager) # sets self._fires_manager
 
         self._set_config()
+        self._parsed_times = {}
+        self._shifted_keys = {}
 
     ##
     ## Configuration related helpers
@@ -166,14 +168,16 @@ class Grower(GrowerBase):
                 (not self._truncate and last_start > self._date_to_persist)):
             return
 
+        # The existing activity objects are kept rather than copied, since
+        # they're not modified, and since fire['activity'] is replaced
         before_activity = []
         date_to_persist_activity = []
         for a in fire['activity']:
             a_start = to_date(a["active_areas"][0]['start'])
             if a_start < self._date_to_persist:
-                before_activity.append(copy.deepcopy(a))
+                before_activity.append(a)
             elif a_start == self._date_to_persist:
-                date_to_persist_activity.append(copy.deepcopy(a))
+                date_to_persist_activity.append(a)
             else:
                 # stop processing
                 break
@@ -194,13 +198,12 @@ class Grower(GrowerBase):
             for a in activity:
                 a['persisted'] = True
                 for aa in a['active_areas']:
-                    aa['start'] = parse_dt(aa['start']) + t_diff
-                    aa['end'] = parse_dt(aa['end']) + t_diff
+                    aa['start'] = self._shift_time(aa['start'], t_diff)
+                    aa['end'] = self._shift_time(aa['end'], t_diff)
                     self._add_time_diff_to_keys(aa, t_diff, ('timeprofile',))
                     for l in aa.locations:
-                        self._add_time_diff_to_keys(l, t_diff, ('plumerise',))
-                        self._add_time_diff_to_keys(l, t_diff, ('timeprofile',))
-                        self._add_time_diff_to_keys(l, t_diff, ('hourly_frp',))
+                        self._add_time_diff_to_keys(l, t_diff,
+                            ('plumerise', 'timeprofile', 'hourly_frp'))
 
                 if self._daily_percentages[i] < 100:
                     self._reduce_activity(a, self._daily_percentages[i])
@@ -210,19 +213,39 @@ class Grower(GrowerBase):
         return persisted_activity
 
     def _add_time_diff_to_keys(self, d, t_diff, fields):
-        # instantiate list from timeprofile's and plumerise's keys
-        # to avoid unexpected behavior when popping and replacing
-        # keys within for loop
+        # Only fields defined in d itself are updated, since locations
+        # fall back on their active area's fields (e.g. 'timeprofile'),
+        # which are updated separately.  The hourly data are re-keyed
+        # into new dicts, rather than in place, so that shifted keys
+        # can't collide with keys yet to be shifted (e.g. for data
+        # spanning more than a day)
         for f in fields:
-            for k in list(d.get(f, {})):
-                new_k = (parse_dt(k) + t_diff)
-
-                # if string, keep as string; if datetime.date object
-                # (which includes datetime.datetime), keep as datetime.date
-                if not isinstance(k, datetime.date):
-                    new_k = new_k.strftime('%Y-%m-%dT%H:%M:%S')
-
-                d[f][new_k] = d[f].pop(k)
+            if dict.get(d, f):
+                d[f] = {self._shift_key(k, t_diff): v
+                    for k, v in d[f].items()}
+
+    def _shift_time(self, t, t_diff):
+        # The same start and end times recur across fires and persisted
+        # days, so they're parsed once
+        parsed = self._parsed_times.get(t)
+        if parsed is None:
+            parsed = self._parsed_times[t] = parse_dt(t)
+        return parsed + t_diff
+
+    def _shift_key(self, k, t_diff):
+        # As with parsed times, shifted keys are cached, since the same
+        # hours recur across fires and locations
+        new_k = self._shifted_keys.get((k, t_diff))
+        if new_k is None:
+            new_k = self._shift_time(k, t_diff)
+
+            # if string, keep as string; if datetime.date object
+            # (which includes datetime.datetime), keep as datetime.date
+            if not isinstance(k, datetime.date):
+                new_k = new_k.strftime('%Y-%m-%dT%H:%M:%S')
+
+            self._shifted_keys[(k, t_diff)] = new_k
+        return new_k
 
     SCALAR_FIELDS_TO_REDUCE = ["area", "frp"]
     NESTED_FIELDS_TO_REDUCE = ["emissions", "consumption", "heat"]
@@ -97,6 +97,14 @@ def create_sym_link(dest, link):
         pass
 
 
+def get_num_available_cpus():
+    """Returns the number of CPUs available to this process"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        # sched_getaffinity isn't supported on all platforms
+        return os.cpu_count() or 1
+
 INVALID_WAIT_CONFIG_MSG = ("'strategy', 'time', 'max_attempts' "
     "must all be defined if waiting for a resource")
 INVALID_WAIT_STRATEGY_MSG = "Wait strategy must be 'fixed' or 'backoff'"
@@ -0,0 +1,278 @@
+"""bluesky.jsonstream
+
+Incremental reading and writing of (optionally gzip'd) json fire data.
+
+On input, data is read, decompressed and decoded a chunk at a time, and the
+top-level object is parsed one value at a time with
+json.JSONDecoder.raw_decode. On output, the top-level object is encoded and
+written one value at a time. In both cases, designated top-level arrays
+(e.g. 'fires') are handled one element at a time, so that the full json
+text never needs to be held in memory.
+"""
+
+__author__ = "Joel Dubowy"
+
+import codecs
+import gc
+import json
+import re
+import zlib
+
+__all__ = [
+    "load",
+    "dump"
+]
+
+CHUNK_SIZE = 1024 * 1024
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+NUMBER_CHARS = set('0123456789.eE+-')
+
+
+def load(stream, streamed_keys=(), item_hook=None, chunk_size=CHUNK_SIZE):
+    """Parses json from a file-like object, returning the decoded value.
+
+    stream may be text or binary, and binary input may be gzip'd.
+
+    If the input is an object, arrays under any of the top-level
+    streamed_keys are parsed element by element, and item_hook, if
+    specified, is applied to each element as it's parsed.
+
+    Raises json.decoder.JSONDecodeError on invalid input.
+    """
+    chunks = _decode(_decompress(_read(stream, chunk_size)))
+
+    # json.loads parses in a single C call, during which the garbage
+    # collector never runs. Parsing value by value would otherwise trigger
+    # repeated, increasingly expensive, collections while tracking the
+    # (acyclic) parsed data, so collection is likewise suspended here.
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _Parser(chunks, streamed_keys, item_hook).parse()
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def dump(data, stream, streamed_keys=(), hook=None, indent=None,
+        sort_keys=False, cls=None):
+    """Writes dict data to a text file-like object as json.
+
+    The output is identical to that of json.dump, but each top-level value,
+    and each element of arrays under any of the top-level streamed_keys,
+    is encoded and written separately. hook, if specified, is applied to
+    each of them before it's encoded.
+    """
+    if isinstance(indent, int):
+        indent = ' ' * indent
+
+    def encode(val, level):
+        s = json.dumps(hook(val) if hook else val, indent=indent,
+            sort_keys=sort_keys, cls=cls)
+        # Literal newlines only occur in indentation, never within strings
+        return s.replace('\n', '\n' + indent * level) if indent is not None else s
+
+    if indent is None:
+        item_sep = ', '
+        newline = lambda level: ''
+    else:
+        item_sep = ','
+        newline = lambda level: '\n' + indent * level
+
+    items = sorted(data.items()) if sort_keys else list(data.items())
+    if not items:
+        stream.write('{}')
+        return
+
+    stream.write('{')
+    for i, (key, val) in enumerate(items):
+        stream.write((item_sep if i else '') + newline(1) + json.dumps(key)
+            + ': ')
+        if key in streamed_keys and isinstance(val, (list, tuple)):
+            if not val:
+                stream.write('[]')
+                continue
+            stream.write('[')
+            for j, item in enumerate(val):
+                stream.write((item_sep if j else '') + newline(2)
+                    + encode(item, 2))
+            stream.write(newline(1) + ']')
+        else:
+            stream.write(encode(val, 1))
+    stream.write(newline(0) + '}')
+
+
+def _read(stream, chunk_size):
+    # Read bytes rather than text from stdin, to support gzip'd input
+    stream = getattr(stream, 'buffer', stream)
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def _decompress(chunks):
+    chunks = iter(chunks)
+    first = next(chunks, None)
+    if first is None:
+        return
+
+    if not isinstance(first, str):
+        while len(first) < len(GZIP_MAGIC):
+            chunk = next(chunks, None)
+            if chunk is None:
+                break
+            first += chunk
+
+    if isinstance(first, str) or not first.startswith(GZIP_MAGIC):
+        yield first
+        yield from chunks
+        return
+
+    # Supports multi-member gzip files, like gzip.decompress
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    data = first
+    while True:
+        while data:
+            yield decompressor.decompress(data)
+            if decompressor.eof:
+                data = decompressor.unused_data
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            else:
+                data = b''
+        data = next(chunks, None)
+        if data is None:
+            break
+    yield decompressor.flush()
+
+
+def _decode(chunks):
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    for chunk in chunks:
+        yield chunk if isinstance(chunk, str) else decoder.decode(chunk)
+    yield decoder.decode(b'', final=True)
+
+
+class _Parser():
+
+    def __init__(self, chunks, streamed_keys, item_hook):
+        self._chunks = chunks
+        self._streamed_keys = set(streamed_keys)
+        self._item_hook = item_hook
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._exhausted = False
+
+    def parse(self):
+        if self._peek() == '{':
+            value = self._parse_object()
+        else:
+            value = self._value()
+        if self._peek() is not None:
+            self._fail("Extra data")
+        return value
+
+    def _parse_object(self):
+        data = {}
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return data
+
+        while True:
+            if self._peek() != '"':
+                self._fail("Expecting property name enclosed in double quotes")
+            key = self._value()
+            self._expect(':')
+            if key in self._streamed_keys and self._peek() == '[':
+                data[key] = self._parse_array()
+            else:
+                data[key] = self._value()
+
+            if self._peek() == ',':
+                self._pos += 1
+            else:
+                self._expect('}')
+                return data
+
+    def _parse_array(self):
+        items = []
+        self._expect('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return items
+
+        while True:
+            item = self._value()
+            items.append(self._item_hook(item) if self._item_hook else item)
+            # Drop consumed text once it's the bulk of the buffer
+            if self._pos > len(self._buffer) // 2:
+                self._compact()
+
+            if self._peek() == ',':
+                self._pos += 1
+            else:
+                self._expect(']')
+                return items
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                # A number followed by the end of the buffer or by number
+                # characters may be truncated, so read more and re-parse
+                # if possible
+                if self._exhausted or (end < len(self._buffer) and not (
+                        isinstance(value, (int, float))
+                        and self._buffer[end] in NUMBER_CHARS)):
+                    self._pos = end
+                    return value
+            except json.decoder.JSONDecodeError:
+                if self._exhausted:
+                    raise
+            # Read at least as much as is already buffered, so that
+            # re-parsing a large value doesn't become quadratic
+            self._fill(max(len(self._buffer) - self._pos, 1))
+
+    def _peek(self):
+        """Skips whitespace, returning the next character, or None at EOF"""
+        while True:
+            self._pos = WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if self._exhausted:
+                return None
+            self._fill(1)
+
+    def _expect(self, char):
+        if self._peek() != char:
+            self._fail("Expecting '{}' delimiter".format(char))
+        self._pos += 1
+
+    def _fail(self, msg):
+        raise json.decoder.JSONDecodeError(msg, self._buffer, self._pos)
+
+    def _fill(self, num_chars):
+        self._compact()
+        new_chunks = []
+        n = 0
+        while n < num_chars:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self._exhausted = True
+                break
+            new_chunks.append(chunk)
+            n += len(chunk)
+        self._buffer += ''.join(new_chunks)
+
+    def _compact(self):
+        if self._pos:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
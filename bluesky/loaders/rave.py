@@ -18,6 +18,8 @@ compute chain.
 
 
 import datetime
+import functools
+import gc
 import glob
 import os
 
@@ -67,9 +69,38 @@ def np_time_to_iso(np_dt):
     return str(np_dt).split(".")[0][:19]
 
 
+# Fires' records share a small number of distinct UTC times, offsets,
+# and so local times, which are parsed and formatted once each
+
+@functools.lru_cache(maxsize=4096)
+def _to_local_time(iso, offset_h):
+    """('2026-01-01T05:00:00', -8) -> (datetime, '2025-12-31T21:00:00')."""
+    local_dt = (datetime.datetime.fromisoformat(iso)
+        + datetime.timedelta(hours=offset_h))
+    return local_dt, local_dt.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_time(dt):
+    return dt.strftime("%Y-%m-%dT%H:%M:%S")
+
+
 class _RaveMarshalMixin:
     """Turns flat cell-hour records into one Fire per grid cell."""
 
+    def load(self):
+        # Records and fires are built in bulk, as acyclic dicts and lists.
+        # Garbage collection would otherwise be triggered repeatedly, and
+        # increasingly expensively, while tracking them, so it's suspended,
+        # as in bluesky.jsonstream.load
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return super().load()
+        finally:
+            if gc_enabled:
+                gc.enable()
+
     def _load_country_grid(self, config):
         path = config.get("country_lookup")
         if not path:
@@ -77,28 +108,43 @@ class _RaveMarshalMixin:
         import numpy
         return numpy.load(path, mmap_mode="r")  # near-zero resident; O(1) lookups
 
-    def _lookup_country(self, row, col):
+    def _lookup_countries(self, cells):
+        """Returns the country of each (row, col) cell, or None if unknown."""
         grid = getattr(self, "_country_grid", None)
-        if grid is None:
-            return None
-        if 0 <= row < grid.shape[0] and 0 <= col < grid.shape[1]:
-            return str(grid[row, col]) or None
-        return None
+        if grid is None or not cells:
+            return [None] * len(cells)
+        import numpy
+        rows, cols = numpy.array(cells, dtype=numpy.int64).T
+        in_grid = ((rows >= 0) & (rows < grid.shape[0])
+            & (cols >= 0) & (cols < grid.shape[1]))
+        countries = [None] * len(cells)
+        # One fancy-indexed read of the mmapped grid for all cells
+        for i, v in zip(numpy.nonzero(in_grid)[0].tolist(),
+                grid[rows[in_grid], cols[in_grid]]):
+            countries[i] = str(v) or None
+        return countries
 
     def _marshal(self, records):
         groups = {}
+        utcdates = {}
         for r in records:
-            key = (r["row"], r["col"], utc_date_str(r["time"]))
+            # all of a file's records share the same time
+            utcdate = utcdates.get(r["time"])
+            if utcdate is None:
+                utcdate = utcdates[r["time"]] = utc_date_str(r["time"])
+            key = (r["row"], r["col"], utcdate)
             groups.setdefault(key, []).append(r)
 
+        countries = self._lookup_countries([k[:2] for k in groups])
+
         fires = []
-        for key, recs in groups.items():
-            fire = self._build_fire(key, recs)
+        for (key, recs), country in zip(groups.items(), countries):
+            fire = self._build_fire(key, recs, country)
             if fire is not None:
                 fires.append(fire)
         return fires
 
-    def _build_fire(self, key, recs):
+    def _build_fire(self, key, recs, country=None):
         row, col, utcdate = key
         lat, lng = recs[0]["lat"], recs[0]["lng"]
 
@@ -110,21 +156,20 @@ class _RaveMarshalMixin:
         co_tons = kg_to_tons(total_co_kg)
 
         offset_h = utc_offset_hours(lng)
-        offset = datetime.timedelta(hours=offset_h)
         offset_str = format_utc_offset(offset_h)
 
         timeprofile = {}
         local_times = []
         for r in recs:
-            local_dt = datetime.datetime.fromisoformat(r["time"]) + offset
-            local_times.append(local_dt)
+            local_time = _to_local_time(r["time"], offset_h)
+            local_times.append(local_time)
             frac = r["pm25_kg"] / total_pm25_kg
-            timeprofile[local_dt.strftime("%Y-%m-%dT%H:%M:%S")] = {
+            timeprofile[local_time[1]] = {
                 "area_fraction": frac, "flaming": frac,
                 "smoldering": frac, "residual": frac,
             }
 
-        start = min(local_times)
+        start, start_str = min(local_times)
         end = start + datetime.timedelta(hours=24)
         frp = sum(r["frp_mw"] for r in recs) / len(recs)  # representative for SEV
 
@@ -147,13 +192,12 @@ class _RaveMarshalMixin:
                 "total": pm25_tons + co_tons}},
         }
         active_area = {
-            "start": start.strftime("%Y-%m-%dT%H:%M:%S"),
-            "end": end.strftime("%Y-%m-%dT%H:%M:%S"),
+            "start": start_str,
+            "end": _format_time(end),
             "utc_offset": offset_str,
             "timeprofile": timeprofile,
             "specified_points": [point],
         }
-        country = self._lookup_country(row, col)
         if country:
             active_area["country"] = country
         return {
@@ -204,35 +248,39 @@ class NetcdfFileLoader(_RaveMarshalMixin, BaseLoader):
         ds = xarray.open_dataset(path)
         try:
             pm25 = ds["PM25"].values[0]          # (grid_yt, grid_xt)
-            rows, cols = numpy.where(numpy.isfinite(pm25))
+            # QA values are compared as integers
+            qa = numpy.trunc(ds["QA"].values[0])
+            rows, cols = numpy.nonzero(
+                numpy.isfinite(pm25) & (qa >= self._min_qa))
             time_str = np_time_to_iso(ds["time"].values[0])
-            lat = ds["grid_latt"].values
-            lon = ds["grid_lont"].values
-            area = ds["area"].values
-            co = ds["CO"].values[0]
-            frp = ds["FRP_MEAN"].values[0]
-            fre = ds["FRE"].values[0]
-            qa = ds["QA"].values[0]
-
-            out = []
-            for r, c in zip(rows.tolist(), cols.tolist()):
-                q = int(qa[r, c])
-                if q < self._min_qa:
-                    continue
-                out.append({
-                    "time": time_str,
-                    "lat": float(lat[r, c]),
-                    "lng": to_180(lon[r, c]),
-                    "area_km2": float(area[r, c]),
-                    "pm25_kg": float(pm25[r, c]),
-                    "co_kg": float(co[r, c]),
-                    "frp_mw": float(frp[r, c]),
-                    "fre_mj": float(fre[r, c]),
-                    "qa": q,
-                    "row": r,
-                    "col": c,
-                })
-            return out
+
+            # Gather only the selected cells, as columns of python values
+            columns = [
+                ds["grid_latt"].values[rows, cols].tolist(),
+                ds["grid_lont"].values[rows, cols].tolist(),
+                ds["area"].values[rows, cols].tolist(),
+                pm25[rows, cols].tolist(),
+                ds["CO"].values[0][rows, cols].tolist(),
+                ds["FRP_MEAN"].values[0][rows, cols].tolist(),
+                ds["FRE"].values[0][rows, cols].tolist(),
+                qa[rows, cols].astype(numpy.int64).tolist(),
+                rows.tolist(),
+                cols.tolist()
+            ]
+            return [{
+                "time": time_str,
+                "lat": float(lat),
+                "lng": to_180(lon),
+                "area_km2": float(area),
+                "pm25_kg": float(pm25_kg),
+                "co_kg": float(co_kg),
+                "frp_mw": float(frp_mw),
+                "fre_mj": float(fre_mj),
+                "qa": q,
+                "row": r,
+                "col": c,
+            } for (lat, lon, area, pm25_kg, co_kg, frp_mw, fre_mj, q, r, c)
+                in zip(*columns)]
         finally:
             ds.close()
 
@@ -3,15 +3,20 @@
 __author__ = "Joel Dubowy"
 
 # FIPS
+import collections
+import functools
 import os
 import logging
 import json
+import pickle
 import requests
+import tempfile
 import zipfile
 
 import geopandas as gpd
 import fiona
-from shapely.geometry import Point
+import numpy
+import shapely
 from geoutils.geojson import get_centroid
 
 INVALID_LOCATION_DATA = ("Invalid location data required for"
@@ -108,18 +113,67 @@ class LatLng():
         except:
             raise ValueError(MISSING_OR_INVALID_LAT_LNG_FOR_SPECIFIED_POINT)
 
+COUNTIES_SHAPEFILE = os.path.join(os.path.dirname(__file__), 'fips',
+    'counties_fips.shp')
+
 class Fips():
     """
     Returns FIPS metadata from a given Lat/Lng
 
-    Defautls to trying the FCC Census API:
+    By default (offline=True), looks up the county in a spatial index of
+    the counties_shp file, which is loaded once per process (and,
+    optionally, cached on disk in cache_file), and falls back to trying
+    the FCC Census API:
     https://geo.fcc.gov/api/census/#!/block/get_block_find
 
-    Falls back to using the counties_shp file, which is a more
-    memory intensive operation.
+    If offline is False, tries the API first, and falls back to the
+    counties index.
+
+    Note that county data from the counties_shp file don't include state
+    name or code.
     """
 
-    def __init__(self, lat, lng):
+    def __init__(self, lat, lng, offline=True, cache_file=None):
+        self.lat, self.lng = self._validate_lat_lng(lat, lng)
+        self._offline = offline
+        self._cache_file = cache_file
+        self._get_fips()
+
+    @classmethod
+    def lookup_many(cls, latlngs, offline=True, cache_file=None):
+        """Returns a Fips object for each (lat, lng) in latlngs, or None
+        for any that couldn't be located.
+
+        If offline is True, the counties index is queried for all
+        locations at once, and only locations it doesn't resolve are looked
+        up individually. Otherwise, each location is looked up individually,
+        as with Fips(lat, lng, offline=False), so that the API is tried first.
+        """
+        latlngs = [cls._validate_lat_lng(lat, lng) for lat, lng in latlngs]
+        counties = [None] * len(latlngs)
+        if offline and latlngs:
+            try:
+                counties = _load_counties_index(cache_file).lookup(latlngs)
+            except Exception as e:
+                logging.warning("Failed to look up FIPS offline: %s", e)
+
+        results = []
+        for (lat, lng), county in zip(latlngs, counties):
+            if county:
+                fips = cls.__new__(cls)
+                fips.lat, fips.lng = lat, lng
+                fips._process_shp_data(county)
+            else:
+                try:
+                    fips = cls(lat, lng, offline=offline, cache_file=cache_file)
+                except RuntimeError:
+                    fips = None
+            results.append(fips)
+
+        return results
+
+    @staticmethod
+    def _validate_lat_lng(lat, lng):
         if type(lat) is not float or type(lng) is not float:
             try:
                 lat = float(lat)
@@ -127,9 +181,7 @@ class Fips():
             except:
                 raise ValueError(INVALID_LAT_LNG_DATA)
 
-        self.lat = float(lat)
-        self.lng = float(lng)
-        self._get_fips()
+        return float(lat), float(lng)
 
     @property
     def county_name(self):
@@ -152,6 +204,13 @@ class Fips():
         return self._state_code
 
     def _get_fips(self):
+        if self._offline:
+            try:
+                self._get_shp_data()
+                return
+            except Exception as e:
+                logging.debug("Failed to look up FIPS offline: %s", e)
+
         # try API and fallback to Shapefile
         url = "https://geo.fcc.gov/api/census/block/find?latitude={}&longitude={}&format=json".format(self.lat, self.lng)
 
@@ -160,10 +219,13 @@ class Fips():
             if r.status_code == 200:
                 data = json.loads(r.content.decode())
                 self._process_api_data(data)
-            else:
-                self._get_shp_data()
+                return
         except:
-            self._get_shp_data()
+            pass
+
+        if self._offline:
+            raise RuntimeError(INVALID_FIPS_RESPONSE)
+        self._get_shp_data()
 
     def _process_api_data(self, data):
         # process the response payload from the API
@@ -174,25 +236,12 @@ class Fips():
         self._state_code = data['State']['code']
 
     def _get_shp_data(self):
-        # get counties_fips shapefile
-        filename = os.path.join(os.path.dirname(__file__), 'fips', 'counties_fips.shp')
-
-        # load into geopandas and set CRS
-        gdf = gpd.read_file(filename)
-        gdf = gdf.to_crs(epsg=4326)
-
-        # Shapely point
-        p = Point(self.lng, self.lat)
+        county = _load_counties_index(self._cache_file).lookup(
+            [(self.lat, self.lng)])[0]
 
-        # apply lambda to determine if point is within the geometry of the object
-        gdf['match'] = gdf.geometry.apply(lambda x: p.within(x))
-
-        # return matches
-        resdf = gdf.loc[gdf.match == True]
-
-        # only one row should be retuned
-        if len(resdf.index) == 1:
-            self._process_shp_data(resdf.iloc[0])
+        # only one county should match
+        if county:
+            self._process_shp_data(county)
         else:
             raise RuntimeError(INVALID_FIPS_RESPONSE)
 
@@ -204,6 +253,98 @@ class Fips():
         self._state_fips = data.STATEFP
         self._state_code = None
 
+
+County = collections.namedtuple('County', ['NAME', 'GEOID', 'STATEFP'])
+
+class CountiesIndex():
+    """STRtree spatial index of the counties_shp file's county polygons
+    """
+
+    CACHE_VERSION = 1
+
+    def __init__(self, geometries, counties):
+        self._tree = shapely.STRtree(geometries)
+        self._counties = counties
+
+    @classmethod
+    def load(cls, cache_file=None):
+        """Loads the county polygons, reprojected to lat/lng, from
+        cache_file, if specified and up to date, or else from the
+        counties_shp file, in which case cache_file, if specified, is
+        (re)written.
+        """
+        source_id = cls._source_id()
+        if cache_file and os.path.exists(cache_file):
+            try:
+                with open(cache_file, 'rb') as f:
+                    data = pickle.load(f)
+                if data['version'] == (cls.CACHE_VERSION, source_id):
+                    logging.debug("Loading counties index from %s", cache_file)
+                    return cls(shapely.from_wkb(data['geometries']),
+                        [County(*c) for c in data['counties']])
+                logging.debug("Counties index cache %s is stale", cache_file)
+            except Exception as e:
+                logging.warning("Failed to load counties index cache %s: %s",
+                    cache_file, e)
+
+        # load into geopandas and set CRS
+        gdf = gpd.read_file(COUNTIES_SHAPEFILE)
+        gdf = gdf.to_crs(epsg=4326)
+        geometries = numpy.asarray(gdf.geometry.values, dtype=object)
+        counties = [County(*c) for c in zip(gdf.NAME, gdf.GEOID, gdf.STATEFP)]
+
+        if cache_file:
+            cls._write_cache(cache_file, {
+                'version': (cls.CACHE_VERSION, source_id),
+                'geometries': shapely.to_wkb(geometries),
+                'counties': [tuple(c) for c in counties]
+            })
+
+        return cls(geometries, counties)
+
+    @staticmethod
+    def _source_id():
+        st = os.stat(COUNTIES_SHAPEFILE)
+        return (st.st_size, st.st_mtime_ns)
+
+    @staticmethod
+    def _write_cache(cache_file, data):
+        # Write to temp file and then move, so that concurrent runs
+        # never read a partially written cache
+        f = None
+        try:
+            cache_dir = os.path.dirname(os.path.abspath(cache_file))
+            os.makedirs(cache_dir, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=cache_dir, delete=False) as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(f.name, cache_file)
+        except Exception as e:
+            logging.warning("Failed to write counties index cache %s: %s",
+                cache_file, e)
+            if f is not None:
+                try:
+                    os.remove(f.name)
+                except OSError:
+                    pass
+
+    def lookup(self, latlngs):
+        """Returns the County containing each (lat, lng), or None if it's
+        not within exactly one county
+        """
+        lats, lngs = numpy.array(latlngs, dtype=float).reshape(-1, 2).T
+        points_idx, counties_idx = self._tree.query(shapely.points(lngs, lats),
+            predicate='within')
+        num_matches = numpy.bincount(points_idx, minlength=len(latlngs))
+        results = [None] * len(latlngs)
+        for p, c in zip(points_idx, counties_idx):
+            if num_matches[p] == 1:
+                results[p] = self._counties[c]
+        return results
+
+@functools.lru_cache(maxsize=None)
+def _load_counties_index(cache_file=None):
+    return CountiesIndex.load(cache_file)
+
 def load_perimeter_geometry_from_shapefile(shapefile_name):
     shapefile_name = os.path.abspath(shapefile_name)
 
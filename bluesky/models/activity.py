@@ -2,8 +2,10 @@
 
 __author__ = "Joel Dubowy"
 
+import copy
 import itertools
 import logging
+import weakref
 
 from bluesky.locationutils import load_perimeter_geometry_from_shapefile
 
@@ -22,12 +24,258 @@ INVALID_LOCATION_MSGS = {
     for k in REQUIRED_LOCATION_FIELDS
 }
 
-class Location(dict):
+##
+## Change tracking
+##
+
+# Fire memoizes values derived from its activity data (see
+# Fire._memoized), and invalidates them whenever its activity data is
+# modified. Each observed container counts modifications made to it and
+# to the observed containers nested within it, so that a fire need only
+# check the counts on the root of its own activity data. Containers
+# reference the containers they're in (weakly, so that they don't keep
+# them from being garbage collected), until they're removed from them.
+# They may be in more than one container, since activity objects may be
+# shared by more than one Fire (e.g. by Fire(fire)).
+
+# Changes to these keys may replace observed containers with ones that
+# aren't, and so are counted as structural (see Fire._is_observed)
+_STRUCTURAL_KEYS = frozenset(['active_areas', 'specified_points', 'perimeter'])
+
+# Attributes describing an object's place in a tree, which aren't copied
+_TREE_ATTRS = frozenset(['_parents', '_version', '_structure_version'])
+
+class _Observed(object):
+    """Mixin for containers that record modifications to themselves
+    and to the observed containers within them.
+
+    _version is incremented on every modification, and _structure_version
+    on every modification that may add or remove observed containers.
+    """
+
+    _parents = ()
+    _version = 0
+    _structure_version = 0
+
+    def __getstate__(self):
+        return {k: v for k, v in self.__dict__.items()
+            if k not in _TREE_ATTRS}
+
+def _link(val, parent):
+    if isinstance(val, _Observed):
+        ref = weakref.ref(parent)
+        if ref not in val._parents:
+            # references to containers that no longer exist are dropped
+            val._parents = tuple(r for r in val._parents
+                if r() is not None) + (ref,)
+
+def _unlink(removed, parent, remaining):
+    """Unlinks the values removed from parent, other than those that
+    remain in it
+    """
+    remaining_ids = None
+    for val in removed:
+        if isinstance(val, _Observed) and val._parents:
+            if remaining_ids is None:
+                remaining_ids = set(map(id, remaining))
+            if id(val) not in remaining_ids:
+                val._parents = tuple(r for r in val._parents
+                    if r() is not None and r() is not parent)
+
+def _modified(obj, structural):
+    pending = [obj]
+    seen = set()
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        obj._version += 1
+        if structural:
+            obj._structure_version += 1
+        for ref in obj._parents:
+            parent = ref()
+            if parent is not None:
+                pending.append(parent)
+
+def _observed(method, removes=False):
+    def wrapper(self, *args, **kwargs):
+        if removes:
+            before = list(self.values() if isinstance(self, dict) else self)
+        r = method(self, *args, **kwargs)
+        if removes:
+            _unlink(before, self,
+                self.values() if isinstance(self, dict) else self)
+        _modified(self, True)
+        return r
+    wrapper.__name__ = method.__name__
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
+class ObservedList(_Observed, list):
+    """List that records modifications to it (see _Observed)
+
+    All modifications are considered structural.
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        for v in self:
+            _link(v, self)
+
+    def __setitem__(self, key, val):
+        replaced = self[key] if isinstance(key, slice) else [self[key]]
+        super().__setitem__(key, val)
+        for v in (self if isinstance(key, slice) else [val]):
+            _link(v, self)
+        _unlink(replaced, self, self)
+        _modified(self, True)
+
+    def __iadd__(self, other):
+        return self._extended(super().__iadd__, other)
+
+    def extend(self, other):
+        self._extended(super().extend, other)
+
+    def append(self, val):
+        super().append(val)
+        _link(val, self)
+        _modified(self, True)
+
+    def insert(self, idx, val):
+        super().insert(idx, val)
+        _link(val, self)
+        _modified(self, True)
+
+    def _extended(self, method, other):
+        n = len(self)
+        r = method(other)
+        for v in self[n:]:
+            _link(v, self)
+        _modified(self, True)
+        return r
+
+    def __deepcopy__(self, memo):
+        return _deepcopy(self, memo)
+
+for _m in ('sort', 'reverse'):
+    setattr(ObservedList, _m, _observed(getattr(list, _m)))
+for _m in ('__delitem__', '__imul__', 'pop', 'remove', 'clear'):
+    setattr(ObservedList, _m, _observed(getattr(list, _m), removes=True))
+
+
+class ObservedDict(_Observed, dict):
+    """Dict that records modifications to it (see _Observed)
+
+    Sub-classes can convert values set for specific keys by defining
+    '_convert_<key>' methods. ObservedDict routes update and setdefault
+    through __setitem__ so that they are applied consistently.
+    """
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        for v in self.values():
+            _link(v, self)
+
+    def __setitem__(self, key, val):
+        convert = getattr(self, '_convert_{}'.format(key), None)
+        if convert:
+            val = convert(val)
+        replaced = dict.get(self, key)
+        super().__setitem__(key, val)
+        _link(val, self)
+        if replaced is not val:
+            _unlink([replaced], self, self.values())
+        _modified(self, key in _STRUCTURAL_KEYS)
+
+    def update(self, *args, **kwargs):
+        for k, v in dict(*args, **kwargs).items():
+            self[k] = v
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __deepcopy__(self, memo):
+        return _deepcopy(self, memo)
+
+for _m in ('__delitem__', 'pop', 'popitem', 'clear'):
+    setattr(ObservedDict, _m, _observed(getattr(dict, _m), removes=True))
+
+
+##
+## Copying
+##
+
+# copy.deepcopy handles every object generically, reconstructing dict
+# and list subclasses via __reduce_ex__ and setting each item through
+# __setitem__, which is slow for large activity data sets (e.g. when
+# persisting or merging fires). Activity objects instead define
+# __deepcopy__ with _deepcopy, which copies them, and the plain dicts and
+# lists within them, directly.  As with copy.deepcopy, shared references
+# are preserved via the memo, and atomic values aren't copied.
+
+_ATOMIC_TYPES = frozenset([str, int, float, bool, type(None)])
+
+def _deepcopy(val, memo):
+    t = type(val)
+    if t in _ATOMIC_TYPES:
+        return val
+
+    y = memo.get(id(val))
+    if y is not None:
+        return y
+
+    if t is dict or issubclass(t, ObservedDict):
+        y = {} if t is dict else t.__new__(t)
+        memo[id(val)] = y
+        if t is dict:
+            for k, v in val.items():
+                y[k] = _deepcopy(v, memo)
+            return y
+
+        # The copy is linked to the containers it's added to, not
+        # to those containing val
+        for k, v in val.__dict__.items():
+            if k not in _TREE_ATTRS:
+                y.__dict__[k] = _deepcopy(v, memo)
+        # Items are set directly, bypassing ObservedDict.__setitem__,
+        # since values were already converted when set on val, and
+        # since there's no need to record modifications to a new object
+        for k, v in val.items():
+            v = _deepcopy(v, memo)
+            dict.__setitem__(y, k, v)
+            _link(v, y)
+        return y
+
+    if t is list or t is ObservedList:
+        y = [] if t is list else ObservedList()
+        memo[id(val)] = y
+        list.extend(y, [_deepcopy(v, memo) for v in val])
+        if t is not list:
+            for v in y:
+                _link(v, y)
+        return y
+
+    return copy.deepcopy(val, memo)
+
+
+def _to_observed_list(val):
+    return ObservedList(val) if type(val) is list else val
+
+
+class Location(ObservedDict):
+
+    def __init__(self, *args, active_area=None, **kwargs):
+        super().__init__(*args, **kwargs)
 
-        self._active_area = self.pop('active_area', None)
+        self._active_area = self.pop('active_area', active_area)
 
         # Support deprecated 'polygon' field, with possibly reduced nesting
         # (array of coordinates rather than an array of array of coordinates)
@@ -88,7 +336,7 @@ class Location(dict):
             self._active_area and attr not in self.LOCATION_ONLY_FIELDS
             and attr in self._active_area)
 
-class ActiveArea(dict):
+class ActiveArea(ObservedDict):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -96,6 +344,8 @@ class ActiveArea(dict):
         if self.get('specified_points'):
             self['specified_points'] = [Location(p, active_area=self)
                 for p in self['specified_points']]
+        elif 'specified_points' in self:
+            self['specified_points'] = self['specified_points']
 
         if self.get('perimeter'):
             self['perimeter'] = Location(self['perimeter'], active_area=self)
@@ -112,6 +362,9 @@ class ActiveArea(dict):
             return self.locations
         return super().__getitem__(attr)
 
+    def _convert_specified_points(self, val):
+        return _to_observed_list(val)
+
     @property
     def locations(self):
         """Returns the specified_points or perimeter as list.
@@ -183,14 +436,19 @@ class ActiveArea(dict):
         else:
             raise ValueError(self.MISSING_LOCATION_INFO_FOR_ACTIVE_AREA)
 
-class ActivityCollection(dict):
+class ActivityCollection(ObservedDict):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
+        if 'active_areas' in self:
+            self['active_areas'] = self['active_areas']
         for i in range(len(self.get('active_areas', []))):
             self['active_areas'][i] = ActiveArea(self['active_areas'][i])
 
+    def _convert_active_areas(self, val):
+        return _to_observed_list(val)
+
     @property
     def active_areas(self):
         return self.get('active_areas', [])
@@ -8,18 +8,18 @@ import itertools
 import io
 import json
 import logging
-import subprocess
 import sys
 import traceback
 import urllib.request
 import uuid
 import gzip
-from collections import OrderedDict
+import zlib
+from collections import OrderedDict, defaultdict
 
 import requests
 from pyairfire import process
 
-from bluesky import datautils, datetimeutils, __version__
+from bluesky import datautils, datetimeutils, jsonstream, __version__
 from bluesky.config import Config
 from bluesky.exceptions import (
     BlueSkyImportError, BlueSkyModuleError
@@ -28,7 +28,9 @@ from bluesky.filtermerge.filter import FireActivityFilter
 from bluesky.filtermerge.merge import FiresMerger
 from bluesky.statuslogging import StatusLogger
 
-from .activity import ActiveArea, ActivityCollection
+from .activity import (
+    ActiveArea, ActivityCollection, Location, ObservedList
+)
 
 __all__ = [
     'Fire',
@@ -70,6 +72,8 @@ class Fire(dict):
             self['fuel_type'] = self._validate_fuel_type(self['fuel_type'])
 
         # convert each active area dict into an ActiveArea Object
+        if 'activity' in self:
+            self['activity'] = self['activity']
         for i in range(len(self.get('activity', []))):
             self['activity'][i] = ActivityCollection(self['activity'][i])
 
@@ -95,14 +99,10 @@ class Fire(dict):
     def active_areas(self):
         """Returns flat list of fire active areas, from across all activity
         collections.
-
-        We could memoize this method, but would need to invalidate
-        when adding/removing collections or active areas, or when
-        modifying points or perimeters.
         """
-        return list(itertools.chain.from_iterable(
-            [ac.active_areas for ac in self.get('activity', [])]
-        ))
+        return list(self._memoized('active_areas', lambda: list(
+            itertools.chain.from_iterable(
+                [ac.active_areas for ac in self.get('activity', [])]))))
 
     @property
     def locations(self):
@@ -110,24 +110,27 @@ class Fire(dict):
 
         Use in summarizing code.
         """
-        return list(itertools.chain.from_iterable(
-            [aa.locations for aa in self.active_areas]))
-
+        return list(self._memoized('locations', lambda: list(
+            itertools.chain.from_iterable(
+                [aa.locations for aa in self.active_areas]))))
 
     @property
     def start(self):
         """Returns start of initial activity window
-
-        Doesn't memoize, in case activity windows are added/removed/modified
         """
+        start, self.__utc_offset = self._memoized('start', self._get_start)
+        return start
+
+    def _get_start(self):
         # consider only activie areas with start times
         active_areas = [a for a in self.active_areas if a.get('start')]
         if active_areas:
             active_areas = sorted(active_areas, key=lambda a: a['start'])
             # record utc offset of initial active area, in case
             # start_utc is being called
-            self.__utc_offset = active_areas[0].get('utc_offset')
-            return datetimeutils.parse_datetime(active_areas[0]['start'], 'start')
+            return (datetimeutils.parse_datetime(active_areas[0]['start'], 'start'),
+                active_areas[0].get('utc_offset'))
+        return None, None
 
     @property
     def start_utc(self):
@@ -137,26 +140,102 @@ class Fire(dict):
     def end(self):
         """Returns end of final activity window
 
-        Doesn't memoize, in case activity windows are added/removed/modified
-
         TODO: take into account possibility of activity objects having different
           utc offsets.  (It's an extreme edge case where one start/end string
           is gt/lt another when utc offset is ignored but not when utc offset
           is considered, so this isn't a high priority)
         """
+        end, self.__utc_offset = self._memoized('end', self._get_end)
+        return end
+
+    def _get_end(self):
         # consider only activie areas with end times
         active_areas = [a for a in self.active_areas if a.get('end')]
         if active_areas:
             active_areas = sorted(active_areas, key=lambda a: a['end'])
-            # record utc offset of initial active area, in case
-            # start_utc is being called
-            self.__utc_offset = active_areas[-1].get('utc_offset')
-            return datetimeutils.parse_datetime(active_areas[-1]['end'], 'end')
+            # record utc offset of final active area, in case
+            # end_utc is being called
+            return (datetimeutils.parse_datetime(active_areas[-1]['end'], 'end'),
+                active_areas[-1].get('utc_offset'))
+        return None, None
 
     @property
     def end_utc(self):
         return self._to_utc(self.end)
 
+    def _memoized(self, key, compute):
+        """Returns the value of compute(), memoized until the fire's
+        activity data is modified.
+
+        Modifications are detected with the modification counts kept by
+        the root activity list (see activity._Observed), and so values are
+        only memoized if the activity data is made up entirely of
+        ActivityCollection, ActiveArea, Location, and ObservedList objects,
+        which record their modifications. Otherwise, they're recomputed on
+        every call.
+        """
+        activity = self.get('activity')
+        if type(activity) is not ObservedList:
+            return compute()
+
+        cache = self.__dict__.get('_activity_cache')
+        if not cache or cache['activity'] is not activity:
+            cache = {
+                # Referenced to detect reassignment of 'activity'
+                'activity': activity,
+                'structure_version': None,
+                'observed': False,
+                'version': None,
+                'values': {}
+            }
+            self._activity_cache = cache
+
+        # The activity data only needs to be re-inspected if
+        # containers were added or replaced
+        if cache['structure_version'] != activity._structure_version:
+            cache['observed'] = self._is_observed(activity)
+            cache['structure_version'] = activity._structure_version
+        if cache['version'] != activity._version:
+            cache['values'] = {}
+            cache['version'] = activity._version
+
+        if key in cache['values']:
+            return cache['values'][key]
+
+        version = activity._version
+        value = compute()
+        # Don't memoize if activity data was modified during computation
+        # (e.g. by ActiveArea.locations casting string areas to float)
+        if cache['observed'] and activity._version == version:
+            cache['values'][key] = value
+        return value
+
+    @staticmethod
+    def _is_observed(activity):
+        def is_a(val, klass, optional=False):
+            return type(val) is klass or (optional and val is None)
+
+        if not is_a(activity, ObservedList):
+            return False
+        for ac in activity:
+            if not (is_a(ac, ActivityCollection) and
+                    is_a(ac.get('active_areas'), ObservedList, True)):
+                return False
+            for aa in ac.active_areas:
+                points = aa.get('specified_points')
+                if not (is_a(aa, ActiveArea)
+                        and is_a(points, ObservedList, True)
+                        and all(is_a(p, Location) for p in points or [])
+                        and is_a(aa.get('perimeter'), Location, True)):
+                    return False
+        return True
+
+    def __getstate__(self):
+        # Memoized values are only valid in the process that computed them
+        state = self.__dict__.copy()
+        state.pop('_activity_cache', None)
+        return state
+
     def _to_utc(self, dt):
         if dt:
             if self.__utc_offset:
@@ -192,6 +271,11 @@ class Fire(dict):
     VALID_FUEL_TYPES = ('natural', 'activity', 'piles')
     INVALID_FUEL_TYPE_MSG = "Invalid fire 'fuel_type': {}"
 
+    def _validate_activity(self, val):
+        # Activity lists are observed so that memoized values derived from
+        # them are invalidated when they're modified (see _memoized)
+        return ObservedList(val) if type(val) is list else val
+
     def _validate_fuel_type(self, val):
         val = val.lower()
         if val not in self.VALID_FUEL_TYPES:
@@ -261,11 +345,12 @@ class FiresManager():
 
     def add_fires(self, fires):
         for fire in fires:
-            # cast to Fire, in case it isn't already
-            # TODO: should add_fire do the casting?
-            self.add_fire(Fire(fire))
+            self.add_fire(fire)
 
     def add_fire(self, fire):
+        # cast to Fire, in case it isn't already
+        if not isinstance(fire, Fire):
+            fire = Fire(fire)
         self._fires = self._fires or OrderedDict()
         if fire.id not in self._fires:
             self._fires[fire.id] = []
@@ -284,6 +369,24 @@ class FiresManager():
                 # that was last fire with that id
                 self._fires.pop(fire.id)
 
+    def remove_fires(self, fires):
+        """Removes multiple fires, in one pass through each fire id's list,
+        with the same result as calling remove_fire for each.
+        """
+        private_ids_by_id = defaultdict(set)
+        for fire in fires:
+            private_ids_by_id[fire.id].add(fire._private_id)
+
+        for fire_id, private_ids in private_ids_by_id.items():
+            if fire_id in self._fires:
+                _n = len(self._fires[fire_id])
+                self._fires[fire_id] = [f for f in self._fires[fire_id]
+                    if f._private_id not in private_ids]
+                self._num_fires -= (_n - len(self._fires[fire_id]))
+                if len(self._fires[fire_id]) == 0:
+                    # those were the last fires with that id
+                    self._fires.pop(fire_id)
+
     ##
     ## Merging Fires
     ##
@@ -352,7 +455,7 @@ class FiresManager():
         self._num_fires = 0
         self._fires = OrderedDict()
         for fire in fires_list:
-            self.add_fire(Fire(fire))
+            self.add_fire(fire)
 
     ##
     ## Special Meta Attributes
@@ -699,44 +802,14 @@ class FiresManager():
 
         if not input_stream:
             input_stream = self._stream(input_file, 'rb')
-        input_stream = b''.join([
-            d.encode() if hasattr(d, 'encode') else d for d in input_stream])
-
-        try:
-            input_stream = gzip.decompress(input_stream)
-            logging.info("Decompressed input with gzip.compress")
-        except Exception as e:
-            try:
-                logging.info("Failed to gzip.decompress %s: %s", input_file or '', e)
-                logging.info("Trying zcat (forked process)")
-                # call `subprocess.run` without `check=True` because there
-                # are cases where `zcat` returns error 1 with message
-                # 'unexpected end of file', but actually successfully
-                # decompresses and returns (to stdout) the complete output data.
-                result = subprocess.run(['zcat', input_file],
-                    capture_output=True, text=True)
-
-                # We can't rely on `result.returncode` (see comment above).
-                # So, check for data written to stdout. (If the input data
-                # is uncompressed, `result.stdout` will be an empty string.
-                if result.stdout:
-                    logging.info("Decompressed input with zcat")
-                    input_stream = result.stdout
-                else:
-                    logging.info("Failed to zcat %s", input_file or '')
-                    logging.info("Input %s does not appear to be gzip'd", input_file or '')
-            except Exception as eZcat:
-                logging.info("Failed to zcat %s: %s", input_file or '', eZcat)
-                logging.info("Input %s does not appear to be gzip'd", input_file or '')
-
-        # If the input was decompressed with zcat, then it will already
-        # be raw text, and thus not have the 'decode' method.
-        if hasattr(input_stream, 'decode'):
-            input_stream = input_stream.decode()
 
+        # The input is decompressed, if gzip'd, and parsed incrementally,
+        # with each fire parsed and converted to a Fire object separately,
+        # to bound peak memory
         try:
-            data = json.loads(input_stream)
-        except json.decoder.JSONDecodeError as e:
+            data = jsonstream.load(input_stream,
+                streamed_keys=('fires', 'fire_information'), item_hook=Fire)
+        except (json.decoder.JSONDecodeError, UnicodeDecodeError, zlib.error) as e:
             raise ValueError(f"Invalid json: {str(e)}")
 
         self.load(data, append_fires=append_fires)
@@ -772,11 +845,16 @@ class FiresManager():
         if not output_stream:
             flag = 'wb' if compress else 'w'
             output_stream = self._stream(output_file, flag, compress=compress)
-        # TODO: py 3.13+ supposedly supports kwarg `round_floats`.
-        #   If so, use it once bluesky is upgraded to 26.06
-        fire_json = json.dumps(round_floats(self.dump()), sort_keys=True, cls=FireEncoder,
-            indent=indent)
-        if compress:
-            fire_json = gzip.compress(fire_json.encode())
 
-        output_stream.write(fire_json)
+        # Fires are rounded, encoded, and written (and compressed) one at a
+        # time, rather than as one string, to bound peak memory. (The json
+        # C encoder doesn't support custom float formatting, so floats are
+        # rounded per fire just before being encoded.)
+        text_stream = (io.TextIOWrapper(gzip.GzipFile(fileobj=output_stream,
+            mode='wb'), encoding='utf-8') if compress else output_stream)
+        jsonstream.dump(self.dump(), text_stream, streamed_keys=('fires',),
+            hook=round_floats, indent=indent, sort_keys=True, cls=FireEncoder)
+        if compress:
+            # Closes the GzipFile, to write the gzip trailer, but not
+            # output_stream
+            text_stream.close()
@@ -2,6 +2,7 @@
 
 __author__ = "Joel Dubowy"
 
+import copy
 import itertools
 import io
 import json
@@ -15,7 +16,7 @@ import consume
 from bluesky.config import Config
 from bluesky import datautils, datetimeutils
 from bluesky.consumeutils import (
-    _apply_settings, FuelLoadingsManager, CONSUME_VERSION_STR
+    _apply_settings, _get_settings, FuelLoadingsManager, CONSUME_VERSION_STR
 )
 from bluesky import exceptions
 from bluesky.locationutils import LatLng
@@ -51,12 +52,12 @@ def run(fires_manager):
 
     _validate_input(fires_manager)
 
-    # TODO: can I safely instantiate one FuelConsumption object and
-    # use it across all fires, or at lesat accross all fuelbeds within
-    # a single fire?
-    for fire in fires_manager.fires:
-        with fires_manager.fire_failure_handler(fire):
-            _run_fire(fire, fuel_loadings_manager)
+    if Config().get('consumption', 'batch_fuelbeds'):
+        _run_batched(fires_manager, fuel_loadings_manager)
+    else:
+        for fire in fires_manager.fires:
+            with fires_manager.fire_failure_handler(fire):
+                _run_fire(fire, fuel_loadings_manager)
 
     datautils.summarize_all_levels(fires_manager, 'consumption')
     datautils.summarize_all_levels(fires_manager, 'heat')
@@ -67,6 +68,15 @@ def run(fires_manager):
 def _run_fire(fire, fuel_loadings_manager):
     logging.debug("Consume consumption - fire {}".format(fire.id))
 
+    for loc, fuelbeds in _get_location_fuelbeds(fire, fuel_loadings_manager):
+        for fb_args in fuelbeds:
+            _run_fuelbed(*fb_args)
+        _scale(loc)
+
+def _get_location_fuelbeds(fire, fuel_loadings_manager):
+    """Returns a list of (location, fuelbeds) tuples, where fuelbeds is the
+    list of _run_fuelbed args for each of the location's fuelbeds
+    """
     # Piles can now be specified at location scope (per specified point
     # or perimeter), but top level 'fuel_type', can't be 'piles'
     # TODO: set burn type to 'activity' if fire.fuel_type == 'piles' ?
@@ -75,10 +85,7 @@ def _run_fire(fire, fuel_loadings_manager):
     burn_type = fire.fuel_type
     fire_type = fire.type
 
-    # TODO: can I run consume on all fuelbeds at once and get per-fuelbed
-    # results?  If it is simply a matter of parsing separated values from
-    # the results, make sure that running all at once produces any performance
-    # gain; if it doesn't,then it might not be worth the trouble
+    location_fuelbeds = []
     for ac in fire['activity']:
         for aa in ac.active_areas:
             if not aa.get('start'):
@@ -95,19 +102,83 @@ def _run_fire(fire, fuel_loadings_manager):
                     get_piles_fuel_loadings_manager(loc) or fuel_loadings_manager
                 )
 
+                fuelbeds = []
                 for fb in loc['fuelbeds']:
                     fb_area = loc['area'] * (fb['pct'] / 100)
                     fb_fuel_loadings_manager = FuelLoadingsManager(all_fuel_loadings={
                         fb['fccs_id']: { k: v / fb_area for k, v in fb['fuel_loadings'].items() }
                     }) if fb.get('fuel_loadings') else loc_fuel_loadings_manager
 
-                    _run_fuelbed(fb, loc, fb_fuel_loadings_manager, season,
-                        burn_type, fire_type)
+                    fuelbeds.append((fb, loc, fb_fuel_loadings_manager, season,
+                        burn_type, fire_type))
+
+                location_fuelbeds.append((loc, fuelbeds))
 
-                # scale with estimated consumption or fuel load, if specified
-                # and if configured to do so
-                (_scale_with_estimated_consumption(loc)
-                    or _scale_with_estimated_fuelload(loc))
+    return location_fuelbeds
+
+def _scale(loc):
+    # scale with estimated consumption or fuel load, if specified
+    # and if configured to do so
+    (_scale_with_estimated_consumption(loc)
+        or _scale_with_estimated_fuelload(loc))
+
+
+##
+## Batched Mode
+##
+
+def _run_batched(fires_manager, fuel_loadings_manager):
+    """Runs consume once per group of fuelbeds, across all fires, that share
+    the same fuel loadings source and consume settings
+
+    consume computes each row (fuelbed) independently, so the results are
+    the same as when running fuelbeds individually. If a batch fails, its
+    fuelbeds are re-run individually so that the failure is attributed
+    to the right fire(s).
+    """
+    fires_location_fuelbeds = []
+    batches = {}
+    for fire in fires_manager.fires:
+        with fires_manager.fire_failure_handler(fire):
+            logging.debug("Consume consumption - fire {}".format(fire.id))
+            location_fuelbeds = _get_location_fuelbeds(fire,
+                fuel_loadings_manager)
+            keyed_fuelbeds = [(_batch_key(*fb_args), fb_args)
+                for loc, fuelbeds in location_fuelbeds for fb_args in fuelbeds]
+
+            fires_location_fuelbeds.append((fire, location_fuelbeds))
+            for key, fb_args in keyed_fuelbeds:
+                batches.setdefault(key, []).append((fire, fb_args))
+
+    failed = set()
+    for batch in batches.values():
+        try:
+            _run_fuelbeds([fb_args for fire, fb_args in batch])
+
+        except Exception as e:
+            logging.debug("Failed to run batch of %s fuelbeds (%s); running "
+                "them individually", len(batch), e)
+            for fire, fb_args in batch:
+                if fire._private_id not in failed:
+                    failed.add(fire._private_id)
+                    with fires_manager.fire_failure_handler(fire):
+                        _run_fuelbed(*fb_args)
+                        failed.remove(fire._private_id)
+
+    for fire, location_fuelbeds in fires_location_fuelbeds:
+        if fire._private_id not in failed:
+            with fires_manager.fire_failure_handler(fire):
+                for loc, fuelbeds in location_fuelbeds:
+                    _scale(loc)
+
+def _batch_key(fb, location, fuel_loadings_manager, season,
+        burn_type, fire_type):
+    fuel_loadings_csv_filename = fuel_loadings_manager.generate_custom_csv(
+        fb['fccs_id'])
+    settings = _get_settings(location, burn_type, fire_type)
+    # Settings values may be unhashable (e.g. lists), so use their reprs
+    return (id(fuel_loadings_manager), fuel_loadings_csv_filename, burn_type,
+        tuple(sorted((k, repr(v)) for k, v in settings.items())))
 
 
 SCALE_WITH_ESTIMATED_CONSUMPTION = Config().get('consumption',
@@ -247,6 +318,20 @@ def get_piles_fuel_loadings_manager(loc):
 
 def _run_fuelbed(fb, location, fuel_loadings_manager, season,
         burn_type, fire_type):
+    _run_fuelbeds([(fb, location, fuel_loadings_manager, season,
+        burn_type, fire_type)])
+
+def _run_fuelbeds(fuelbeds):
+    """Runs consume on fuelbeds, a list of _run_fuelbed args tuples, in a
+    single FuelConsumption invocation.
+
+    The fuelbeds must share the same fuel loadings manager, custom fuel
+    loadings file, and consume settings, since they're applied to all
+    rows; only the fuelbed, area, ecoregion, and season vary per row.
+    """
+    (fb, location, fuel_loadings_manager, season,
+        burn_type, fire_type) = fuelbeds[0]
+
     fuel_loadings_csv_filename = fuel_loadings_manager.generate_custom_csv(
         fb['fccs_id'])
 
@@ -254,22 +339,27 @@ def _run_fuelbed(fb, location, fuel_loadings_manager, season,
         fccs_file=fuel_loadings_csv_filename,
         msg_level=logging.root.level)
 
-    fb['fuel_loadings'] = fuel_loadings_manager.get_fuel_loadings(fb['fccs_id'], fc.FCCS)
+    # Fuel loadings are looked up once per FCCS id and copied, since
+    # they're scaled by area in place, below
+    fuel_loadings = {}
+    for fb, *_ in fuelbeds:
+        if fb['fccs_id'] not in fuel_loadings:
+            fuel_loadings[fb['fccs_id']] = fuel_loadings_manager.get_fuel_loadings(
+                fb['fccs_id'], fc.FCCS)
+        fb['fuel_loadings'] = copy.copy(fuel_loadings[fb['fccs_id']])
 
     fc.burn_type = burn_type
-    fc.fuelbed_fccs_ids = [fb['fccs_id']]
-    fc.season = [season]
+    fc.fuelbed_fccs_ids = [fb['fccs_id'] for fb, *_ in fuelbeds]
+    fc.season = [f[3] for f in fuelbeds]
 
-    # Note: if we end up running fc on all fuelbeds at once, use lists
-    # for the rest
     # Note: consumption output is always returned in tons per acre
     #  (see comment, below) and is linearly related to area, so the
     #  consumption values are the same regardless of what we set
     #  fuelbed_area_acres to.  Released heat output, on the other hand,
     #  is not linearly related to area, so we need to set area
-    area = (fb['pct'] / 100.0) * location['area']
-    fc.fuelbed_area_acres = [area]
-    fc.fuelbed_ecoregion = [location['ecoregion']]
+    areas = [(fb['pct'] / 100.0) * loc['area'] for fb, loc, *_ in fuelbeds]
+    fc.fuelbed_area_acres = areas
+    fc.fuelbed_ecoregion = [loc['ecoregion'] for fb, loc, *_ in fuelbeds]
 
     # In an error situation these two calls print errors to stdout
     # which we have to capture to include in our error message.
@@ -281,25 +371,42 @@ def _run_fuelbed(fb, location, fuel_loadings_manager, season,
     if _results:
         # TODO: validate that _results['consumption'] and
         #   _results['heat'] are defined
-        fb['consumption'] = _results['consumption']
-        fb['consumption'].pop('debug', None)
-        fb['heat'] = _results['heat release']
-
-        # Multiply each consumption value by area if output_inits is 'tons_ac'
-        # Note: regardless of what fc.output_units is set to, it gets
-        #  reset to 'tons_ac' in the call to fc.results, and the output values
-        #  are the same (presumably always in tons_ac)
-        # Also multiply heat by area, though we're currently not sure if the
-        # units are in fact BTU per acre
-        if fc.output_units == 'tons_ac':
-            datautils.multiply_nested_data(fb["consumption"], area)
-            datautils.multiply_nested_data(fb["heat"], area)
-            datautils.multiply_nested_data(fb["fuel_loadings"], area,
-                data_key_matcher=LOADINGS_KEY_MATCHER)
+        _results['consumption'].pop('debug', None)
+        for i, ((fb, *_), area) in enumerate(zip(fuelbeds, areas)):
+            if len(fuelbeds) == 1:
+                fb['consumption'] = _results['consumption']
+                fb['heat'] = _results['heat release']
+            else:
+                fb['consumption'] = _select_row(_results['consumption'], i)
+                fb['heat'] = _select_row(_results['heat release'], i)
+
+            # Multiply each consumption value by area if output_inits is 'tons_ac'
+            # Note: regardless of what fc.output_units is set to, it gets
+            #  reset to 'tons_ac' in the call to fc.results, and the output values
+            #  are the same (presumably always in tons_ac)
+            # Also multiply heat by area, though we're currently not sure if the
+            # units are in fact BTU per acre
+            if fc.output_units == 'tons_ac':
+                datautils.multiply_nested_data(fb["consumption"], area)
+                datautils.multiply_nested_data(fb["heat"], area)
+                datautils.multiply_nested_data(fb["fuel_loadings"], area,
+                    data_key_matcher=LOADINGS_KEY_MATCHER)
 
     else:
         raise RuntimeError("Failed to calculate consumption for "
-            "fuelbed {}: {}".format(fb['fccs_id'], stdout_target.getvalue()))
+            "fuelbed {}: {}".format(
+            ', '.join([str(fb['fccs_id']) for fb, *_ in fuelbeds]),
+            stdout_target.getvalue()))
+
+def _select_row(data, i):
+    """Returns the nested consume results data for the i'th fuelbed,
+    keeping each value as a single element array
+    """
+    if hasattr(data, 'items'):
+        return {k: _select_row(v, i) for k, v in data.items()}
+    if hasattr(data, '__getitem__') and not isinstance(data, str):
+        return data[i:i+1]
+    return data
 
 VALIDATION_ERROR_MSGS = {
     'NO_ACTIVITY': "Fire missing activity data required for computing consumption",
@@ -44,24 +44,57 @@ class EcoregionRunner():
         return self._ecoregion_lookup
 
     def run(self):
-        ecoregion_lookup = None # instantiate only if necessary
+        fire_locations = []
         for fire in self._fires_manager.fires:
             with self._fires_manager.fire_failure_handler(fire):
-                for loc in fire.locations:
+                fire_locations.append((fire,
+                    [loc for loc in fire.locations if not loc.get('ecoregion')]))
+
+        # Look up all locations at once, and then set them (or fail) per fire
+        results = iter(self._lookup_all(
+            [loc for fire, locs in fire_locations for loc in locs]))
+        for fire, locs in fire_locations:
+            lookups = [next(results) for loc in locs]
+            with self._fires_manager.fire_failure_handler(fire):
+                for loc, (latlng, ecoregion, exc) in zip(locs, lookups):
+                    if not exc:
+                        loc['ecoregion'] = ecoregion
+
                     if not loc.get('ecoregion'):
-                        exc = None
-                        try:
-                            latlng = LatLng(loc)
-                            loc['ecoregion'] = self.ecoregion_lookup.lookup(
-                                latlng.latitude, latlng.longitude)
-
-                        except Exception as e:
-                            exc = e
-
-                        if not loc.get('ecoregion'):
-                            logging.warning("Failed to look up ecoregion for "
-                                "{}, {}".format(latlng.latitude, latlng.longitude))
-                            self._use_default(loc, exc=exc)
+                        logging.warning("Failed to look up ecoregion for "
+                            "{}, {}".format(latlng and latlng.latitude,
+                            latlng and latlng.longitude))
+                        self._use_default(loc, exc=exc)
+
+    def _lookup_all(self, locs):
+        """Returns (latlng, ecoregion, exception) for each location"""
+        results = [None] * len(locs)
+        latlngs = []
+        for i, loc in enumerate(locs):
+            try:
+                latlngs.append((i, LatLng(loc)))
+            except Exception as e:
+                results[i] = (None, None, e)
+
+        if not latlngs:
+            return results
+
+        try:
+            ecoregions = self.ecoregion_lookup.lookup_many(
+                [(ll.latitude, ll.longitude) for i, ll in latlngs])
+            for (i, latlng), ecoregion in zip(latlngs, ecoregions):
+                results[i] = (latlng, ecoregion, None)
+
+        except Exception:
+            # Look up each location individually, to isolate the failure(s)
+            for i, latlng in latlngs:
+                try:
+                    results[i] = (latlng, self.ecoregion_lookup.lookup(
+                        latlng.latitude, latlng.longitude), None)
+                except Exception as e:
+                    results[i] = (latlng, None, e)
+
+        return results
 
     def _use_default(self, loc, exc=None):
         default_ecoregion = Config().get('ecoregion', 'default')
@@ -4,6 +4,7 @@ __author__ = "Joel Dubowy"
 
 import abc
 import copy
+import functools
 import itertools
 import logging
 import sys
@@ -219,8 +220,33 @@ class Feps(EmissionsBase):
 ## Prichard / O'Neill
 ##
 
+# EF lookup objects and calculators are cached process-wide, since
+# instantiating them, which loads and indexes the EF tables, is expensive
+# relative to computing a single fuelbed's emissions. They're not modified
+# after instantiation.
+LOOKUP_CACHE_SIZE = 2048
+CALCULATOR_CACHE_SIZE = 8192
+
+@functools.lru_cache(maxsize=LOOKUP_CACHE_SIZE)
+def _get_lookup(lookup_class, fccs_id, is_rx):
+    return lookup_class(fccs_id, is_rx=is_rx)
+
+@functools.lru_cache(maxsize=CALCULATOR_CACHE_SIZE)
+def _get_calculator(lookup_class, fccs_id, is_rx, species, fuel_categories):
+    """Returns a calculator for the fuelbed
+
+    fuel_categories, the set of consumption (category, sub-category)
+    pairs, is part of the cache key so that calculators, whose
+    emissions_factors may be included in the output, are only shared by
+    fuelbeds with the same fuel categories.
+    """
+    return EmissionsCalculator(_get_lookup(lookup_class, fccs_id, is_rx),
+        species=list(species))
+
 class PrichardOneill(EmissionsBase):
 
+    LOOKUP_CLASS = Fccs2SeraEf
+
     def __init__(self):
         super(PrichardOneill, self).__init__()
 
@@ -229,6 +255,10 @@ class PrichardOneill(EmissionsBase):
         self.fuel_loadings_manager = FuelLoadingsManager(
             all_fuel_loadings=all_fuel_loadings)
 
+        for fccs_id in Config().get('emissions', 'warm_cache_fccs_ids'):
+            for is_rx in (True, False):
+                _get_lookup(self.LOOKUP_CLASS, fccs_id, is_rx)
+
     # Consumption values are in tons, Prichard/ONeill EFS are in g/kg, and
     # we want emissions values in tons.  Since 1 g/kg == 2 lbs/ton, we need
     # to multiple the emissions output by:
@@ -246,8 +276,6 @@ class PrichardOneill(EmissionsBase):
             if 'fccs_id' not in fb:
                 raise ValueError(
                     "Missing FCCS Id required for computing emissions")
-            lookup = self._get_lookup_object(fire, fb)
-
             # use EmissionsCalculator (emitcalc) for non-pile emissions
             # if a fb has piles, remove them, so EmissionsCalculator
             #  doesn't calculate them.
@@ -261,7 +289,7 @@ class PrichardOneill(EmissionsBase):
                     fb['consumption']['woody fuels']['piles']['residual'][0] = 0
 
 
-            calculator = EmissionsCalculator(lookup, species=self.species)
+            calculator = self._get_calculator(fire, fb)
             _calculate(calculator, fb, self.include_emissions_details,
                 self.include_emissions_factors)
             # Convert from lbs to tons
@@ -343,8 +371,12 @@ class PrichardOneill(EmissionsBase):
 
 
 
-    def _get_lookup_object(self, fire, fuelbed):
-        return Fccs2SeraEf(fuelbed["fccs_id"], is_rx=(fire["type"]=="rx"))
+    def _get_calculator(self, fire, fuelbed):
+        fuel_categories = frozenset((c, sc)
+            for c in fuelbed["consumption"]
+                for sc in fuelbed["consumption"][c])
+        return _get_calculator(self.LOOKUP_CLASS, fuelbed["fccs_id"],
+            fire["type"]=="rx", tuple(self.species or []), fuel_categories)
 
 
 ##
@@ -353,8 +385,7 @@ class PrichardOneill(EmissionsBase):
 
 class Urbanski(PrichardOneill):
 
-    def _get_lookup_object(self, fire, fuelbed):
-        return Fccs2Ef(fuelbed["fccs_id"], is_rx=(fire["type"]=="rx"))
+    LOOKUP_CLASS = Fccs2Ef
 
 
 ##
@@ -372,6 +403,7 @@ class Consume(EmissionsBase):
             or Config().get('consumption','fuel_loadings'))
         self.fuel_loadings_manager = FuelLoadingsManager(
             all_fuel_loadings=all_fuel_loadings)
+        self.reuse_consumption = Config().get('emissions', 'reuse_consumption')
 
     def run_on_location(self, fire, aa, loc):
         logging.debug("Consume emissions - fire {} loc {}".format(fire.get("id"), hash(str(loc))))
@@ -412,7 +444,8 @@ class Consume(EmissionsBase):
         area = (fb['pct'] / 100.0) * loc['area']
         fc = FuelConsumptionForEmissions(fb["consumption"], fb['heat'],
             area, burn_type, fire_type, fb['fccs_id'], season, loc,
-            fccs_file=fuel_loadings_csv_filename)
+            fccs_file=fuel_loadings_csv_filename,
+            reuse_consumption=self.reuse_consumption)
 
         e_fuel_loadings = self.fuel_loadings_manager.get_fuel_loadings(
             fb['fccs_id'], fc.FCCS)
@@ -583,5 +616,6 @@ def _calculate(calculator, fb, include_emissions_details,
     if include_emissions_details:
         fb['emissions_details'] = emissions_details
     if include_emissions_factors:
-        fb['emissions_factors'] = calculator.emissions_factors
+        # Copied, since calculators are shared across fuelbeds
+        fb['emissions_factors'] = copy.deepcopy(calculator.emissions_factors)
 
@@ -2,8 +2,13 @@
 
 __author__ = "Joel Dubowy"
 
+import hashlib
+import json
 import logging
+import os
 import random
+import sqlite3
+import time
 from collections import defaultdict
 
 import fccsmap
@@ -20,26 +25,34 @@ __all__ = [
 __version__ = "0.1.0"
 
 
+# Settings that aren't passed to FccsLookUp or included in cache keys
+NON_LOOKUP_SETTINGS = ('cache_file',)
+
 def create_lookup_objects():
-    fccs_lookups = []
+    # Look up Objects need to be instantiated each time run is called in case
+    # the configuration changes from run to run (as happens in bluesky-web)
+    return [FccsLookUp(**options) for options in _get_lookup_options()]
+
+def _get_lookup_options():
+    base_options = {k: v for k, v in Config().get('fuelbeds').items()
+        if k not in NON_LOOKUP_SETTINGS}
+    options_list = []
 
     for f in Config().get('fuelbeds', 'fccs_fuelload_files'):
-        options = dict(**Config().get('fuelbeds'), fccs_fuelload_file=f)
-        fccs_lookups.append(FccsLookUp(**options))
+        options_list.append(dict(base_options, fccs_fuelload_file=f))
 
     for ts in Config().get('fuelbeds', 'fccs_fuelload_tile_sets'):
-        options = dict(**Config().get('fuelbeds'),
+        options_list.append(dict(base_options,
             tiles_directory=ts.get('directory'),
-            index_shapefile=ts.get('index_shapefile'))
-        fccs_lookups.append(FccsLookUp(**options))
+            index_shapefile=ts.get('index_shapefile')))
 
-    if not fccs_lookups:
-        fccs_lookups = [
-            FccsLookUp(is_alaska=False, **Config().get('fuelbeds')), # Lower 48
-            FccsLookUp(is_alaska=True, **Config().get('fuelbeds')) # AK
+    if not options_list:
+        options_list = [
+            dict(base_options, is_alaska=False), # Lower 48
+            dict(base_options, is_alaska=True) # AK
         ]
 
-    return fccs_lookups
+    return options_list
 
 def run(fires_manager):
     """Runs emissions module
@@ -55,31 +68,33 @@ def run(fires_manager):
 
     skip_failures = Config().get('fuelbeds', 'skip_failures')
 
-    # Look up Objects need to be instantiated each time run is called in case
-    # the configuration changes from run to run (as happens in bluesky-web)
     fccs_lookups = create_lookup_objects()
 
-    for fire in fires_manager.fires:
-        with fires_manager.fire_failure_handler(fire):
-            for aa in fire.active_areas:
-                # Note that aa.locations validates that each location object
-                # has either lat+lng+area or perimeter
-                for loc in aa.locations:
-                    # try each lookup object until one succeeds
-                    for lookup in fccs_lookups:
-                        try:
-                            Estimator(lookup).estimate(loc)
-                            break
-                        except Exception as e:
-                            pass
-
-                    if not loc.get('fuelbeds'):
-                        latlng = LatLng(loc)
-                        msg = ("Failed to lookup fuelbeds information for "
-                            f"loc {latlng.latitude}, {latlng.longitude} ")
-                        logging.error(msg)
-                        if not skip_failures:
-                            raise RuntimeError(msg)
+    cache = None
+    if Config().get('fuelbeds', 'cache_file'):
+        cache = FuelbedsCache(Config().get('fuelbeds', 'cache_file'),
+            _get_lookup_options())
+
+    try:
+        for fire in fires_manager.fires:
+            with fires_manager.fire_failure_handler(fire):
+                for aa in fire.active_areas:
+                    # Note that aa.locations validates that each location object
+                    # has either lat+lng+area or perimeter
+                    for loc in aa.locations:
+                        _estimate(loc, fccs_lookups, cache)
+
+                        if not loc.get('fuelbeds'):
+                            latlng = LatLng(loc)
+                            msg = ("Failed to lookup fuelbeds information for "
+                                f"loc {latlng.latitude}, {latlng.longitude} ")
+                            logging.error(msg)
+                            if not skip_failures:
+                                raise RuntimeError(msg)
+
+    finally:
+        if cache:
+            cache.close()
 
 
     # TODO: Add fuel loadings data to each fuelbed object (????)
@@ -94,6 +109,103 @@ def run(fires_manager):
 
     fires_manager.summarize(fuelbeds=summarize(fires_manager.fires))
 
+def _estimate(loc, fccs_lookups, cache):
+    key = None
+    if cache:
+        try:
+            key = cache.key(*Estimator.get_geo_data(loc))
+            fuelbed_info = cache.get(key)
+            if fuelbed_info:
+                Estimator.apply(loc, fuelbed_info)
+                return
+        except Exception as e:
+            logging.debug("Failed to use cached fuelbeds: %s", e)
+
+    # try each lookup object until one succeeds
+    for lookup in fccs_lookups:
+        try:
+            estimator = Estimator(lookup)
+            fuelbed_info = estimator.look_up(loc)
+            if key:
+                # The results are applied as they'd be read from the
+                # cache, so that hits and misses set the same values
+                try:
+                    fuelbed_info = cache.set(key, fuelbed_info)
+                except (TypeError, ValueError) as e:
+                    logging.warning("Failed to cache fuelbeds: %s", e)
+                    key = None
+            estimator.apply(loc, fuelbed_info)
+            break
+        except Exception as e:
+            pass
+
+def _to_json(data):
+    # numpy values, e.g. in fccsmap look-up results, are converted to
+    # native types; any other types that json doesn't support raise TypeError
+    def default(v):
+        if hasattr(v, 'item') and hasattr(v, 'dtype'):
+            return v.item()
+        raise TypeError("{} is not JSON serializable".format(type(v).__name__))
+
+    return json.dumps(data, sort_keys=True, default=default)
+
+
+class FuelbedsCache():
+    """On-disk (sqlite) cache of FCCS look-up results, for reuse across
+    runs (e.g. daily runs with the same persistent fires).
+
+    Results are keyed by a hash of the location's geometry and area and of
+    the look-up configuration, including the version of fccsmap and the
+    size and modification times of the fuel load files.
+    """
+
+    def __init__(self, filename, lookup_options):
+        self._config_id = _to_json([fccsmap.__version__] + [
+            dict(o, _files=self._get_files_info(o)) for o in lookup_options])
+        directory = os.path.dirname(os.path.abspath(filename))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(filename, timeout=60)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS fuelbeds "
+            "(key TEXT PRIMARY KEY, value TEXT, ts REAL)")
+        self._conn.commit()
+
+    def _get_files_info(self, options):
+        info = []
+        for k in ('fccs_fuelload_file', 'tiles_directory', 'index_shapefile'):
+            if options.get(k) and os.path.exists(options[k]):
+                st = os.stat(options[k])
+                info.append([options[k], st.st_size, st.st_mtime_ns])
+        return info
+
+    def key(self, geo_data, area_acres):
+        return hashlib.sha256(_to_json(
+            [self._config_id, geo_data, area_acres]).encode()).hexdigest()
+
+    def get(self, key):
+        row = self._conn.execute(
+            "SELECT value FROM fuelbeds WHERE key = ?", (key,)).fetchone()
+        return row and json.loads(row[0])
+
+    def set(self, key, fuelbed_info):
+        """Caches the look-up results, and returns them as get would
+
+        Raises TypeError, without caching anything, if the results
+        contain values that can't be stored as json.
+        """
+        value = _to_json(fuelbed_info)
+        try:
+            self._conn.execute("INSERT OR REPLACE INTO fuelbeds VALUES (?, ?, ?)",
+                (key, value, time.time()))
+        except sqlite3.Error as e:
+            logging.warning("Failed to cache fuelbeds: %s", e)
+        return json.loads(value)
+
+    def close(self):
+        try:
+            self._conn.commit()
+        finally:
+            self._conn.close()
+
 def summarize(fires):
     if not fires:
         return []
@@ -125,23 +237,28 @@ class Estimator():
         self.lookup = lookup
 
     def estimate(self, loc):
-        """Estimates fuelbed composition based on lat/lng or perimeter
+        """Estimates fuelbed composition based on lat/lng or perimeter,
+        returning the look-up results
         """
+        fuelbed_info = self.look_up(loc)
+        self.apply(loc, fuelbed_info)
+        return fuelbed_info
+
+    def look_up(self, loc):
+        """Returns the look-up results for the location"""
+        geo_data, area_acres = self.get_geo_data(loc)
+        # `area_acres` will only be considered if the geometry's type
+        # is Point or MultiPoint
+        return self.lookup.look_up(geo_data, area_acres=area_acres)
+
+    @staticmethod
+    def get_geo_data(loc):
+        """Returns the geojson and area to look up for the location"""
         if not loc:
             raise ValueError("Insufficient data for looking up fuelbed information")
 
         elif loc.get('geometry'):
-            geo_data = loc['geometry']
-            # `area_acres` will only be considered if the geometry's type
-            # is Point or MultiPoint
-            fuelbed_info = self.lookup.look_up(geo_data, area_acres=loc.get('area'))
-
-            # If loc['area'] is defined, then we want to keep it. We're dealing
-            # with a perimeter which may not be all burning.  If it isn't
-            # defined, then set loc['area'] to fuelbed_info['area']
-            if not loc.get('area') and fuelbed_info and fuelbed_info.get('area'):
-                # fuelbed_info['area'] is in m^2
-                loc['area'] = fuelbed_info['area'] * ACRES_PER_SQUARE_METER
+            return loc['geometry'], loc.get('area')
 
         elif loc.get('lat') and loc.get('lng'):
             geo_data = {
@@ -152,11 +269,24 @@ class Estimator():
                 ]
             }
             logging.debug("Converted lat,lng to geojson: %s", geo_data)
-            fuelbed_info = self.lookup.look_up(geo_data, area_acres=loc.get('area'))
+            return geo_data, loc.get('area')
 
         else:
             raise ValueError("Insufficient data for looking up fuelbed information")
 
+    @staticmethod
+    def apply(loc, fuelbed_info):
+        """Sets the location's fuelbeds (and area, if necessary) from the
+        look-up results
+        """
+        # If loc['area'] is defined, then we want to keep it. We're dealing
+        # with a perimeter which may not be all burning.  If it isn't
+        # defined, then set loc['area'] to fuelbed_info['area']
+        if (loc.get('geometry') and not loc.get('area')
+                and fuelbed_info and fuelbed_info.get('area')):
+            # fuelbed_info['area'] is in m^2
+            loc['area'] = fuelbed_info['area'] * ACRES_PER_SQUARE_METER
+
         if not fuelbed_info or not fuelbed_info.get('fuelbeds'):
             # TODO: option to ignore failures ?
             raise RuntimeError("Failed to lookup fuelbed information")
@@ -33,6 +33,7 @@ Currently supported types: file, API
 Currently supported formats: JSON, CSV
 """
 
+import concurrent.futures
 import importlib
 import logging
 
@@ -59,14 +60,23 @@ def run(fires_manager):
     sources = Config().get('load', 'sources')
     if not sources:
         raise BlueSkyConfigurationError("No sources specified for load module")
+    max_workers = min(len(sources),
+        Config().get('load', 'max_concurrent_sources') or len(sources))
+    executor = (max_workers > 1 and concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_workers))
+    succeeded = False
     try:
-        for source in sources:
+        # Sources are loaded concurrently, if so configured, but their
+        # fires are added in configured order, so that output is the same
+        # as when loading them sequentially
+        loaders = _submit_sources(executor, sources)
+        for source, load_source in zip(sources, loaders):
             # TODO: use something like with fires_manager.fire_failure_handler(fire)
             #   to optionally skip invalid sources (sources that are insufficiently
             #   configured, don't have corresponding loader class, etc.) and source
             #   that fail to load
             try:
-                loaded_fires = _load_source(source)
+                loaded_fires = load_source()
                 fires_manager.add_fires(loaded_fires)
                 # TODO: add fires to fires_manager
                 if source.get("name").lower() == "bsf":
@@ -81,10 +91,36 @@ def run(fires_manager):
                 if not (Config().get('skip_failed_sources')
                         or Config().get('load', 'skip_failed_sources', allow_missing=True)):
                     raise
+        succeeded = True
     finally:
+        if executor:
+            # On failure, don't wait for sources that are still loading
+            # (e.g. waiting for availability) before raising
+            executor.shutdown(wait=succeeded, cancel_futures=True)
         fires_manager.processed(__name__, __version__,
             successfully_loaded_sources=successfully_loaded_sources)
 
+def _submit_sources(executor, sources):
+    """Returns, for each source, a function that returns its loaded fires.
+
+    If executor is defined, sources are loaded in its threads, each with
+    a snapshot of this thread's config; otherwise, each is loaded when
+    its function is called.
+    """
+    if not executor:
+        return [lambda source=source: _load_source(source) for source in sources]
+
+    logging.info("Loading %d sources concurrently", len(sources))
+    config_snapshot = Config().snapshot()
+    futures = [executor.submit(_load_source_in_thread, config_snapshot, source)
+        for source in sources]
+    return [f.result for f in futures]
+
+def _load_source_in_thread(config_snapshot, source):
+    # Config is thread specific
+    Config().restore(config_snapshot)
+    return _load_source(source)
+
 def _load_source(source):
     # File loaders raise BlueSkyUnavailableResourceError in the
     # constructor, while API loaders raise it in 'load'.  So,
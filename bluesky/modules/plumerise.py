@@ -6,6 +6,7 @@ Requires time profiled emissions and localmet data.
 __author__ = "Joel Dubowy"
 
 import abc
+import concurrent.futures
 import copy
 import datetime
 import logging
@@ -16,9 +17,11 @@ from plumerise import sev, feps, __version__ as plumerise_version
 from pyairfire import sun, osutils
 import numpy
 
-from bluesky import datautils, datetimeutils, locationutils
+from bluesky import datautils, datetimeutils, io, locationutils
 from bluesky.config import Config
 from bluesky.exceptions import BlueSkyConfigurationError
+from bluesky.models.activity import ActiveArea, Location
+from bluesky.models.fires import Fire
 
 __all__ = [
     'run'
@@ -38,16 +41,23 @@ def run(fires_manager):
     working_dir = Config().get('plumerise', 'working_dir')
     delete_if_no_error = Config().get('plumerise', 'delete_working_dir_if_no_error')
 
+    num_processes = _get_num_processes()
+
     with osutils.create_working_dir(working_dir=working_dir,
             delete_if_no_error=delete_if_no_error) as working_dir:
-        for fire in fires_manager.fires:
-            with fires_manager.fire_failure_handler(fire):
-                if 'activity' not in fire:
-                    raise ValueError(NO_ACTIVITY_ERROR_MSG)
+        if num_processes > 1:
+            _run_in_processes(fires_manager, compute_func, working_dir,
+                num_processes)
+
+        else:
+            for fire in fires_manager.fires:
+                with fires_manager.fire_failure_handler(fire):
+                    if 'activity' not in fire:
+                        raise ValueError(NO_ACTIVITY_ERROR_MSG)
 
-                for aa in fire.active_areas:
-                    for loc in aa.locations:
-                        compute_func(fire, aa, loc, working_dir=working_dir)
+                    for aa in fire.active_areas:
+                        for loc in aa.locations:
+                            compute_func(fire, aa, loc, working_dir=working_dir)
 
     # Make sure to distribute the heat if it was loaded here.
     if compute_func.config.get("load_heat"):
@@ -69,6 +79,109 @@ MISSING_START_TIME_ERROR_MSG = "Missing fire activity start time required by FEP
 MISSING_LOCALMET_ERROR_MSG = "Missing localmet data required for computing SEV plumerise"
 
 
+def _get_num_processes():
+    num_processes = Config().get('plumerise', 'num_processes')
+    if num_processes is None or num_processes < 1:
+        num_processes = io.get_num_available_cpus()
+    return num_processes
+
+
+##
+## Parallel execution
+##
+
+def _run_in_processes(fires_manager, compute_func, working_dir, num_processes):
+    """Computes plumerise for all locations in a pool of worker processes
+
+    Each worker is initialized with a snapshot of the main thread's config,
+    and computes in its own scratch directory.  Each location is sent to
+    the workers as a plain dict, along with only the fire and active area
+    data needed to compute it, and only the fields set by the computation
+    are sent back and merged into the location.  Failures are handled in
+    the same order as when run serially.
+    """
+    tasks = []
+    for fire in fires_manager.fires:
+        try:
+            if 'activity' not in fire:
+                raise ValueError(NO_ACTIVITY_ERROR_MSG)
+
+            # just calling fire.locations will trigger missing area
+            # exception if any are missing area
+            fire.locations
+
+            fire_info = {k: fire[k] for k in ('id', 'type', 'meta') if k in fire}
+            tasks.append((fire, None, [(fire_info, aa, loc)
+                for aa in fire.active_areas for loc in aa.locations]))
+
+        except Exception as e:
+            # handled along with the results, in order
+            tasks.append((fire, e, []))
+
+    num_locations = sum([len(fire_tasks) for fire, e, fire_tasks in tasks])
+    num_processes = max(min(num_processes, num_locations), 1)
+    logging.info("Computing plumerise for %d locations in %d processes",
+        num_locations, num_processes)
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=num_processes,
+            initializer=_init_worker,
+            initargs=(Config().snapshot(), type(compute_func._compute_func),
+                working_dir)) as executor:
+        futures = [(fire, error, [(loc, executor.submit(_compute_location,
+                    fire_info, _get_active_area_info(aa), dict(loc)))
+                for fire_info, aa, loc in fire_tasks])
+            for fire, error, fire_tasks in tasks]
+
+        try:
+            for fire, error, fire_futures in futures:
+                with fires_manager.fire_failure_handler(fire):
+                    if error:
+                        raise error
+                    for loc, future in fire_futures:
+                        _merge_results(loc, future.result())
+        except:
+            for fire, error, fire_futures in futures:
+                for loc, future in fire_futures:
+                    future.cancel()
+            raise
+
+def _get_active_area_info(aa):
+    # The locations are sent separately
+    return {k: v for k, v in aa.items()
+        if k not in ('specified_points', 'perimeter')}
+
+# Location fields set by the compute functions
+_RESULT_FIELDS = ('plumerise', 'plumerise-model', 'sunrise_hour',
+    'sunset_hour')
+
+def _merge_results(loc, results):
+    heat = results.pop('heat', None)
+    if heat is not None:
+        loc['fuelbeds'][0]['heat'] = heat
+    loc.update(results)
+
+_WORKER = {}
+
+def _init_worker(config_snapshot, compute_class, working_dir):
+    Config().restore(config_snapshot)
+    _WORKER['compute_func'] = compute_class()
+    _WORKER['working_dir'] = os.path.join(working_dir,
+        'worker-{}'.format(os.getpid()))
+
+def _compute_location(fire_info, aa_info, loc_info):
+    # The location falls back on its active area for fields like
+    # 'utc_offset', as it does in the main process
+    aa = ActiveArea(aa_info)
+    loc = Location(loc_info, active_area=aa)
+    _WORKER['compute_func'](Fire(fire_info), aa, loc,
+        _WORKER['working_dir'])
+
+    results = {k: loc[k] for k in _RESULT_FIELDS if k in loc.keys()}
+    if loc.get('fuelbeds') and 'heat' in loc['fuelbeds'][0]:
+        results['heat'] = loc['fuelbeds'][0]['heat']
+    return results
+
+
 def _get_fire_working_dir(fire, model, working_dir):
     fire_working_dir = os.path.join(working_dir,
         "{}-plumerise-{}".format(model, fire.id))
@@ -17,7 +17,7 @@ from timeprofile.static import (
 from timeprofile.feps import FepsTimeProfiler, FireType
 
 from bluesky.config import Config
-from bluesky.datetimeutils import parse_datetimes, parse_datetime
+from bluesky.datetimeutils import hour_keys, parse_datetimes, parse_datetime
 from bluesky.exceptions import BlueSkyConfigurationError
 
 from bluesky.timeprofilers import ubcbsffeps
@@ -66,15 +66,17 @@ def _run_fire(hourly_fractions, fire):
     for a in active_areas:
         profiler = _get_profiler(hourly_fractions, fire, a)
 
-        # convert timeprofile to dict with dt keys
-        a['timeprofile'] = {}
+        # convert timeprofile to dict with dt keys; each phase's
+        # hourly fractions should have the same length
         fields = list(profiler.hourly_fractions.keys())
-        for i in range(len(list(profiler.hourly_fractions.values())[0])): # each phase should have same len
-            hr = profiler.start_hour + (i * profiler.ONE_HOUR)
-            a['timeprofile'][hr.isoformat()] = {
-                p: profiler.hourly_fractions[p][i] for p in fields }
-            logging.debug('[timeprofile] hr %d - %s - %s',
-                i, hr.isoformat(), a['timeprofile'][hr.isoformat()])
+        columns = list(profiler.hourly_fractions.values())
+        a['timeprofile'] = {
+            hr: {p: c[i] for p, c in zip(fields, columns)}
+            for i, hr in enumerate(hour_keys(profiler.start_hour,
+                len(columns[0])))
+        }
+        for i, (hr, fractions) in enumerate(a['timeprofile'].items()):
+            logging.debug('[timeprofile] hr %d - %s - %s', i, hr, fractions)
 
         logging.debug('[timeprofile] summed area_fraction in profiler.hourly_fractions: %s',
             sum(profiler.hourly_fractions['area_fraction']))
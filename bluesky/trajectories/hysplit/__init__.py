@@ -2,6 +2,7 @@
 
 __version__ = "0.1.0"
 
+import concurrent.futures
 import datetime
 import logging
 import os
@@ -58,11 +59,13 @@ class HysplitTrajectories():
 
         else:
             num_failed = 0
-            for start_hour in self._config['start_hours']:
+            for start_hour, future in self._run_start_hours():
                 try:
-                    logging.debug("Computing trajectories for start_hour %s",
-                        start_hour)
-                    self._run_start_hour(start_hour)
+                    output = future.result()
+                    # Output is added to the locations here, in the
+                    # order of the start hours, rather than concurrently
+                    if output:
+                        self._output_loader.add_output(*output)
 
                 except Exception as e:
                     num_failed += 1
@@ -92,7 +95,43 @@ class HysplitTrajectories():
 
     ## Helpers
 
-    def _run_start_hour(self, start_hour):
+    def _run_start_hours(self):
+        """Runs hysplit for each start hour, concurrently in up to
+        'num_processes' threads, and yields each start hour along with
+        the future of its run, in order.
+        """
+        start_hours = self._config['start_hours']
+        max_workers = self._get_max_concurrent_runs(len(start_hours))
+        if max_workers > 1:
+            logging.info("Running hysplit trajectories for %d start hours "
+                "in up to %d concurrent processes", len(start_hours),
+                max_workers)
+
+        config_snapshot = Config().snapshot()
+        delete_if_no_error = Config().get(
+            'trajectories', 'delete_working_dir_if_no_error')
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers) as executor:
+            futures = [executor.submit(self._run_start_hour, start_hour,
+                config_snapshot, delete_if_no_error)
+                for start_hour in start_hours]
+            for start_hour, future in zip(start_hours, futures):
+                yield start_hour, future
+
+    def _get_max_concurrent_runs(self, num_start_hours):
+        max_processes = self._config.get('num_processes')
+        if max_processes is None or max_processes < 1:
+            max_processes = io.get_num_available_cpus()
+        return max(1, min(num_start_hours, max_processes))
+
+    def _run_start_hour(self, start_hour, config_snapshot, delete_if_no_error):
+        """Runs hysplit for the start hour, returning the output to be added
+        to the locations, or None if there's no activity at the start hour.
+        """
+        # Config is thread specific
+        Config().restore(config_snapshot)
+        logging.debug("Computing trajectories for start_hour %s", start_hour)
+
         start_s = self._start + datetime.timedelta(hours=start_hour)
         working_dir_s = self._working_dir and os.path.join(
             self._working_dir, str(start_hour))
@@ -100,10 +139,8 @@ class HysplitTrajectories():
         locations = self._filter_locations(start_s)
         if not locations:
             logging.warning("No activity at start hour %s. Skipping hysplit", start_s)
-            return
+            return None
 
-        delete_if_no_error = Config().get(
-            'trajectories', 'delete_working_dir_if_no_error')
         with osutils.create_working_dir(working_dir=working_dir_s,
                 delete_if_no_error=delete_if_no_error) as wdir:
             met_files = self._get_met_files(start_s)
@@ -112,7 +149,8 @@ class HysplitTrajectories():
             self._sym_link_met_files(wdir, met_files)
             self._sym_link_static_files(wdir)
             self._run_hysplit(wdir)
-            self._output_loader.load(start_s, wdir, locations)
+            return (start_s, self._output_loader.read_output_file(wdir),
+                locations)
 
     def _filter_locations(self, start_s):
         locations = [l for l in self._locations
@@ -97,7 +97,38 @@ class OutputLoader():
 
     def load(self, start, working_dir, locations):
         self._initialize_locations(start, locations)
-        self._load_output_file(start, working_dir, locations)
+        self._add_points(self.read_output_file(working_dir), locations)
+
+    def read_output_file(self, working_dir):
+        """Returns a list of (set index, [lat, lng, height]) for each
+        trajectory point in the output file, to be passed to add_output
+        """
+        output = []
+        filename = os.path.join(working_dir, self._config['output_file_name'])
+        with open(filename, 'r') as f:
+            for line in f:
+                parts = re.split('\s+', line.strip())
+                if len(parts) >= 13:
+                    output.append((int(parts[0]) - 1,
+                        [float(parts[9]), float(parts[10]), float(parts[11])]))
+        return output
+
+    def add_output(self, start, output, locations):
+        """Adds trajectories read from the output file of the run starting
+        at `start` to the locations
+        """
+        self._initialize_locations(start, locations)
+        self._add_points(output, locations)
+
+    def _add_points(self, output, locations):
+        num_heights = len(self._config['heights'])
+        for set_idx, point in output:
+            l_idx = int(set_idx / num_heights)
+            h_idx = set_idx % num_heights
+            # since the location could have traj lines from other
+            # start times, we're indexing from the back of the list
+            reverse_h_idx = -num_heights + h_idx
+            locations[l_idx]['trajectories']['lines'][reverse_h_idx]['points'].append(point)
 
     def _initialize_locations(self, start, locations):
         for loc in locations:
@@ -112,21 +143,3 @@ class OutputLoader():
                     "height": h,
                     "points": []
                 })
-
-
-    def _load_output_file(self, start, working_dir, locations):
-        filename = os.path.join(working_dir, self._config['output_file_name'])
-        with open(filename, 'r') as f:
-            num_heights = len(self._config['heights'])
-            for line in f:
-                parts = re.split('\s+', line.strip())
-                if len(parts) >= 13:
-                    set_idx = int(parts[0]) - 1
-                    l_idx = int(set_idx / num_heights)
-                    h_idx = set_idx % num_heights
-                    # since the location could have traj lines from other
-                    # start times, we're indexing from the back of the list
-                    reverse_h_idx = -num_heights + h_idx
-                    locations[l_idx]['trajectories']['lines'][reverse_h_idx]['points'].append(
-                        [float(parts[9]), float(parts[10]), float(parts[11])]
-                    )
@@ -399,3 +399,76 @@ class TestThreadSafety():
             t.join()
             if t.exception:
                 raise t.exception
+
+
+class TestCopyOnWrite():
+
+    def setup_method(self):
+        self._ORIGINAL_DEFAULTS = copy.deepcopy(DEFAULTS)
+
+    def test_untouched_sub_trees_shared_with_defaults(self, reset_config):
+        assert Config()._data._RAW_CONFIG is DEFAULTS
+
+        Config().set(12, 'dispersion', 'hysplit', 'numpar')
+        Config().merge({"fuelbeds": {"fccs_version": "1"}})
+        raw = Config()._data._RAW_CONFIG
+        assert raw is not DEFAULTS
+        assert raw['dispersion'] is not DEFAULTS['dispersion']
+        assert raw['dispersion']['hysplit'] is not DEFAULTS['dispersion']['hysplit']
+        assert raw['fuelbeds'] is not DEFAULTS['fuelbeds']
+        assert raw['dispersion']['vsmoke'] is DEFAULTS['dispersion']['vsmoke']
+        assert raw['emissions'] is DEFAULTS['emissions']
+
+        assert Config().get('dispersion', 'hysplit', 'numpar') == 12
+        assert Config().get('fuelbeds', 'fccs_version') == '1'
+        assert self._ORIGINAL_DEFAULTS == DEFAULTS
+
+        # merging unchanged values doesn't copy anything
+        Config().reset()
+        Config().merge({"emissions": copy.deepcopy(DEFAULTS['emissions'])})
+        assert Config()._data._RAW_CONFIG is DEFAULTS
+
+    def test_resolved_values_updated(self, reset_config):
+        Config().set("{run_id}-{today:%Y%m%d}", 'foo', 'a')
+        Config().set_today(datetime.datetime(2019, 2, 4))
+        hysplit_config = Config().get('dispersion', 'hysplit')
+        assert Config().get('foo') == {"a": "{run_id}-20190204"}
+
+        Config().set_run_id("abc")
+        assert Config().get('foo', 'a') == "abc-20190204"
+        Config().set_today(datetime.datetime(2019, 2, 5))
+        assert Config().get('foo') == {"a": "abc-20190205"}
+
+        Config().set(1, 'foo', 'b')
+        assert Config().get('foo') == {"a": "abc-20190205", "b": 1}
+        assert Config().get() == dict(Config().get(), foo={"a": "abc-20190205", "b": 1})
+        Config().merge({"foo": {"b": 2}})
+        assert Config().get('foo', 'b') == 2
+        assert Config().get()['foo']['b'] == 2
+
+        # unaffected resolved sub-trees are reused
+        assert Config().get('dispersion', 'hysplit') == hysplit_config
+        assert self._ORIGINAL_DEFAULTS == DEFAULTS
+
+    def test_snapshot_and_restore(self, reset_config):
+        Config().set_today(datetime.datetime(2019, 2, 4))
+        Config().set("a-{today:%Y%m%d}", 'foo', 'a')
+        snapshot = Config().snapshot()
+
+        # changes in this thread after the snapshot aren't seen
+        Config().set("b", 'foo', 'a')
+
+        results = {}
+        def run():
+            Config().restore(snapshot)
+            results['before'] = Config().get('foo', 'a')
+            Config().set("c", 'foo', 'a')
+            results['after'] = Config().get('foo', 'a')
+
+        t = threading.Thread(target=run)
+        t.start()
+        t.join()
+        assert results == {'before': "a-20190204", 'after': "c"}
+        assert Config().get('foo', 'a') == "b"
+        assert Config().restore(snapshot).get('foo', 'a') == "a-20190204"
+        assert self._ORIGINAL_DEFAULTS == DEFAULTS
@@ -3,12 +3,14 @@
 
 import datetime
 import os
+import pickle
 
 import afconfig
 from pytest import raises, approx
 
 from bluesky.config import to_lowercase_keys
 from bluesky.dispersers.hysplit import hysplit
+from bluesky.models.fires import Fire
 from bluesky.dispersers import SQUARE_METERS_PER_ACRE, GRAMS_PER_TON
 from bluesky.dispersers.hysplit.emissions_file_utils import (
     _compute_emissions_rows_data,
@@ -491,3 +493,141 @@ class TestGetEmissionsRowsDataForLatLon():
             plumerise_hour, pm25, area, dummy)
 
         assert rows == expected_rows
+
+
+class TestWriteEmissions():
+
+    PLUMERISE_HOUR = {
+        "heights":[
+            1000, 1100, 1200, 1300, 1400, 1500, 1600, 1700, 1800, 1900,
+            2000, 2100, 2200, 2300, 2400, 2500, 2600, 2700, 2800, 2900, 3000
+        ],
+        "emission_fractions": [
+            0.05, 0.05, 0.1, 0.1, 0.1, 0.04, 0.04, 0.04, 0.04, 0.04,
+            0.04, 0.04, 0.04, 0.04, 0.04, 0.04, 0.04, 0.04, 0.04, 0.04
+        ],
+        'smolder_fraction': 0.2
+    }
+
+    def _fires(self):
+        return [
+            Fire(id='a', latitude=45.5, longitude=-120.1, utc_offset=-7,
+                plumerise={
+                    '2015-08-04T17:00:00': self.PLUMERISE_HOUR,
+                    '2015-08-04T18:00:00': self.PLUMERISE_HOUR
+                },
+                timeprofiled_emissions={
+                    '2015-08-04T17:00:00': {'PM2.5': 12.3},
+                    '2015-08-04T18:00:00': {'PM2.5': 0.4}
+                },
+                timeprofiled_area={
+                    '2015-08-04T17:00:00': 12.0,
+                    # zero area results in dummy record
+                    '2015-08-04T18:00:00': 0.0
+                }
+            ),
+            # no emissions for any hour
+            Fire(id='b', latitude=46.0, longitude=-119.0, utc_offset=0,
+                plumerise={}, timeprofiled_emissions={}, timeprofiled_area={})
+        ]
+
+    def _disperser(self, monkeypatch, reduction_factor, seri):
+        monkeypatch.setattr(hysplit.HYSPLITDispersion, '_set_met_info',
+            lambda self, met_info: None)
+        h = hysplit.HYSPLITDispersion({})
+        h._model_start = datetime.datetime(2015, 8, 5, 0)
+        h._num_hours = 3
+        h._reduction_factor = reduction_factor
+        h.num_output_quantiles = 20 // reduction_factor
+        h._SERI = seri
+        return h
+
+    def test_matches_row_by_row(self, tmpdir, monkeypatch):
+        for reduction_factor in (1, 4, 20):
+            for seri in (1, 4):
+                h = self._disperser(monkeypatch, reduction_factor, seri)
+                vectorized_file = str(tmpdir.join('EMISS-{}-{}.CFG'.format(
+                    reduction_factor, seri)))
+                by_row_file = str(tmpdir.join('EMISS-{}-{}-by-row.CFG'.format(
+                    reduction_factor, seri)))
+                h._write_emissions(self._fires(), vectorized_file)
+                h._write_emissions_by_row(self._fires(), by_row_file)
+                with open(vectorized_file) as f1, open(by_row_file) as f2:
+                    assert f1.read() == f2.read()
+
+    def test_irregular_plumerise_falls_back_to_row_by_row(self, tmpdir, monkeypatch):
+        h = self._disperser(monkeypatch, 1, 1)
+        fires = self._fires()
+        fires[0]['plumerise']['2015-08-04T17:00:00'] = {
+            "heights": [1000, 2000, 3000],
+            "emission_fractions": [0.5, 0.5],
+            'smolder_fraction': 0.2
+        }
+        vectorized_file = str(tmpdir.join('EMISS.CFG'))
+        by_row_file = str(tmpdir.join('EMISS-by-row.CFG'))
+        h._write_emissions(fires, vectorized_file)
+        h._write_emissions_by_row(fires, by_row_file)
+        with open(vectorized_file) as f1, open(by_row_file) as f2:
+            assert f1.read() == f2.read()
+
+
+class TestRunTranche():
+
+    def test_config_set_and_parinit_returned(self, reset_config, monkeypatch):
+        monkeypatch.setattr(hysplit.HYSPLITDispersion, '_set_met_info',
+            lambda self, met_info: None)
+        h = hysplit.HYSPLITDispersion({})
+        h._has_parinit = []
+
+        def _run_process(fires, working_dir, tranche_num):
+            assert hysplit.Config().get('dispersion', 'hysplit', 'NINIT') == 1
+            h._has_parinit.append(True)
+        monkeypatch.setattr(h, '_run_process', _run_process)
+
+        reset_config.set(1, 'dispersion', 'hysplit', 'ninit')
+        # As if run in a new process
+        config_snapshot = pickle.loads(pickle.dumps(reset_config.snapshot()))
+        reset_config.reset()
+        assert [True] == hysplit._run_tranche(h, config_snapshot, [],
+            '/tmp/foo', 0)
+
+    def test_runner_is_picklable(self, reset_config, monkeypatch):
+        monkeypatch.setattr(hysplit.HYSPLITDispersion, '_set_met_info',
+            lambda self, met_info: None)
+        h = hysplit.HYSPLITDispersion({})
+        h._model_start = datetime.datetime(2015, 8, 5, 0)
+        h._met_info = {'files': set(['f']), 'hours': set([h._model_start])}
+        fires = [Fire(id='a', latitude=45.5, longitude=-120.1, utc_offset=-7)]
+
+        h2, fires2 = pickle.loads(pickle.dumps((h, fires)))
+        assert h2._model_start == h._model_start
+        assert h2._met_info == h._met_info
+        assert fires2 == fires
+        assert fires2[0]._private_id == fires[0]._private_id
+
+
+class TestGetMaxTrancheProcesses():
+
+    def _disperser(self, monkeypatch):
+        monkeypatch.setattr(hysplit.HYSPLITDispersion, '_set_met_info',
+            lambda self, met_info: None)
+        monkeypatch.setattr(os, 'sched_getaffinity', lambda pid: set(range(8)),
+            raising=False)
+        return hysplit.HYSPLITDispersion({})
+
+    def test_defaults_to_num_cores(self, reset_config, monkeypatch):
+        h = self._disperser(monkeypatch)
+        assert 8 == h._get_max_tranche_processes(10)
+        assert 3 == h._get_max_tranche_processes(3)
+
+    def test_mpi(self, reset_config, monkeypatch):
+        reset_config.set(True, 'dispersion', 'hysplit', 'mpi')
+        reset_config.set(3, 'dispersion', 'hysplit', 'ncpus')
+        h = self._disperser(monkeypatch)
+        assert 2 == h._get_max_tranche_processes(10)
+
+    def test_configured(self, reset_config, monkeypatch):
+        reset_config.set(5, 'dispersion', 'hysplit', 'max_tranche_processes')
+        h = self._disperser(monkeypatch)
+        assert 5 == h._get_max_tranche_processes(10)
+        assert 4 == h._get_max_tranche_processes(4)
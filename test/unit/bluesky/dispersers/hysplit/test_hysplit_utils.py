@@ -11,6 +11,7 @@ from numpy.testing import assert_approx_equal
 from bluesky.config import Config
 from bluesky.dispersers.hysplit import hysplit_utils
 from bluesky.exceptions import BlueSkyConfigurationError
+from bluesky.models.fires import Fire
 
 class MockFireLocationData():
     def __init__(self, location_id):
@@ -162,6 +163,65 @@ class TestCreateFireTranches():
         assert expected_tranches == fire_tranches
 
 
+class TestCreateFireTranchesByEmissions():
+    GRID_PARAMS = TestCreateFireTranches.GRID_PARAMS
+
+    def _fire(self, fire_id, pm25_by_hour, num_heights=20):
+        fractions = [1.0 / num_heights] * num_heights + [0.0] * (20 - num_heights)
+        return Fire(id=fire_id,
+            plumerise={dt: {'emission_fractions': fractions}
+                for dt in pm25_by_hour},
+            timeprofiled_emissions={dt: {'PM2.5': pm25, 'CO': 0.0}
+                for dt, pm25 in pm25_by_hour.items()}
+        )
+
+    def test_invalid_strategy(self, reset_config):
+        Config().set('foo', 'dispersion', 'hysplit', 'tranching_strategy')
+        with raises(BlueSkyConfigurationError) as e_info:
+            hysplit_utils.create_fire_tranches([[self._fire('a', {})]], 1,
+                datetime.datetime(2018, 11, 9, 0, 0, 0), 24, self.GRID_PARAMS)
+
+    def test_estimate_costs(self, reset_config):
+        fire_sets = [
+            # 2 hours x (20 + 1) sources, pm25 = 3
+            [self._fire('a', {'2018-11-09T00:00:00': 1.0,
+                '2018-11-09T01:00:00': 2.0})],
+            # 1 hour x (5 + 1) sources, pm25 = 1; non-emitting hour ignored
+            [self._fire('b', {'2018-11-09T00:00:00': 1.0,
+                '2018-11-09T01:00:00': 0.0}, num_heights=5)],
+            # dummy fires have no cost
+            [Fire(is_dummy=True, timeprofiled_emissions={
+                '2018-11-09T00:00:00': {'PM2.5': 0.0}})]
+        ]
+        mean_pm25 = 4.0 / 3
+        expected = [42 * (1 + 3.0 / mean_pm25), 6 * (1 + 1.0 / mean_pm25), 0]
+        assert expected == hysplit_utils.estimate_fire_set_costs(fire_sets)
+
+    def test_balanced_by_cost(self, reset_config):
+        Config().set('emissions', 'dispersion', 'hysplit', 'tranching_strategy')
+        hours = ['2018-11-09T{:02d}:00:00'.format(h) for h in range(24)]
+        big = self._fire('big', {dt: 100.0 for dt in hours})
+        small = [self._fire('s{}'.format(i), {hours[0]: 1.0})
+            for i in range(6)]
+        fire_sets = [[f] for f in small[:3] + [big] + small[3:]]
+
+        fire_tranches = hysplit_utils.create_fire_tranches(fire_sets, 2,
+            datetime.datetime(2018, 11, 9, 0, 0, 0), 24, self.GRID_PARAMS)
+
+        # the big fire gets its own tranche; small fires keep their order
+        assert [[big], small] == fire_tranches
+
+    def test_each_tranche_gets_a_fire_set(self, reset_config):
+        Config().set('emissions', 'dispersion', 'hysplit', 'tranching_strategy')
+        fire_sets = [[self._fire('a', {})], [self._fire('b', {})],
+            [self._fire('c', {'2018-11-09T00:00:00': 1.0})]]
+
+        fire_tranches = hysplit_utils.create_fire_tranches(fire_sets, 3,
+            datetime.datetime(2018, 11, 9, 0, 0, 0), 24, self.GRID_PARAMS)
+
+        assert [1, 1, 1] == [len(t) for t in fire_tranches]
+
+
 class TestComputeNumProcesses():
 
     def test(self, reset_config):
@@ -93,3 +93,86 @@ class TestParticleTotalMass():
     def test_multi_pollutant_sums(self):
         mass_bytes = struct.pack(">3f", 1.0, 0.5, 0.25)
         assert pardump_io.particle_total_mass(mass_bytes, 3) == approx(1.75)
+
+
+def _make_pardump_bytes(blocks, numpol):
+    """Build multi-block PARDUMP bytes from a list of per-block mass lists."""
+    return b''.join(_make_parinit_bytes(masses, numpol) for masses in blocks)
+
+
+class TestReadParticleBlocks():
+
+    def test_single_block(self, tmp_path):
+        path = tmp_path / "PARINIT"
+        masses = [[1.0, 0.5], [2.0, 1.0], [3.0, 1.5]]
+        path.write_bytes(_make_parinit_bytes(masses, numpol=2))
+
+        blocks = pardump_io.read_particle_blocks(str(path))
+        assert len(blocks) == 1
+        assert blocks[0].header == (3, 2, 2025, 9, 1, 0, 0)
+        assert blocks[0].particles['mass'].tolist() == masses
+        assert blocks[0].particles['pos'].shape == (3, 5)
+        assert blocks[0].particles['meta'].shape == (3, 3)
+        assert pardump_io.particle_masses(
+            blocks[0].particles).tolist() == [1.5, 3.0, 4.5]
+
+    def test_multiple_blocks(self, tmp_path):
+        path = tmp_path / "PARDUMP"
+        path.write_bytes(_make_pardump_bytes(
+            [[[1.0]], [], [[2.0], [3.0]]], numpol=1))
+
+        blocks = pardump_io.read_particle_blocks(str(path))
+        assert [b.header[0] for b in blocks] == [1, 0, 2]
+        assert [len(b.particles) for b in blocks] == [1, 0, 2]
+        assert blocks[2].particles['mass'][:, 0].tolist() == [2.0, 3.0]
+
+    def test_empty_file(self, tmp_path):
+        path = tmp_path / "PARDUMP"
+        path.write_bytes(b'')
+        assert pardump_io.read_particle_blocks(str(path)) == []
+
+    def test_truncated_file_raises(self, tmp_path):
+        path = tmp_path / "PARDUMP"
+        full = _make_pardump_bytes([[[1.0]], [[1.0], [2.0]]], numpol=1)
+        path.write_bytes(full[:-16])
+
+        with raises(ValueError):
+            pardump_io.read_particle_blocks(str(path))
+
+    def test_numpol_mismatch_raises(self, tmp_path):
+        path = tmp_path / "PARINIT"
+        data = bytearray(_make_parinit_bytes([[1.0, 2.0]], numpol=2))
+        # Claim one pollutant in the header
+        data[8:12] = struct.pack(">i", 1)
+        path.write_bytes(bytes(data))
+
+        with raises(ValueError):
+            pardump_io.read_particle_blocks(str(path))
+
+
+class TestWriteParticleBlocks():
+
+    def test_roundtrip_preserves_bytes(self, tmp_path):
+        src = tmp_path / "src"
+        dest = tmp_path / "dest"
+        src.write_bytes(_make_pardump_bytes(
+            [[[1.0, 0.5], [2.0, 1.0]], [[3.0, 1.5]]], numpol=2))
+
+        blocks = pardump_io.read_particle_blocks(str(src))
+        pardump_io.write_particle_blocks(str(dest), blocks)
+
+        assert src.read_bytes() == dest.read_bytes()
+
+    def test_chunks_and_numpar_updated(self, tmp_path):
+        src = tmp_path / "src"
+        dest = tmp_path / "dest"
+        src.write_bytes(_make_parinit_bytes([[1.0], [2.0], [3.0]], numpol=1))
+
+        header, particles = pardump_io.read_particle_blocks(str(src))[0]
+        pardump_io.write_particle_blocks(str(dest),
+            [(header, iter([particles[:1], particles[2:]]))])
+
+        new_header, new_particles = pardump_io.read_parinit(str(dest))
+        assert new_header == (2,) + header[1:]
+        assert [pardump_io.particle_total_mass(p[0], 1)
+            for p in new_particles] == [1.0, 3.0]
@@ -114,6 +114,57 @@ class TestParthinnerFiltering():
         assert total == 4
         assert kept == 1
 
+    def test_bin_boundaries(self, tmp_path):
+        src = tmp_path / "src"
+        dest = tmp_path / "dest"
+        _write_parinit(src, [0.5, 1.0, 1.5, 2.0, 3.0])
+
+        p = Parthinner(_config_getter({
+            "enabled": True, "thin_bins": [[1.0, 1.0], [2.0, 0.0], [2.5, 1.0]],
+        }))
+        kept, total = p.thin(str(src), str(dest))
+
+        # 0.5 dropped; 1.0 and 1.5 in the zero rate bin; 2.0 dropped;
+        # 3.0 above the highest bound
+        assert (kept, total) == (3, 5)
+        _, particles = pardump_io.read_parinit(str(dest))
+        assert [pardump_io.particle_total_mass(p[0], 1)
+            for p in particles] == [1.0, 1.5, 3.0]
+
+    def test_seed_is_reproducible(self, tmp_path):
+        src = tmp_path / "src"
+        _write_parinit(src, [float(i % 10) / 10 for i in range(1000)])
+
+        results = []
+        for i in range(2):
+            dest = tmp_path / "dest{}".format(i)
+            p = Parthinner(_config_getter({
+                "enabled": True, "thin_bins": [[1.0, 0.5]], "seed": 123,
+            }))
+            kept, total = p.thin(str(src), str(dest))
+            assert total == 1000
+            assert 0 < kept < 1000
+            results.append(dest.read_bytes())
+
+        assert results[0] == results[1]
+
+    def test_multi_block(self, tmp_path):
+        src = tmp_path / "src"
+        dest = tmp_path / "dest"
+        _write_parinit(src, [0.1, 2.0])
+        _write_parinit(dest, [0.5, 1.5, 3.0])
+        src.write_bytes(src.read_bytes() + dest.read_bytes())
+
+        p = Parthinner(_config_getter({
+            "enabled": True, "min_mass_grams": 1.0,
+        }))
+        kept, total = p.thin(str(src), str(dest))
+
+        assert (kept, total) == (3, 5)
+        blocks = pardump_io.read_particle_blocks(str(dest))
+        assert [b.header[0] for b in blocks] == [1, 2]
+        assert pardump_io.particle_masses(blocks[1].particles).tolist() == [1.5, 3.0]
+
 
 class TestSummarizeParinit():
 
@@ -139,3 +190,21 @@ class TestSummarizeParinit():
         assert s["mass_concentration"][0.99]["particles"] == 99
         # Nothing below 0.1g
         assert s["particles_below"][0.1]["particles"] == 0
+
+    def test_distribution(self, tmp_path):
+        path = tmp_path / "PARINIT"
+        _write_parinit(path, [4.0, 0.5, 2.0, 0.5, 1.0, 8.0])
+
+        s = summarize_parinit(str(path), mass_concentration_levels=(0.5, 0.75),
+            mass_thresholds_grams=(1.0, 5.0))
+        assert s["total_particles"] == 6
+        assert s["total_mass_grams"] == 16.0
+        assert s["mass_stats"] == {
+            "min": 0.5, "max": 8.0, "mean": 16.0 / 6, "median": 1.5}
+        # 8.0 alone is 50%; 8.0 + 4.0 is 75%
+        assert s["mass_concentration"][0.5] == {"particles": 1, "fraction": 1 / 6}
+        assert s["mass_concentration"][0.75] == {"particles": 2, "fraction": 2 / 6}
+        assert s["particles_below"][1.0] == {
+            "particles": 2, "fraction": 2 / 6, "mass_fraction": 1.0 / 16}
+        assert s["particles_below"][5.0] == {
+            "particles": 5, "fraction": 5 / 6, "mass_fraction": 8.0 / 16}
@@ -0,0 +1,77 @@
+"""Unit tests for bluesky.dispersers.hysplit.tranche_merge
+"""
+
+import numpy
+import pytest
+
+from bluesky.dispersers.hysplit import tranche_merge
+
+netCDF4 = pytest.importorskip("netCDF4")
+
+
+def _write_tranche_file(path, pm25):
+    with netCDF4.Dataset(path, 'w', format='NETCDF3_CLASSIC') as ds:
+        ds.setncatts({'IOAPI_VERSION': 'foo', 'NVARS': 1, 'history': 'h0'})
+        ds.createDimension('TSTEP', None)
+        ds.createDimension('DATE-TIME', 2)
+        ds.createDimension('LAY', 1)
+        ds.createDimension('VAR', 1)
+        ds.createDimension('ROW', 2)
+        ds.createDimension('COL', 3)
+        tflag = ds.createVariable('TFLAG', 'i4', ('TSTEP', 'VAR', 'DATE-TIME'))
+        tflag.setncatts({'units': '<YYYYDDD,HHMMSS>'})
+        v = ds.createVariable('PM25', 'f4', ('TSTEP', 'LAY', 'ROW', 'COL'),
+            fill_value=-9999.0)
+        v.setncatts({'units': 'ug/m^3', 'long_name': 'PM25'})
+        v[:] = pm25
+        tflag[:] = [[[2015216, h * 10000]] for h in range(pm25.shape[0])]
+
+
+class TestSumTrancheOutput():
+
+    def test_sum(self, tmpdir):
+        pm25_0 = numpy.arange(24, dtype='f4').reshape(4, 1, 2, 3)
+        pm25_1 = numpy.ma.masked_array(numpy.ones((4, 1, 2, 3), dtype='f4'))
+        pm25_1[0, 0, 0, 0] = numpy.ma.masked
+        pm25_0 = numpy.ma.masked_array(pm25_0)
+        pm25_0[1, 0, 1, 2] = numpy.ma.masked
+        pm25_1[1, 0, 1, 2] = numpy.ma.masked
+
+        input_files = [str(tmpdir.join('0.nc')), str(tmpdir.join('1.nc'))]
+        _write_tranche_file(input_files[0], pm25_0)
+        _write_tranche_file(input_files[1], pm25_1)
+        output_file = str(tmpdir.join('out.nc'))
+
+        tranche_merge.sum_tranche_output(input_files, output_file)
+
+        with netCDF4.Dataset(output_file) as ds:
+            assert set(ds.variables) == {'PM25', 'TFLAG'}
+            assert ds.getncattr('IOAPI_VERSION') == 'foo'
+            assert ds.getncattr('NVARS') == 1
+            assert ds.getncattr('history').endswith('\nh0')
+            assert ds.dimensions['TSTEP'].isunlimited()
+            assert ds.variables['PM25'].getncattr('units') == 'ug/m^3'
+            assert ds.variables['PM25'].getncattr('_FillValue') == -9999.0
+
+            pm25 = ds.variables['PM25'][:]
+            expected = numpy.arange(24, dtype='f4').reshape(4, 1, 2, 3) + 1
+            # missing in one file
+            expected[0, 0, 0, 0] = 0.0
+            numpy.testing.assert_array_equal(
+                expected.ravel()[[i for i in range(24) if i != 11]],
+                pm25.ravel()[[i for i in range(24) if i != 11]])
+            # missing in all files
+            assert pm25[1, 0, 1, 2] is numpy.ma.masked
+
+            numpy.testing.assert_array_equal(ds.variables['TFLAG'][:],
+                [[[2015216, h * 10000]] for h in range(4)])
+
+    def test_mismatched_shapes(self, tmpdir):
+        input_files = [str(tmpdir.join('0.nc')), str(tmpdir.join('1.nc'))]
+        _write_tranche_file(input_files[0],
+            numpy.ones((4, 1, 2, 3), dtype='f4'))
+        _write_tranche_file(input_files[1],
+            numpy.ones((3, 1, 2, 3), dtype='f4'))
+        with pytest.raises(ValueError):
+            tranche_merge.sum_tranche_output(input_files,
+                str(tmpdir.join('out.nc')))
@@ -4,8 +4,10 @@
 import copy
 import datetime
 
+from pytest import raises
+
 from bluesky.config import Config
-from bluesky.dispersers import DispersionBase
+from bluesky.dispersers import PHASES, DispersionBase
 from bluesky.models import fires
 
 class FakeDisperser(DispersionBase):
@@ -378,3 +380,59 @@ class TestDispersionBaseSetFireData():
             for k in f.keys():
                 assert f[k] == expected_fires[i][k], "{} don't match".format(k)
 
+
+
+class TestDispersionBaseGetTimeprofiledEmissions():
+
+    def setup_method(self):
+        self.d = FakeDisperser({})
+
+    def _expected(self, timeprofile, emissions):
+        # Computes the values one hour and species at a time
+        timeprofiled_emissions = {}
+        for dt in timeprofile:
+            timeprofiled_emissions[dt] = {}
+            for e in self.d.SPECIES:
+                timeprofiled_emissions[dt][e] = sum([
+                    timeprofile[dt][p] * emissions[p].get(e, 0.0)
+                        for p in PHASES
+                ])
+        return timeprofiled_emissions
+
+    def test_multi_day(self):
+        start = datetime.datetime(2015, 8, 4, 17)
+        timeprofile = {}
+        for i in range(48):
+            dt = (start + datetime.timedelta(hours=i)).isoformat()
+            timeprofile[dt] = {
+                "area_fraction": 1 / 48,
+                "flaming": (i % 24) / 276,
+                "smoldering": 0.1 / (i + 1),
+                "residual": 0.3 ** (i % 7)
+            }
+        emissions = {
+            "flaming": {"PM2.5": 9.545588271207714, "CO": 101.1},
+            "smoldering": {"PM2.5": 21.073928205514225, "CO": 0.3},
+            # missing species
+            "residual": {"PM2.5": 24.10635856528243}
+        }
+
+        actual = self.d._get_timeprofiled_emissions(timeprofile, emissions)
+        expected = self._expected(timeprofile, emissions)
+        assert list(actual) == list(timeprofile)
+        # compared exactly, since the values should be computed identically
+        assert actual == expected
+
+    def test_no_hours(self):
+        # emissions aren't looked up if there are no hours
+        assert self.d._get_timeprofiled_emissions({}, {}) == {}
+        assert self._expected({}, {}) == {}
+
+    def test_missing_phase(self):
+        timeprofile = {"2015-08-04T17:00:00": {
+            "flaming": 0.5, "smoldering": 0.5, "residual": 0.0}}
+        with raises(KeyError):
+            self._expected(timeprofile, {"flaming": {}, "smoldering": {}})
+        with raises(KeyError):
+            self.d._get_timeprofiled_emissions(timeprofile,
+                {"flaming": {}, "smoldering": {}})
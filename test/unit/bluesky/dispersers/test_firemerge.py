@@ -792,6 +792,24 @@ class TestPlumeMerger_MergeFires(BaseTestPlumeMerger):
         # TODO: uncomment after expected data is filled in
         #assert actual == expected
 
+    def test_sum_data(self):
+        fires = [copy.deepcopy(f) for f in (self.FIRE_1, self.FIRE_2, self.FIRE_3)]
+        originals = copy.deepcopy(fires)
+
+        assert self.merger._sum_data(fires, 'timeprofiled_emissions') == {
+            "2015-08-04T17:00:00": {"CO": 23.0, "PM2.5": 12.5},
+            "2015-08-04T18:00:00": {"CO": 3.0, "PM2.5": 5.0},
+            "2015-08-04T22:00:00": {"CO": 1.0, "PM2.5": 4.0}
+        }
+        assert self.merger._sum_data(fires, 'consumption') == {
+            "flaming": 1611,
+            "residual": 1551,
+            "smoldering": 1350,
+            "total": 4562
+        }
+        # make sure input fires weren't modified
+        assert fires == originals
+
 
 class TestPlumeMerger_Merge(BaseTestPlumeMerger):
     # TODO: add test with some fires merged and some not
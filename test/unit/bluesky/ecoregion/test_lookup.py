@@ -45,3 +45,20 @@ class TestLookupEcoregionOgr(BaseLookupEcoregionTest):
 
     def setup_method(self):
         self.ecoregion_lookup = EcoregionLookup(implementation='ogr')
+
+class TestLookupEcoregionStrtree(BaseLookupEcoregionTest):
+
+    def setup_method(self):
+        self.ecoregion_lookup = EcoregionLookup(implementation='strtree')
+
+    def test_lookup_many(self):
+        points = [(45, -118), (32, -88), (28, -88), (66, -149), (19, -100)]
+        expected = ['western', 'southern', None, 'boreal', None]
+        assert expected == self.ecoregion_lookup.lookup_many(points)
+        assert expected == EcoregionLookup(
+            implementation='shapely').lookup_many(points)
+        assert [] == self.ecoregion_lookup.lookup_many([])
+
+    def test_lookup_many_invalid(self):
+        with raises(BlueSkyGeographyValueError) as e_info:
+            self.ecoregion_lookup.lookup_many([(45, -118), (99, -122)])
@@ -695,6 +695,48 @@ class TestFiresManagerFilterFiresByArea():
         assert [] == sorted(self.fm.fires, key=lambda e: int(e.id))
 
 
+    def test_mixed_failure_and_filtering(self, reset_config):
+        Config().set({'min': 50}, 'filter', 'area')
+        f = fires.Fire({'id': '1', 'activity': [
+            {'active_areas':[{'specified_points': [{'area': 45}]}]},
+            {'active_areas':[
+                {'specified_points': [{'area': 40}]},
+                {'specified_points': [{}]},
+                {'specified_points': [{'area': 20}]},
+                {'specified_points': [{'area': 60}]}
+            ]}
+        ]})
+
+        # don't skip failures; active areas before the failure are filtered
+        self.fm.fires = [f]
+        Config().set(False, 'filter', 'skip_failures')
+        with raises(fires.FireActivityFilter.FilterError) as e_info:
+            self.fm.filter_fires()
+        assert self.fm.num_fires == 1
+        assert self.fm.fires == [
+            fires.Fire({'id': '1', 'activity': [
+                {'active_areas':[
+                    {'specified_points': [{}]},
+                    {'specified_points': [{'area': 20}]},
+                    {'specified_points': [{'area': 60}]}
+                ]}
+            ]})
+        ]
+
+        # skip failures
+        Config().set(True, 'filter', 'skip_failures')
+        self.fm.filter_fires()
+        assert self.fm.num_fires == 1
+        assert self.fm.fires == [
+            fires.Fire({'id': '1', 'activity': [
+                {'active_areas':[
+                    {'specified_points': [{}]},
+                    {'specified_points': [{'area': 60}]}
+                ]}
+            ]})
+        ]
+
+
 class TestFiresManagerFilterFiresByTime():
 
     def setup_method(self):
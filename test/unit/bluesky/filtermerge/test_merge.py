@@ -362,3 +362,30 @@ class TestFiresManagerMergeFires():
         ]
         actual = sorted(fm.fires, key=lambda e: int(e.id))
         assert expected == actual
+
+    def test_merge_many_with_skipped_failure(self, reset_config):
+        Config().set(True, 'merge', 'skip_failures')
+        fm = fires.FiresManager()
+        fire_list = [
+            fires.Fire({
+                'id': '1',
+                "type": "rx" if i != 2 else "wildfire",
+                "activity": [{"active_areas": [{"start": str(i)}]}]
+            }) for i in range(5)
+        ]
+        f = fires.Fire({'id': '2'})
+        fm.fires = fire_list + [f]
+        assert fm.num_fires == 6
+        fm.merge_fires()
+
+        # the fire with mismatched type is left in place, and the
+        # combined fire is added after it
+        assert fm.num_fires == 3
+        assert fm.fires[0] == fire_list[2]
+        assert fm.fires[2] == f
+        assert fm.fires[1]['activity'] == [
+            {"active_areas": [{"start": str(i)}]} for i in (0, 1, 3, 4)
+        ]
+        # merged fires' data is copied, not shared
+        assert fm.fires[1]['activity'][0] is not fire_list[0]['activity'][0]
+        assert fire_list[0]['activity'] == [{"active_areas": [{"start": "0"}]}]
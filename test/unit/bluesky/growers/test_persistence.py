@@ -1148,3 +1148,74 @@ class TestPersistenceWfWtihDailyPercentages():
         assert fm.fires[0]['activity'][1] == expected[0]['activity'][1]
         assert fm.fires[0]['activity'][2] == expected[0]['activity'][2]
         assert fm.fires == expected
+
+
+class TestPersistenceHourlyData():
+
+    def test_active_area_timeprofile_and_multi_day_keys(self, reset_config):
+        Config().set({
+            "date_to_persist": datetime.date(2016,8,1),
+            "days_to_persist": 2,
+            'truncate': True,
+        }, "growth", "persistence")
+
+        fm = MockFiresManager([{
+            "id": "abc123",
+            "fuel_type": "natural",
+            "type": "wildfire",
+            "activity": [
+                {
+                    "active_areas": [
+                        {
+                            "start": "2016-08-01T23:00:00",
+                            "end": "2016-08-02T01:00:00",
+                            # shared with locations that don't define
+                            # their own timeprofile
+                            "timeprofile": {
+                                "2016-08-01T23:00:00": {"area_fraction": 0.4},
+                                "2016-08-02T00:00:00": {"area_fraction": 0.6}
+                            },
+                            "specified_points": [
+                                {'lat': 40, 'lng':-115, 'area': 20},
+                                {
+                                    'lat': 40, 'lng':-116, 'area': 20,
+                                    # spans more than a day
+                                    "plumerise": {
+                                        "2016-08-01T00:00:00": {"heights": [1]},
+                                        "2016-08-02T00:00:00": {"heights": [2]},
+                                        "2016-08-03T00:00:00": {"heights": [3]}
+                                    }
+                                }
+                            ]
+                        }
+                    ]
+                }
+            ]
+        }])
+
+        persistence.Grower(fm).grow()
+
+        activity = fm.fires[0]['activity']
+        assert len(activity) == 3
+        for i, a in enumerate(activity[1:]):
+            day = 2 + i
+            aa = a['active_areas'][0]
+            assert a['persisted'] == True
+            assert aa['start'] == datetime.datetime(2016, 8, day, 23)
+            assert aa['end'] == datetime.datetime(2016, 8, day + 1, 1)
+            assert aa['timeprofile'] == {
+                "2016-08-{:02d}T23:00:00".format(day): {"area_fraction": 0.4},
+                "2016-08-{:02d}T00:00:00".format(day + 1): {"area_fraction": 0.6}
+            }
+            assert 'timeprofile' not in dict(aa['specified_points'][0])
+            assert aa['specified_points'][1]['plumerise'] == {
+                "2016-08-{:02d}T00:00:00".format(day): {"heights": [1]},
+                "2016-08-{:02d}T00:00:00".format(day + 1): {"heights": [2]},
+                "2016-08-{:02d}T00:00:00".format(day + 2): {"heights": [3]}
+            }
+
+        # the date to persist's activity is unchanged
+        assert activity[0]['active_areas'][0]['timeprofile'] == {
+            "2016-08-01T23:00:00": {"area_fraction": 0.4},
+            "2016-08-02T00:00:00": {"area_fraction": 0.6}
+        }
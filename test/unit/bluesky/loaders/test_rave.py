@@ -0,0 +1,105 @@
+"""Unit tests for bluesky.loaders.rave"""
+
+__author__ = "Joel Dubowy"
+
+import types
+
+import numpy
+
+from bluesky.loaders import rave
+
+
+class MockDataset(dict):
+
+    def close(self):
+        pass
+
+def _values(a):
+    return types.SimpleNamespace(values=numpy.array(a))
+
+NAN = numpy.nan
+
+DATASET = MockDataset({
+    "time": _values(numpy.array(['2026-01-01T05:00:00.000000000'],
+        dtype='datetime64[ns]')),
+    "grid_latt": _values([[45.0, 45.0, 45.0], [46.0, 46.0, 46.0]]),
+    "grid_lont": _values([[239.0, 240.0, 241.0], [239.0, 240.0, 241.0]]),
+    "area": _values([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]]),
+    "PM25": _values([[[NAN, 10.0, 20.0], [30.0, NAN, 40.0]]]),
+    "CO": _values([[[NAN, 1.0, 2.0], [3.0, NAN, 4.0]]]),
+    "FRP_MEAN": _values([[[NAN, 5.0, 6.0], [7.0, NAN, 8.0]]]),
+    "FRE": _values([[[NAN, 9.0, 8.0], [7.0, NAN, 6.0]]]),
+    "QA": _values([[[3.0, 2.0, 0.0], [1.5, 3.0, 2.9]]]),
+})
+
+MOCK_XARRAY = types.SimpleNamespace(open_dataset=lambda path: DATASET)
+
+
+class TestNetcdfFileLoaderExtractRecords():
+
+    def setup_method(self):
+        self.loader = rave.NetcdfFileLoader(file='foo.nc')
+
+    def test_extract_records(self):
+        records = self.loader._extract_records(MOCK_XARRAY, 'foo.nc')
+        # cells without PM2.5, or with (truncated) QA < 1, are skipped
+        assert records == [
+            {
+                "time": "2026-01-01T05:00:00", "lat": 45.0, "lng": -120.0,
+                "area_km2": 2.0, "pm25_kg": 10.0, "co_kg": 1.0,
+                "frp_mw": 5.0, "fre_mj": 9.0, "qa": 2, "row": 0, "col": 1
+            },
+            {
+                "time": "2026-01-01T05:00:00", "lat": 46.0, "lng": -121.0,
+                "area_km2": 4.0, "pm25_kg": 30.0, "co_kg": 3.0,
+                "frp_mw": 7.0, "fre_mj": 7.0, "qa": 1, "row": 1, "col": 0
+            },
+            {
+                "time": "2026-01-01T05:00:00", "lat": 46.0, "lng": -119.0,
+                "area_km2": 6.0, "pm25_kg": 40.0, "co_kg": 4.0,
+                "frp_mw": 8.0, "fre_mj": 6.0, "qa": 2, "row": 1, "col": 2
+            }
+        ]
+
+    def test_extract_records_min_qa(self):
+        self.loader._min_qa = 2
+        records = self.loader._extract_records(MOCK_XARRAY, 'foo.nc')
+        assert [(r['row'], r['col']) for r in records] == [(0, 1), (1, 2)]
+
+
+class TestRaveMarshal():
+
+    def setup_method(self):
+        self.loader = rave.NetcdfFileLoader(file='foo.nc')
+        self.loader._country_grid = numpy.array([['US', 'CA'], ['', 'MX']])
+
+    def test_lookup_countries(self):
+        assert self.loader._lookup_countries(
+            [(0, 0), (1, 1), (1, 0), (2, 0), (0, 5), (-1, 0)]) == [
+            'US', 'MX', None, None, None, None]
+        assert self.loader._lookup_countries([]) == []
+
+        self.loader._country_grid = None
+        assert self.loader._lookup_countries([(0, 0)]) == [None]
+
+    def test_marshal(self):
+        records = self.loader._extract_records(MOCK_XARRAY, 'foo.nc')
+        records.append(dict(records[0], time="2026-01-01T06:00:00",
+            pm25_kg=30.0))
+        fires = self.loader._marshal(records)
+
+        assert [f['id'] for f in fires] == ['rave-20260101-0-1',
+            'rave-20260101-1-0', 'rave-20260101-1-2']
+        assert [f['activity'][0]['active_areas'][0].get('country')
+            for f in fires] == ['CA', None, None]
+
+        aa = fires[0]['activity'][0]['active_areas'][0]
+        assert aa['start'] == '2025-12-31T21:00:00'
+        assert aa['end'] == '2026-01-01T21:00:00'
+        assert aa['utc_offset'] == '-08:00'
+        assert aa['timeprofile'] == {
+            '2025-12-31T21:00:00': {"area_fraction": 0.25, "flaming": 0.25,
+                "smoldering": 0.25, "residual": 0.25},
+            '2025-12-31T22:00:00': {"area_fraction": 0.75, "flaming": 0.75,
+                "smoldering": 0.75, "residual": 0.75}
+        }
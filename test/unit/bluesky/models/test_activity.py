@@ -2,6 +2,9 @@
 
 __author__ = "Joel Dubowy"
 
+import copy
+import pickle
+
 from pytest import raises
 
 from bluesky.models import activity
@@ -531,3 +534,200 @@ class TestActivityCollectionLocations():
         ]
 
         assert expected == ac.locations
+
+
+class TestObserved():
+
+    def test_list_modifications_change_version(self):
+        l = activity.ObservedList([3, 1, 2])
+        for f in (lambda: l.append(4), lambda: l.extend([5]),
+                lambda: l.insert(0, 6), lambda: l.pop(), lambda: l.remove(6),
+                lambda: l.sort(), lambda: l.reverse(),
+                lambda: l.__setitem__(0, 7), lambda: l.__delitem__(0),
+                lambda: l.__iadd__([8]), lambda: l.__imul__(2),
+                lambda: l.clear()):
+            v, sv = l._version, l._structure_version
+            f()
+            assert v != l._version
+            assert sv != l._structure_version
+
+    def test_dict_modifications_change_version(self):
+        d = activity.ActivityCollection({'a': 1})
+        for f in (lambda: d.__setitem__('b', 2), lambda: d.update(c=3),
+                lambda: d.setdefault('e', 4), lambda: d.pop('a'),
+                lambda: d.__delitem__('b'), lambda: d.popitem(),
+                lambda: d.clear()):
+            v = d._version
+            f()
+            assert v != d._version
+
+        v = d._version
+        d.get('a')
+        assert v == d._version
+
+    def test_structural_modifications(self):
+        aa = activity.ActiveArea({'specified_points': []})
+        sv = aa._structure_version
+        aa['start'] = "2019-01-01T00:00:00"
+        assert sv == aa._structure_version
+        aa['specified_points'] = []
+        assert sv != aa._structure_version
+        sv = aa._structure_version
+        aa.pop('start')
+        assert sv != aa._structure_version
+
+    def test_modifications_propagate_to_containing_objects(self):
+        root = activity.ObservedList([activity.ActivityCollection(
+            {'active_areas': [{'specified_points': [
+                {'lat': 45.0, 'lng': -120.0, 'area': 1}]}]})])
+        other = activity.ObservedList([activity.ActivityCollection(
+            {'active_areas': [{'specified_points': [
+                {'lat': 46.0, 'lng': -120.0, 'area': 1}]}]})])
+        aa = root[0]['active_areas'][0]
+        loc = aa['specified_points'][0]
+
+        v, sv, other_v = root._version, root._structure_version, other._version
+        aa_v = aa._version
+        loc['area'] = 2
+        assert v != root._version
+        assert sv == root._structure_version
+        assert aa_v != aa._version
+        # modifications are only recorded in containing objects
+        loc_v = loc._version
+        aa['start'] = "2019-01-01T00:00:00"
+        assert loc_v == loc._version
+        assert other_v == other._version
+
+        v, sv = root._version, root._structure_version
+        aa['specified_points'].append(
+            activity.Location({'lat': 45.0, 'lng': -121.0, 'area': 1}))
+        assert v != root._version
+        assert sv != root._structure_version
+
+        # added objects are linked to the objects they're added to
+        v = root._version
+        aa['specified_points'][-1]['area'] = 3
+        assert v != root._version
+
+        # objects shared by more than one tree record modifications in each
+        other.append(root[0])
+        v, other_v = root._version, other._version
+        loc['area'] = 4
+        assert v != root._version
+        assert other_v != other._version
+
+    def test_removed_objects_unlinked(self):
+        def new_child():
+            return activity.Location({'lat': 45.0, 'lng': -120.0, 'area': 1})
+
+        def check_unlinked(p, c):
+            v = p._version
+            c['x'] = 1
+            assert v == p._version
+            assert c._parents == ()
+
+        d = activity.ActivityCollection()
+        for remove in (lambda c: d.pop('a'), lambda c: d.__delitem__('a'),
+                lambda c: d.popitem(), lambda c: d.clear(),
+                lambda c: d.__setitem__('a', new_child())):
+            d.clear()
+            c = new_child()
+            d['a'] = c
+            remove(c)
+            check_unlinked(d, c)
+
+        l = activity.ObservedList()
+        for remove in (lambda c: l.pop(), lambda c: l.remove(c),
+                lambda c: l.__delitem__(0), lambda c: l.clear(),
+                lambda c: l.__imul__(0), lambda c: l.__setitem__(0, new_child()),
+                lambda c: l.__setitem__(slice(0, 1), [])):
+            l.clear()
+            c = new_child()
+            l.append(c)
+            remove(c)
+            check_unlinked(l, c)
+
+        # objects that remain in the container stay linked
+        c = new_child()
+        l[:] = [c, c]
+        l.pop()
+        v = l._version
+        c['x'] = 2
+        assert v != l._version
+
+        # moving an object between containers doesn't accumulate links
+        l2 = activity.ObservedList()
+        for i in range(5):
+            l2.append(l.pop())
+            l.append(l2.pop())
+        assert len(c._parents) == 1
+
+    def test_pickled_objects_linked(self):
+        root = activity.ObservedList([activity.ActivityCollection(
+            {'active_areas': [{'specified_points': [
+                {'lat': 45.0, 'lng': -120.0, 'area': 1}]}]})])
+        root_copy = pickle.loads(pickle.dumps(root))
+        assert root_copy == root
+        loc_copy = root_copy[0]['active_areas'][0]['specified_points'][0]
+        assert '_parents' not in loc_copy.__getstate__()
+
+        v, v_copy = root._version, root_copy._version
+        loc_copy['area'] = 2
+        assert v_copy != root_copy._version
+        assert v == root._version
+
+    def test_lists_converted(self):
+        ac = activity.ActivityCollection({'active_areas': [
+            {'specified_points': [{'lat': 45.0, 'lng': -120.0, 'area': 1}]},
+        ]})
+        assert type(ac['active_areas']) == activity.ObservedList
+        aa = ac['active_areas'][0]
+        assert type(aa['specified_points']) == activity.ObservedList
+
+        aa.update(specified_points=[])
+        assert type(aa['specified_points']) == activity.ObservedList
+        ac['active_areas'] = []
+        assert type(ac['active_areas']) == activity.ObservedList
+
+    def test_deepcopy(self):
+        timeprofile = {'2019-01-01T00:00:00': {'area_fraction': 1.0}}
+        ac = activity.ActivityCollection({'active_areas': [
+            {
+                'timeprofile': timeprofile,
+                'specified_points': [
+                    {'lat': 45.0, 'lng': -120.0, 'area': 1,
+                        'fuelbeds': [{'fccs_id': '52', 'pct': 100.0}],
+                        'timeprofile': timeprofile}
+                ]
+            }
+        ]})
+
+        v = ac._version
+        ac_copy = copy.deepcopy(ac)
+        # copying doesn't modify anything
+        assert v == ac._version
+
+        assert ac_copy == ac
+        aa = ac['active_areas'][0]
+        aa_copy = ac_copy['active_areas'][0]
+        loc_copy = aa_copy['specified_points'][0]
+        assert type(ac_copy) == activity.ActivityCollection
+        assert type(ac_copy['active_areas']) == activity.ObservedList
+        assert type(aa_copy) == activity.ActiveArea
+        assert type(aa_copy['specified_points']) == activity.ObservedList
+        assert type(loc_copy) == activity.Location
+        assert aa_copy is not aa
+        assert loc_copy['fuelbeds'] is not aa['specified_points'][0]['fuelbeds']
+
+        # locations refer to the copied active area
+        assert loc_copy._active_area is aa_copy
+        # shared references are preserved
+        assert aa_copy['timeprofile'] is loc_copy['timeprofile']
+        assert aa_copy['timeprofile'] is not timeprofile
+
+        # modifications to the copy are recorded in the copy only
+        v_copy = ac_copy._version
+        loc_copy['area'] = 2
+        assert v_copy != ac_copy._version
+        assert v == ac._version
+        assert aa['specified_points'][0]['area'] == 1
@@ -4,7 +4,9 @@ __author__ = "Joel Dubowy"
 
 import copy
 import datetime
+import gzip
 import json
+import pickle
 import sys
 import io
 import uuid
@@ -472,6 +474,101 @@ class TestFire():
         actual = self.TEST_FIRE.locations
         assert actual == expected
 
+    def test_memoized_values_invalidated_on_modification(self, reset_config):
+        f = fires.Fire({
+            "activity": [
+                {
+                    "active_areas": [
+                        {
+                            "start": "2014-05-27T17:00:00",
+                            "end": "2014-05-28T17:00:00",
+                            "utc_offset": "-07:00",
+                            "specified_points": [
+                                {'area': 34, 'lat': 45.0, 'lng': -120.0}
+                            ]
+                        }
+                    ]
+                }
+            ]
+        })
+        assert f.start == datetime.datetime(2014,5,27,17)
+        assert f.end_utc == datetime.datetime(2014,5,29,0)
+        assert len(f.locations) == 1
+        assert f._activity_cache['observed']
+
+        # modifying an active area
+        f.activity[0]['active_areas'][0]['start'] = "2014-05-26T17:00:00"
+        assert f.start == datetime.datetime(2014,5,26,17)
+
+        # adding an active area (cast to an ActiveArea) and a location
+        f.activity[0]['active_areas'].append(activity.ActiveArea({
+            "start": "2014-05-29T17:00:00",
+            "end": "2014-05-30T17:00:00",
+            "utc_offset": "-06:00",
+            "specified_points": [{'area': 12, 'lat': 46.0, 'lng': -120.0}]
+        }))
+        f.active_areas[1]['specified_points'].append(
+            activity.Location({'area': 10, 'lat': 46.0, 'lng': -121.0}))
+        assert f.end == datetime.datetime(2014,5,30,17)
+        assert f.end_utc == datetime.datetime(2014,5,30,23)
+        assert len(f.active_areas) == 2
+        assert len(f.locations) == 3
+
+        # invalidating a location
+        f.locations[2]['lat'] = None
+        with raises(ValueError):
+            f.locations
+
+        # replacing the activity
+        f.activity = [{"active_areas": []}]
+        assert type(f.activity) == activity.ObservedList
+        f.activity[0] = activity.ActivityCollection(
+            {"active_areas": [{"start": "2014-05-20T17:00:00",
+                "specified_points": []}]})
+        assert f.start == datetime.datetime(2014,5,20,17)
+        assert f.end is None
+
+        # plain dicts within activity aren't observed, so values
+        # derived from them aren't memoized
+        f.activity[0]['active_areas'].append({"start": "2014-05-19T17:00:00"})
+        assert f.start == datetime.datetime(2014,5,19,17)
+        assert not f._activity_cache['observed']
+        f.activity[0]['active_areas'][-1]['start'] = "2014-05-18T17:00:00"
+        assert f.start == datetime.datetime(2014,5,18,17)
+
+    def test_leaf_modifications_dont_reinspect_activity(self, reset_config,
+            monkeypatch):
+        f = fires.Fire({"activity": [{"active_areas": [
+            {"start": "2014-05-27T17:00:00", "specified_points": [
+                {'area': 34, 'lat': 45.0, 'lng': -120.0}]}]}]})
+        calls = []
+        is_observed = fires.Fire._is_observed
+        monkeypatch.setattr(fires.Fire, '_is_observed', staticmethod(
+            lambda a: calls.append(1) or is_observed(a)))
+
+        assert f.start == datetime.datetime(2014,5,27,17)
+        f.locations[0]['area'] = 12
+        f.active_areas[0]['start'] = "2014-05-26T17:00:00"
+        assert f.start == datetime.datetime(2014,5,26,17)
+        assert f.locations[0]['area'] == 12
+        assert len(calls) == 1
+
+        f.active_areas[0]['specified_points'] = [
+            activity.Location({'area': 10, 'lat': 46.0, 'lng': -121.0})]
+        assert f.locations[0]['area'] == 10
+        assert len(calls) == 2
+
+    def test_memoized_values_not_pickled(self, reset_config):
+        f = fires.Fire({"activity": [{"active_areas": [
+            {"start": "2014-05-27T17:00:00", "specified_points": []}]}]})
+        assert f.start == datetime.datetime(2014,5,27,17)
+        f2 = pickle.loads(pickle.dumps(f))
+        assert '_activity_cache' not in f2.__dict__
+        assert f2.start == datetime.datetime(2014,5,27,17)
+        assert f2 == f
+        f2.active_areas[0]['start'] = "2014-05-26T17:00:00"
+        assert f2.start == datetime.datetime(2014,5,26,17)
+
 
 ##
 ## Tests for FiresManager
@@ -491,6 +588,14 @@ class TestFiresManager():
         fires_manager._meta = {'a':1, 'b':{'c':2}}
 
         assert fire_objects == fires_manager.fires
+        # Fire objects aren't re-wrapped
+        assert all([a is b for a, b in zip(fire_objects, fires_manager.fires)])
+        fire = fires.Fire({'id': '3'})
+        fires_manager.add_fire(fire)
+        assert fires_manager.fires[-1] is fire
+        fires_manager.add_fires([{'id': '4'}])
+        assert isinstance(fires_manager.fires[-1], fires.Fire)
+        fires_manager.fires = fire_objects
         assert 1 == fires_manager.a
         assert {'c':2} == fires_manager.b
         assert 2 == fires_manager.b['c']
@@ -765,6 +870,41 @@ class TestFiresManager():
         }
         assert expected_meta == fires_manager.meta
 
+    @freezegun.freeze_time("2016-04-20")
+    def test_load_gzipped_file(self, tmp_path, monkeypatch, reset_config):
+        input_file = tmp_path / "input.json.gz"
+        input_file.write_bytes(gzip.compress(
+            b'{"fires":[{"id":"a","bar":123,"baz":12.32,"bee":"12.12"},'
+            b'{"id":"b","bar":2, "baz": 1.1, "bee":"24.34"}],'
+            b'"foo": {"bar": "baz"}}'))
+        monkeypatch.setattr(uuid, "uuid4", lambda: "abcd1234")
+
+        fires_manager = fires.FiresManager()
+        fires_manager.loads(input_file=str(input_file))
+        expected_fires = [
+            fires.Fire({'id':'a', 'bar':123, 'baz':12.32, 'bee': "12.12"}),
+            fires.Fire({'id':'b', 'bar':2, 'baz': 1.1, 'bee': '24.34'})
+        ]
+        assert fires_manager.num_fires == 2
+        assert expected_fires == fires_manager.fires
+        assert {"foo": {"bar": "baz"}} == fires_manager.meta
+
+    def test_load_creates_each_fire_once(self, monkeypatch, reset_config):
+        monkeypatch.setattr(fires.FiresManager, '_stream', self._stream(
+            '{"fires":[{"id":"a"},{"id":"b"}], "foo": 1}'))
+        init = fires.Fire.__init__
+        created = []
+        def counting_init(fire, *args, **kwargs):
+            init(fire, *args, **kwargs)
+            created.append(fire)
+        monkeypatch.setattr(fires.Fire, '__init__', counting_init)
+
+        fires_manager = fires.FiresManager()
+        fires_manager.loads()
+        # Each fire is converted as it's parsed, and not re-wrapped
+        assert [f['id'] for f in created] == ['a', 'b']
+        assert all([a is b for a, b in zip(created, fires_manager.fires)])
+
     @freezegun.freeze_time("2016-04-20")
     def test_load_multiple_streams(self, monkeypatch, reset_config):
         input_1 = io.StringIO('{"fires":[{"id":"a","bar":123,"baz":12.32,"bee":"12.12"},'
@@ -834,6 +974,45 @@ class TestFiresManager():
         actual = json.loads(self._output.getvalue())
         assert expected == actual
 
+    @freezegun.freeze_time("2016-04-20")
+    def test_dump_rounded_and_compressed(self, monkeypatch, reset_config):
+        monkeypatch.setattr(uuid, "uuid4", lambda: "abcd1234")
+
+        fires_manager = fires.FiresManager()
+        fires_manager.fires = [
+            fires.Fire({'id':'a', 'bar':123, 'baz':12.123456789}),
+            fires.Fire({'id':'b', 'bar':2, 'baz': [1.00000001, 2]})
+        ]
+        fires_manager.foo = {"bar": 1.23456789}
+
+        expected = {
+            "run_id": "abcd1234",
+            "today": "2016-04-20T00:00:00",
+            "run_config": Config().get(),
+            "fires": [
+                {'id':'a', 'bar':123, 'baz':12.123457,
+                    'type': 'wildfire', 'fuel_type': 'natural'},
+                {'id':'b', 'bar':2, 'baz': [1.0, 2],
+                    'type': 'wildfire', 'fuel_type': 'natural'}
+            ],
+            "foo": {"bar": 1.234568},
+            "counts": {
+                "fires": 2,
+                "failed_fires": 0,
+                "locations": 0
+            },
+            "bluesky_version": __version__
+        }
+
+        output = io.StringIO()
+        fires_manager.dumps(output_stream=output, indent=2)
+        assert expected == json.loads(output.getvalue())
+
+        output = io.BytesIO()
+        fires_manager.dumps(output_stream=output, compress=True)
+        assert not output.closed
+        assert expected == json.loads(gzip.decompress(output.getvalue()))
+
     # TODO: test instantiating with fires, dump, adding more with loads, dump, etc.
 
     ## Failures
@@ -456,3 +456,124 @@ class TestConsumptionRunFire():
                 assert_approx_equal(fb['fuel_loadings'][k], 4.365733866015141)
             else:
                 assert fb['fuel_loadings'][k] == 0
+
+
+class TestConsumptionRunBatched():
+
+    def _fires(self):
+        f1 = copy.deepcopy(fire)
+        f1['activity'][0]['active_areas'][0]['specified_points'][0]['fuelbeds'] = [
+            {"fccs_id": "52", "pct": 60.0},
+            {"fccs_id": "1", "pct": 40.0}
+        ]
+        f2 = copy.deepcopy(fire)
+        f2['activity'][0]['active_areas'][0]['specified_points'][0]['area'] = 20
+        # different settings, so this fire's fuelbeds are run in their own batch
+        f2['activity'][0]['active_areas'][0]['slope'] = 10
+        return [Fire(f1), Fire(f2)]
+
+    def _run(self, batch_fuelbeds):
+        Config().set(batch_fuelbeds, 'consumption', 'batch_fuelbeds')
+        fm = fires.FiresManager()
+        fm.add_fires(self._fires())
+        consumption.run(fm)
+        return [fb for f in fm.fires for aa in f.active_areas
+            for loc in aa.locations for fb in loc['fuelbeds']]
+
+    def test_same_as_unbatched(self, reset_config):
+        set_old_consume_defaults()
+
+        expected = self._run(False)
+        actual = self._run(True)
+
+        assert len(actual) == len(expected) == 3
+        for a, e in zip(actual, expected):
+            check_consumption(a['consumption'], e['consumption'])
+            for p in e['heat']:
+                assert_approx_equal(a['heat'][p][0], e['heat'][p][0])
+            assert a['fuel_loadings'].keys() == e['fuel_loadings'].keys()
+
+    def _run_with_failure(self, fm, batch_fuelbeds, monkeypatch):
+        """Runs three fires whose fuelbeds are run in the same batch, with
+        the second fire's fuelbed failing
+        """
+        fires_list = []
+        for i in range(3):
+            f = copy.deepcopy(fire)
+            f['id'] = str(i)
+            f['activity'][0]['active_areas'][0]['specified_points'][0]['lat'] = 45.0 + i
+            fires_list.append(Fire(f))
+
+        run_fuelbeds = consumption._run_fuelbeds
+        batch_sizes = []
+        def _run_fuelbeds(fuelbeds):
+            batch_sizes.append(len(fuelbeds))
+            if any(loc['lat'] == 46.0 for fb, loc, *_ in fuelbeds):
+                raise RuntimeError("Failed fuelbed")
+            run_fuelbeds(fuelbeds)
+        monkeypatch.setattr(consumption, '_run_fuelbeds', _run_fuelbeds)
+
+        Config().set(batch_fuelbeds, 'consumption', 'batch_fuelbeds')
+        fm.add_fires(fires_list)
+        try:
+            consumption.run(fm)
+        finally:
+            if batch_fuelbeds:
+                # the failed batch, then each fuelbed up to and
+                # including the failed one
+                assert batch_sizes[:3] == [3, 1, 1]
+
+    def _get_fuelbeds(self, fm, fire_id):
+        f = [f for f in fm.fires + (fm.failed_fires or []) if f.id == fire_id][0]
+        return f['activity'][0]['active_areas'][0]['specified_points'][0]['fuelbeds']
+
+    def test_failure_skip_failed_fires(self, reset_config, monkeypatch):
+        set_old_consume_defaults()
+        Config().set(True, 'skip_failed_fires')
+
+        expected = fires.FiresManager()
+        self._run_with_failure(expected, False, monkeypatch)
+        actual = fires.FiresManager()
+        self._run_with_failure(actual, True, monkeypatch)
+
+        for fm in (expected, actual):
+            assert [f.id for f in fm.fires] == ['0', '2']
+            assert [f.id for f in fm.failed_fires] == ['1']
+        assert actual.failed_fires[0].error['type'] == (
+            expected.failed_fires[0].error['type'])
+        assert actual.failed_fires[0].error['message'] == (
+            expected.failed_fires[0].error['message'])
+        assert 'consumption' not in self._get_fuelbeds(actual, '1')[0]
+
+        for fire_id in ('0', '2'):
+            a = self._get_fuelbeds(actual, fire_id)[0]
+            e = self._get_fuelbeds(expected, fire_id)[0]
+            check_consumption(a['consumption'], e['consumption'])
+            for p in e['heat']:
+                assert_approx_equal(a['heat'][p][0], e['heat'][p][0])
+
+    def test_failure_dont_skip_failed_fires(self, reset_config, monkeypatch):
+        set_old_consume_defaults()
+        Config().set(False, 'skip_failed_fires')
+
+        expected, actual = fires.FiresManager(), fires.FiresManager()
+        with raises(RuntimeError) as expected_e:
+            self._run_with_failure(expected, False, monkeypatch)
+        with raises(RuntimeError) as actual_e:
+            self._run_with_failure(actual, True, monkeypatch)
+
+        assert str(actual_e.value) == str(expected_e.value) == 'Failed fuelbed'
+        assert [f.id for f in actual.fires] == ['0', '1', '2']
+        assert actual.failed_fires is None
+        assert actual.fires[1].error['message'] == (
+            expected.fires[1].error['message'])
+        assert actual.fires[0].get('error') is None
+
+        # as when run unbatched, fires before the failed fire have
+        # consumption, and the rest don't
+        for fire_id in ('0', '1', '2'):
+            a = self._get_fuelbeds(actual, fire_id)[0]
+            e = self._get_fuelbeds(expected, fire_id)[0]
+            assert ('consumption' in a) == ('consumption' in e) == (fire_id == '0')
+        check_consumption(self._get_fuelbeds(actual, '0')[0]['consumption'],
+            self._get_fuelbeds(expected, '0')[0]['consumption'])
@@ -11,9 +11,11 @@ from pytest import raises
 
 import afconfig
 
+from bluesky import consumeutils
 from bluesky.config import Config
+from bluesky.models import fires as fires_module
 from bluesky.models.fires import Fire
-from bluesky.modules import emissions
+from bluesky.modules import consumption, emissions
 
 from . import set_old_consume_defaults
 
@@ -934,6 +936,33 @@ class TestPrichardOneillEmissions(BaseEmissionsTest):
         self._check_emissions(self.EXPECTED_FIRE1_EMISSIONS,
             self.fires[1]['activity'][0]['active_areas'][0]['specified_points'][0]['fuelbeds'][0]['emissions'])
 
+    def test_calculator_cache(self, reset_config):
+        Config().set("prichard-oneill", 'emissions', "model")
+        Config().set(self.SPECIES, 'emissions', "species")
+        Config().set(["52"], 'emissions', "warm_cache_fccs_ids")
+        Config().set(True, 'emissions', "include_emissions_factors")
+        emissions._get_lookup.cache_clear()
+        emissions._get_calculator.cache_clear()
+
+        e = emissions.PrichardOneill()
+        assert emissions._get_lookup.cache_info().currsize == 2
+
+        fires = [self.fires, copy.deepcopy(FIRES)]
+        for f in fires:
+            self._run_fires(e, f)
+            self._check_emissions(self.EXPECTED_FIRE1_EMISSIONS,
+                f[1]['activity'][0]['active_areas'][0]['specified_points'][0]['fuelbeds'][0]['emissions'])
+
+        assert emissions._get_lookup.cache_info().currsize == 2
+        assert emissions._get_calculator.cache_info().misses == 1
+        assert emissions._get_calculator.cache_info().hits == 1
+
+        # fuelbeds sharing a calculator get their own emissions factors
+        efs = [f[1]['activity'][0]['active_areas'][0]['specified_points'][0]['fuelbeds'][0]['emissions_factors']
+            for f in fires]
+        assert efs[0] == efs[1]
+        assert efs[0] is not efs[1]
+
     def test_pile_only_2acres(self, reset_config):
         Config().set("prichard-oneill", 'emissions', "model")
         Config().set(True, 'emissions', "include_emissions_details")
@@ -1193,6 +1222,41 @@ class TestConsumeEmissions(BaseEmissionsTest):
         self._check_emissions(self.EXPECTED_FIRE1_EMISSIONS_PM_ONLY,
             self.fires[1]['activity'][0]['active_areas'][0]['specified_points'][0]['fuelbeds'][0]['emissions'])
 
+    def test_reuse_consumption(self, reset_config):
+        Config().set("consume", 'emissions', "model")
+        Config().set(['PM2.5', 'CO'], 'emissions', "species")
+        set_old_consume_defaults()
+
+        # recompute consumption, so that it's what consume would produce
+        fire = self.fires[1]
+        fb = fire['activity'][0]['active_areas'][0]['specified_points'][0]['fuelbeds'][0]
+        fb.pop('consumption')
+        fb.pop('heat')
+        fm = fires_module.FiresManager()
+        fm.add_fires([fire])
+        consumption.run(fm)
+
+        fire_reused = copy.deepcopy(fm.fires[0])
+        self._run_fires(emissions.Consume(), fm.fires)
+        Config().set(True, 'emissions', "reuse_consumption")
+        self._run_fires(emissions.Consume(), [fire_reused])
+
+        fb_reused = fire_reused['activity'][0]['active_areas'][0]['specified_points'][0]['fuelbeds'][0]
+        assert 'error' not in fire_reused
+        self._check_emissions(fb['emissions'], fb_reused['emissions'])
+
+    def test_reuse_consumption_zero_area(self):
+        # consume.FuelConsumption disallows setting attributes directly
+        fc = consumeutils.FuelConsumptionForEmissions.__new__(
+            consumeutils.FuelConsumptionForEmissions)
+        object.__setattr__(fc, '_area', 0.0)
+        assert fc._get_per_acre({"flaming": [0.0], "total": [0.0]},
+            'flaming') == 0.0
+        assert fc._get_per_acre({}, 'total') == 0.0
+
+        object.__setattr__(fc, '_area', 2.0)
+        assert fc._get_per_acre({"flaming": [3.0]}, 'flaming') == 1.5
+
 
 class TestPilesEmissions(BaseEmissionsTest):
 
@@ -5,6 +5,7 @@ __author__ = "Joel Dubowy"
 import copy
 from unittest import mock
 
+import numpy
 from pytest import raises
 
 from bluesky.config import Config
@@ -217,3 +218,76 @@ class TestEstimatorGetFromLatLng(BaseTestEstimatorEstimate):
         self.active_area_location = {"lat": 46.0, 'lng': -120.34}
         super(TestEstimatorGetFromLatLng, self).setup_method()
 
+
+
+class TestRunWithCache():
+
+    def setup_method(self):
+        self.lookup = mock.Mock()
+        self.lookup.look_up = mock.Mock(return_value=FUELBED_INFO_60_40)
+
+    def _run(self, monkeypatch):
+        monkeypatch.setattr(fuelbeds, 'FccsLookUp',
+            lambda **options: self.lookup)
+        fires_manager = mock.Mock(fires=[
+            Fire({'id': '1', 'activity': [{'active_areas': [{
+                'specified_points': [{'lat': 46.0, 'lng': -120.34, 'area': 200}]
+            }]}]})
+        ])
+        fires_manager.fire_failure_handler = lambda fire: mock.MagicMock()
+        fuelbeds.run(fires_manager)
+        return fires_manager.fires[0]['activity'][0]['active_areas'][0]['specified_points'][0]
+
+    def test_no_cache(self, reset_config, monkeypatch):
+        loc = self._run(monkeypatch)
+        loc = self._run(monkeypatch)
+        assert loc['fuelbeds'] == [{'fccs_id': '46', 'pct': 60.0},
+            {'fccs_id': '47', 'pct': 40.0}]
+        assert self.lookup.look_up.call_count == 2
+
+    def test_cache(self, reset_config, monkeypatch, tmpdir):
+        Config().set(str(tmpdir.join('fuelbeds.sqlite')), 'fuelbeds', 'cache_file')
+        expected = [{'fccs_id': '46', 'pct': 60.0}, {'fccs_id': '47', 'pct': 40.0}]
+
+        assert self._run(monkeypatch)['fuelbeds'] == expected
+        assert self.lookup.look_up.call_count == 1
+        assert self._run(monkeypatch)['fuelbeds'] == expected
+        assert self.lookup.look_up.call_count == 1
+
+        # look-up configuration is part of the cache key
+        Config().set(20.0, 'fuelbeds', 'insignificance_threshold')
+        assert self._run(monkeypatch)['fuelbeds'] == expected
+        assert self.lookup.look_up.call_count == 2
+
+    def test_cache_hits_and_misses_set_same_values(self, reset_config,
+            monkeypatch, tmpdir):
+        Config().set(str(tmpdir.join('fuelbeds.sqlite')), 'fuelbeds', 'cache_file')
+        self.lookup.look_up.return_value = {"fuelbeds": {
+            "46": {"grid_cells": numpy.int64(6), "percent": numpy.float64(60.0)},
+            "47": {"grid_cells": numpy.int64(4), "percent": numpy.float64(40.0)}
+        }}
+
+        miss = self._run(monkeypatch)['fuelbeds']
+        hit = self._run(monkeypatch)['fuelbeds']
+        assert self.lookup.look_up.call_count == 1
+        assert miss == hit
+        assert [type(fb['pct']) for fb in miss] == [float, float]
+        assert [type(fb['pct']) for fb in hit] == [float, float]
+
+    def test_results_not_cached_if_not_serializable(self, reset_config,
+            monkeypatch, tmpdir):
+        Config().set(str(tmpdir.join('fuelbeds.sqlite')), 'fuelbeds', 'cache_file')
+        fuelbed_info = copy.deepcopy(FUELBED_INFO_60_40)
+        fuelbed_info['foo'] = object()
+        self.lookup.look_up.return_value = fuelbed_info
+        expected = [{'fccs_id': '46', 'pct': 60.0}, {'fccs_id': '47', 'pct': 40.0}]
+
+        assert self._run(monkeypatch)['fuelbeds'] == expected
+        assert self._run(monkeypatch)['fuelbeds'] == expected
+        assert self.lookup.look_up.call_count == 2
+
+        cache = fuelbeds.FuelbedsCache(str(tmpdir.join('other.sqlite')), [])
+        with raises(TypeError):
+            cache.set('a', fuelbed_info)
+        assert cache.get('a') is None
+        cache.close()
@@ -5,11 +5,13 @@ __author__ = "Joel Dubowy"
 import copy
 import os
 import tempfile
+import threading
 import time
 from unittest import mock
 
 from pytest import raises
 
+from bluesky.config import Config
 from bluesky.exceptions import BlueSkyUnavailableResourceError
 from bluesky.loaders import BaseFileLoader
 from bluesky.modules import load
@@ -145,3 +147,97 @@ class TestFSFileLoadSource():
 
 class TestFSApiLoadSource():
     pass
+
+
+##
+## Tests for run, loading sources concurrently
+##
+
+class TestRunConcurrently():
+
+    SOURCES = [
+        {"name": "a", "format": "JSON", "type": "file", "delay": 0.3},
+        {"name": "b", "format": "JSON", "type": "file", "delay": 0.1},
+        {"name": "c", "format": "JSON", "type": "file", "delay": 0.2}
+    ]
+
+    def setup_method(self):
+        self.fires_manager = mock.Mock()
+        self.added = []
+        self.fires_manager.add_fires = lambda fires: self.added.extend(fires)
+
+    def monkeypatch_load_source(self, monkeypatch, fail=(), barrier=None):
+        def _load_source(source):
+            if barrier:
+                # Fails with BrokenBarrierError unless all sources are
+                # being loaded at the same time
+                barrier.wait(timeout=10)
+            time.sleep(source['delay'])
+            if source['name'] in fail:
+                raise RuntimeError("failed to load {}".format(source['name']))
+            return [{"id": source['name']}]
+        monkeypatch.setattr(load, '_load_source', _load_source)
+
+    def test_sequentially(self, reset_config, monkeypatch):
+        self.monkeypatch_load_source(monkeypatch)
+        Config().set(self.SOURCES, 'load', 'sources')
+
+        t = time.time()
+        load.run(self.fires_manager)
+        assert time.time() - t >= 0.6
+        assert [f['id'] for f in self.added] == ['a', 'b', 'c']
+
+    def test_concurrently(self, reset_config, monkeypatch):
+        self.monkeypatch_load_source(monkeypatch,
+            barrier=threading.Barrier(len(self.SOURCES)))
+        Config().set(self.SOURCES, 'load', 'sources')
+        Config().set(0, 'load', 'max_concurrent_sources')
+
+        load.run(self.fires_manager)
+        assert [f['id'] for f in self.added] == ['a', 'b', 'c']
+        self.fires_manager.processed.assert_called_once_with(load.__name__,
+            load.__version__, successfully_loaded_sources=self.SOURCES)
+
+    def test_concurrently_skip_failure(self, reset_config, monkeypatch):
+        self.monkeypatch_load_source(monkeypatch, fail=('b',))
+        Config().set(self.SOURCES, 'load', 'sources')
+        Config().set(2, 'load', 'max_concurrent_sources')
+        Config().set(True, 'skip_failed_sources')
+
+        load.run(self.fires_manager)
+        assert [f['id'] for f in self.added] == ['a', 'c']
+        self.fires_manager.processed.assert_called_once_with(load.__name__,
+            load.__version__, successfully_loaded_sources=[
+            self.SOURCES[0], self.SOURCES[2]])
+
+    def test_concurrently_failure(self, reset_config, monkeypatch):
+        self.monkeypatch_load_source(monkeypatch, fail=('a',))
+        Config().set(self.SOURCES, 'load', 'sources')
+        Config().set(0, 'load', 'max_concurrent_sources')
+
+        with raises(RuntimeError) as e_info:
+            load.run(self.fires_manager)
+        assert e_info.value.args[0] == "failed to load a"
+        assert self.added == []
+
+    def test_concurrently_failure_doesnt_wait(self, reset_config, monkeypatch):
+        release = threading.Event()
+        finished = threading.Event()
+        def _load_source(source):
+            if source['name'] == 'a':
+                raise RuntimeError("failed to load a")
+            # e.g. waiting for the source to become available
+            release.wait(timeout=10)
+            finished.set()
+            return [{"id": source['name']}]
+        monkeypatch.setattr(load, '_load_source', _load_source)
+        Config().set(self.SOURCES, 'load', 'sources')
+        Config().set(0, 'load', 'max_concurrent_sources')
+
+        try:
+            with raises(RuntimeError) as e_info:
+                load.run(self.fires_manager)
+            assert e_info.value.args[0] == "failed to load a"
+            assert not finished.is_set()
+        finally:
+            release.set()
@@ -2,13 +2,16 @@
 
 __author__ = "Joel Dubowy"
 
+import concurrent.futures
 import copy
 import datetime
+import functools
+import multiprocessing
 import os
 import tempfile
 import uuid
 
-from pytest import raises
+from pytest import fixture, raises
 from plumerise import sev, feps
 from pyairfire import osutils
 
@@ -548,6 +551,83 @@ class TestPlumeRiseRunSev():
         # TOOD: assert plumerise return value
 
 
+class MockPlumeRiseSEVByArea():
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def compute(self, localmet, area, frp=None):
+        if area == 3232:
+            raise ValueError("bad area")
+        return {"hours": {"area": area, "pid": os.getpid()}}
+
+class MockSEVCompute(plumerise.SEVCompute):
+    """Computes with MockPlumeRiseSEVByArea
+
+    The compute class, unlike a monkeypatched plumerise.sev, is passed to
+    the worker processes, whatever the multiprocessing start method.
+    """
+
+    def __init__(self):
+        self._sev_pr = MockPlumeRiseSEVByArea()
+
+@fixture(params=multiprocessing.get_all_start_methods())
+def start_method(request, monkeypatch):
+    monkeypatch.setattr(concurrent.futures, 'ProcessPoolExecutor',
+        functools.partial(concurrent.futures.ProcessPoolExecutor,
+            mp_context=multiprocessing.get_context(request.param)))
+    monkeypatch.setattr(plumerise, 'SEVCompute', MockSEVCompute)
+
+class TestPlumeRiseRunInProcesses():
+
+    def setup_method(self):
+        self.fm = FiresManager()
+
+    def set_config(self):
+        Config().set('sev', 'plumerise', 'model')
+        Config().set(2, 'plumerise', 'num_processes')
+
+    def test_fires(self, reset_config, start_method):
+        self.set_config()
+        Config().set(True, 'skip_failed_fires')
+
+        fires = [copy.deepcopy(FIRE), copy.deepcopy(FIRE_MISSING_TIMEPROFILE),
+            copy.deepcopy(FIRE_NO_ACTIVITY)]
+        self.fm.load({"fires": fires})
+        plumerise.run(self.fm)
+
+        # FIRE's second location and FIRE_NO_ACTIVITY fail
+        assert [f.id for f in self.fm.fires] == [fires[1].id]
+        assert [f.id for f in self.fm.failed_fires] == [fires[0].id, fires[2].id]
+
+        aa = fires[1]['activity'][0]['active_areas'][0]
+        loc = aa['specified_points'][0]
+        assert loc['plumerise']['area'] == loc['area']
+        assert loc['plumerise']['pid'] != os.getpid()
+        assert loc['plumerise-model'] == 'sev'
+        # fields are merged into the original location objects
+        assert loc is self.fm.fires[0].locations[0]
+        assert loc._active_area is aa
+
+    def test_failure(self, reset_config, start_method):
+        self.set_config()
+        Config().set(False, 'skip_failed_fires')
+
+        self.fm.load({"fires": [copy.deepcopy(FIRE)]})
+        with raises(ValueError) as e_info:
+            plumerise.run(self.fm)
+        assert e_info.value.args[0] == "bad area"
+
+    def test_results(self):
+        loc = activity.Location({"area": 10, "fuelbeds": [{"pct": 100}]},
+            active_area=activity.ActiveArea({"utc_offset": "-07:00"}))
+        plumerise._merge_results(loc, {"plumerise": {"foo": 1},
+            "plumerise-model": "feps", "heat": {"total": [1.0]}})
+        assert dict(loc) == {"area": 10, "fuelbeds": [{"pct": 100,
+            "heat": {"total": [1.0]}}], "plumerise": {"foo": 1},
+            "plumerise-model": "feps"}
+
+
 class TestPlumeRiseRunSevFeps():
 
     def setup_method(self):
@@ -401,3 +401,12 @@ class TestSeasonFromDate():
         assert 'fall' == sfd(datetime.date(2019, 12, 20))
         assert 'winter' == sfd(datetime.date(2019, 12, 21))
         assert 'winter' == sfd(datetime.date(2019, 12, 31))
+
+
+class TestHourKeys():
+
+    def test(self):
+        assert datetimeutils.hour_keys(datetime.datetime(2019, 8, 1, 23), 3) == (
+            "2019-08-01T23:00:00", "2019-08-02T00:00:00",
+            "2019-08-02T01:00:00")
+        assert datetimeutils.hour_keys(datetime.datetime(2019, 8, 1, 23), 0) == ()
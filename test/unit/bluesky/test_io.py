@@ -3,6 +3,7 @@
 __author__ = "Joel Dubowy"
 
 import logging
+import os
 import sys
 import time
 from collections import defaultdict
@@ -15,6 +16,25 @@ from bluesky.exceptions import (
     BlueSkySubprocessError
 )
 
+##
+## io.get_num_available_cpus
+##
+
+class TestGetNumAvailableCpus():
+
+    def test_affinity(self, monkeypatch):
+        monkeypatch.setattr(os, 'sched_getaffinity', lambda pid: {0, 3, 5},
+            raising=False)
+        assert 3 == io.get_num_available_cpus()
+
+    def test_no_affinity(self, monkeypatch):
+        monkeypatch.delattr(os, 'sched_getaffinity', raising=False)
+        monkeypatch.setattr(os, 'cpu_count', lambda: 6)
+        assert 6 == io.get_num_available_cpus()
+        monkeypatch.setattr(os, 'cpu_count', lambda: None)
+        assert 1 == io.get_num_available_cpus()
+
+
 ##
 ## io.wait_for_availability
 ##
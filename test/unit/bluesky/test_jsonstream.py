@@ -0,0 +1,101 @@
+"""Unit tests for bluesky.jsonstream"""
+
+__author__ = "Joel Dubowy"
+
+import gzip
+import io
+import json
+
+from pytest import raises
+
+from bluesky import jsonstream
+
+
+DATA = {
+    "fires": [
+        {"id": "a", "bar": 123, "baz": 12.32, "bee": "12.12 é"},
+        {"id": "b", "bar": 2, "baz": -1.1e-05, "nested": {"a": [1, 2, {}]}},
+    ],
+    "foo": {"bar": "baz"},
+    "n": 12345678,
+    "empty": [],
+}
+
+
+class TestLoad():
+
+    def _load(self, raw, **kwargs):
+        # Use a range of chunk sizes, to exercise values split across chunks
+        results = [jsonstream.load(io.BytesIO(raw), chunk_size=c, **kwargs)
+            for c in (1, 2, 3, 7, 64, jsonstream.CHUNK_SIZE)]
+        for r in results[1:]:
+            assert r == results[0]
+        return results[0]
+
+    def test_uncompressed(self):
+        raw = json.dumps(DATA, indent=2).encode()
+        assert DATA == self._load(raw)
+        assert DATA == self._load(raw, streamed_keys=('fires', 'empty'))
+
+    def test_text_stream(self):
+        s = json.dumps(DATA)
+        assert DATA == jsonstream.load(io.StringIO(s), streamed_keys=('fires',),
+            chunk_size=5)
+
+    def test_gzipped(self):
+        raw = gzip.compress(json.dumps(DATA).encode())
+        assert DATA == self._load(raw, streamed_keys=('fires',))
+
+    def test_multi_member_gzip(self):
+        s = json.dumps(DATA)
+        raw = gzip.compress(s[:20].encode()) + gzip.compress(s[20:].encode())
+        assert DATA == self._load(raw, streamed_keys=('fires',))
+
+    def test_item_hook(self):
+        raw = json.dumps(DATA).encode()
+        data = self._load(raw, streamed_keys=('fires',),
+            item_hook=lambda f: f['id'])
+        assert data['fires'] == ['a', 'b']
+        assert data['foo'] == {"bar": "baz"}
+
+    def test_non_object(self):
+        for val in ("", 0, 123.4, None, [1, {"fires": []}]):
+            raw = json.dumps(val).encode()
+            assert val == self._load(raw, streamed_keys=('fires',))
+
+    def test_duplicate_keys(self):
+        raw = b'{"a": 1, "fires": [1], "a": 2, "fires": [2, 3]}'
+        assert json.loads(raw) == self._load(raw, streamed_keys=('fires',))
+
+    def test_invalid(self):
+        for raw in (b'', b'{', b'{"fires": [1, 2}', b'{"a" 1}', b'{a: 1}',
+                b'{"a": 1,}', b'{"a": 1} x', b'sdf'):
+            with raises(json.decoder.JSONDecodeError):
+                jsonstream.load(io.BytesIO(raw), streamed_keys=('fires',),
+                    chunk_size=2)
+
+
+class TestDump():
+
+    def test_matches_json_dumps(self):
+        data = dict(DATA, tup=(1, 2.5), nested_fires={"fires": [1, 2]})
+        for indent in (None, 0, 2, '\t'):
+            for sort_keys in (False, True):
+                for streamed_keys in ((), ('fires', 'empty', 'tup', 'n')):
+                    output = io.StringIO()
+                    jsonstream.dump(data, output, streamed_keys=streamed_keys,
+                        indent=indent, sort_keys=sort_keys)
+                    assert json.dumps(data, indent=indent,
+                        sort_keys=sort_keys) == output.getvalue()
+
+    def test_empty(self):
+        for indent in (None, 2):
+            output = io.StringIO()
+            jsonstream.dump({}, output, streamed_keys=('fires',), indent=indent)
+            assert '{}' == output.getvalue()
+
+    def test_hook(self):
+        output = io.StringIO()
+        jsonstream.dump(DATA, output, streamed_keys=('fires',),
+            hook=lambda v: v['id'] if isinstance(v, dict) and 'id' in v else v)
+        assert dict(DATA, fires=['a', 'b']) == json.loads(output.getvalue())
@@ -2,7 +2,13 @@
 
 __author__ = "Joel Dubowy"
 
-from pytest import raises
+import json
+import os
+from unittest import mock
+
+import fiona
+from pytest import fixture, raises
+from shapely.geometry import box, mapping
 
 from bluesky import  locationutils
 
@@ -227,3 +233,105 @@ class TestLatLngPerimeter():
         })
         assert latlng.latitude == 33
         assert latlng.longitude == -100.25
+
+
+@fixture
+def counties_shapefile(tmp_path):
+    filename = str(tmp_path / 'counties_fips.shp')
+    schema = {
+        'geometry': 'Polygon',
+        'properties': {'NAME': 'str', 'GEOID': 'str', 'STATEFP': 'str'}
+    }
+    with fiona.open(filename, 'w', 'ESRI Shapefile', schema,
+            crs='EPSG:4326') as f:
+        f.write({'geometry': mapping(box(-122, 45, -120, 47)),
+            'properties': {'NAME': 'Foo', 'GEOID': '53001', 'STATEFP': '53'}})
+        f.write({'geometry': mapping(box(-120, 45, -118, 47)),
+            'properties': {'NAME': 'Bar', 'GEOID': '53003', 'STATEFP': '53'}})
+        # overlaps Bar
+        f.write({'geometry': mapping(box(-119, 44, -118, 45.5)),
+            'properties': {'NAME': 'Baz', 'GEOID': '41001', 'STATEFP': '41'}})
+
+    locationutils._load_counties_index.cache_clear()
+    with mock.patch.object(locationutils, 'COUNTIES_SHAPEFILE', filename):
+        yield filename
+    locationutils._load_counties_index.cache_clear()
+
+
+class TestFipsOffline():
+
+    def test_lookup(self, counties_shapefile):
+        with mock.patch.object(locationutils.requests, 'get') as get:
+            fips = locationutils.Fips(46, -121)
+            assert get.call_count == 0
+        assert fips.county_name == 'Foo'
+        assert fips.county_fips == '53001'
+        assert fips.state_fips == '53'
+        assert fips.state_name is None
+
+    def test_lookup_not_found(self, counties_shapefile):
+        with mock.patch.object(locationutils.requests, 'get',
+                side_effect=Exception('offline')):
+            # outside of all counties
+            with raises(RuntimeError):
+                locationutils.Fips(30, -100)
+            # in two counties
+            with raises(RuntimeError):
+                locationutils.Fips(45.2, -118.5)
+
+    def test_lookup_many(self, counties_shapefile):
+        with mock.patch.object(locationutils.requests, 'get',
+                side_effect=Exception('offline')) as get:
+            results = locationutils.Fips.lookup_many(
+                [(46, -121), (30, -100), ('46', '-119'), (45.2, -118.5)])
+            # only locations not resolved offline are tried with the API
+            assert get.call_count == 2
+        assert [f and f.county_fips for f in results] == [
+            '53001', None, '53003', None]
+
+        with raises(ValueError):
+            locationutils.Fips.lookup_many([(46, -121), ('a', -121)])
+
+    def test_lookup_many_not_offline(self, counties_shapefile):
+        api_response = mock.Mock(status_code=200, content=json.dumps({
+            "County": {"FIPS": "53005", "name": "Qux"},
+            "State": {"FIPS": "53", "code": "WA", "name": "Washington"}
+        }).encode())
+        with mock.patch.object(locationutils.requests, 'get',
+                return_value=api_response) as get:
+            results = locationutils.Fips.lookup_many(
+                [(46, -121), (46, -119)], offline=False)
+            # the API is tried first for every location, as with Fips
+            assert get.call_count == 2
+            assert locationutils.Fips(46, -121, offline=False).county_fips == '53005'
+        assert [f.county_fips for f in results] == ['53005', '53005']
+
+        with mock.patch.object(locationutils.requests, 'get',
+                side_effect=Exception('offline')):
+            results = locationutils.Fips.lookup_many(
+                [(46, -121), (30, -100)], offline=False)
+        # falling back to the counties index
+        assert [f and f.county_fips for f in results] == ['53001', None]
+
+    def test_cache_file(self, counties_shapefile, tmp_path):
+        cache_file = str(tmp_path / 'cache' / 'counties.pkl')
+        fips = locationutils.Fips(46, -119, cache_file=cache_file)
+        assert fips.county_fips == '53003'
+        assert os.path.exists(cache_file)
+
+        locationutils._load_counties_index.cache_clear()
+        with mock.patch.object(locationutils.gpd, 'read_file') as read_file:
+            fips = locationutils.Fips(46, -121, cache_file=cache_file)
+            assert read_file.call_count == 0
+        assert fips.county_fips == '53001'
+
+    def test_cache_file_write_failure(self, tmp_path):
+        cache_file = str(tmp_path / 'counties.pkl')
+        with mock.patch.object(locationutils.pickle, 'dump',
+                side_effect=Exception('disk full')):
+            locationutils.CountiesIndex._write_cache(cache_file, {})
+        with mock.patch.object(locationutils.os, 'replace',
+                side_effect=OSError('read-only')):
+            locationutils.CountiesIndex._write_cache(cache_file, {})
+        # temp files are removed
+        assert os.listdir(tmp_path) == []
@@ -163,3 +163,46 @@ class TestOutputLoader():
             ]
 
             assert locations == expected
+
+    def test_read_and_add_output(self):
+        with test_output_file(ONE_LOC_ONE_HEIGHT_TDUMP) as filename:
+            config = {
+                'output_file_name': os.path.basename(filename),
+                'heights': [10]
+            }
+            loader = load.OutputLoader(config)
+            output = loader.read_output_file(os.path.dirname(filename))
+
+            assert output == [
+                (0, [37.910, -119.762, 10.0]),
+                (0, [37.836, -119.930, 0.0])
+            ]
+
+            locations = [{}]
+            loader.add_output("2019-06-10T12:00:00Z", output, locations)
+            loader.add_output("2019-06-10T13:00:00Z", output[:1], locations)
+
+            expected = [{
+                "trajectories":{
+                    "model": "hysplit",
+                    "lines": [
+                        {
+                            "start": "2019-06-10T12:00:00Z",
+                            "height": 10,
+                            "points": [
+                                [37.910, -119.762, 10.0],
+                                [37.836, -119.930, 0.0]
+                            ]
+                        },
+                        {
+                            "start": "2019-06-10T13:00:00Z",
+                            "height": 10,
+                            "points": [
+                                [37.910, -119.762, 10.0]
+                            ]
+                        }
+                    ]
+                }
+            }]
+
+            assert locations == expected